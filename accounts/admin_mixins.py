@@ -0,0 +1,65 @@
+"""Mixins shared by the record ``ModelAdmin`` classes."""
+
+
+class DeferredChangeListMixin:
+    """Skip long text columns on the changelist page only
+
+    ``changelist_defer`` lists the fields the changelist never displays. They
+    stay loaded on the change form, which does show them.
+    """
+
+    changelist_defer = ()
+
+    def get_changelist(self, request, **kwargs):
+        changelist_class = super().get_changelist(request, **kwargs)
+        defer = self.changelist_defer
+        if not defer:
+            return changelist_class
+
+        class DeferredChangeList(changelist_class):
+            def get_queryset(self, request, exclude_parameters=None):
+                return super().get_queryset(request, exclude_parameters).defer(*defer)
+
+        return DeferredChangeList
+
+
+class FullTextSearchMixin:
+    """Answer changelist searches from the full-text index
+
+    The model's ``SEARCH_FIELDS`` are searched through
+    :func:`accounts.search.search_records` instead of ``icontains`` lookups
+    on ``search_fields``.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        from .search import search_records
+
+        if not search_term.strip():
+            return super().get_search_results(request, queryset, search_term)
+        return search_records(queryset, search_term), False
+
+
+class BulkStatusActionsMixin:
+    """Add a "Mark selected as ..." action for every status of the model
+
+    Each action runs :func:`accounts.bulk.set_status`, one ``UPDATE`` for the
+    whole selection that still sets the closing timestamp.
+    """
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        if not self.has_change_permission(request):
+            return actions
+        for status, label in self.model.STATUS_CHOICES:
+            name = f'mark_{status.lower()}'
+            actions[name] = (self._status_action(status, label), name, f'Mark selected as {label}')
+        return actions
+
+    @staticmethod
+    def _status_action(status, label):
+        def action(modeladmin, request, queryset):
+            from .bulk import set_status
+
+            updated = set_status(queryset, status)
+            modeladmin.message_user(request, f'{updated} record(s) marked as {label}.')
+        return action
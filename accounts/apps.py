@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        # Register the role and page cache invalidation receivers
+        from . import signals
+        from .search import repair_sqlite_triggers
+
+        signals.connect_record_receivers()
+        post_migrate.connect(repair_sqlite_triggers, sender=self)
@@ -0,0 +1,172 @@
+"""Hot/cold archival of closed records.
+
+Support, asset and vendor records closed (solved, returned, resolved) more
+than ``ARCHIVE_AFTER_MONTHS`` months ago are moved by ``archive_records``
+into an archive table per module (``ArchivedSupportRecord`` and so on) with
+the same columns and ids. The live tables, and their indexes, then only hold
+open and recently closed records.
+
+Archived records are read-only. List pages and exports read the archive
+as well when their date range (``from``/``to``) reaches into it, or alone
+with ``?archive=1``; an unfiltered list never touches it. The global search
+reads it with ``?archive=1``, and the detail pages fall back to it, so old
+links keep working. What the dashboard and reports show
+is unchanged: the record counters and status transitions they read are left
+in place, and ``rebuild_counters`` counts the archive too. (With
+``DASHBOARD_USE_COUNTERS`` off, the dashboard counts the live tables only.)
+The archive has no full-text or fuzzy name index; searching it uses
+``icontains``. Archiving is not a delete, so it leaves no tombstones for
+the sync feed.
+"""
+import calendar
+
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404
+from django.utils import timezone
+
+from . import fuzzy
+from .filters import date_range, timestamp_range
+from .search import MergedSearchResults
+
+DEFAULT_AFTER_MONTHS = 24
+
+
+def archived_modules():
+    """Return ``(prefix, model, archive_model, user_field)`` for each archived module"""
+    from support_records.models import ArchivedSupportRecord, SupportRecord
+    from asset_management.models import ArchivedAssetRecord, AssetRecord
+    from vendor_assistance.models import ArchivedVendorAssistance, VendorAssistance
+
+    return [
+        ('support', SupportRecord, ArchivedSupportRecord, 'recorded_by'),
+        ('asset', AssetRecord, ArchivedAssetRecord, 'recorded_by'),
+        ('vendor', VendorAssistance, ArchivedVendorAssistance, 'resolved_by'),
+    ]
+
+
+def archive_for(model):
+    """Return the archive model of a live record model (``None`` if it has none)"""
+    for _, live, archived, _ in archived_modules():
+        if live is model:
+            return archived
+    return None
+
+
+def live_model(model):
+    """Return the live record model of an archive model (or ``model`` itself)"""
+    for _, live, archived, _ in archived_modules():
+        if archived is model:
+            return live
+    return model
+
+
+def months_before(moment, months):
+    """Return ``moment`` moved back by whole calendar months"""
+    year, month = divmod(moment.year * 12 + moment.month - 1 - months, 12)
+    day = min(moment.day, calendar.monthrange(year, month + 1)[1])
+    return moment.replace(year=year, month=month + 1, day=day)
+
+
+def cutoff(months=None, now=None):
+    """Records closed before this moment belong in the archive"""
+    if months is None:
+        months = getattr(settings, 'ARCHIVE_AFTER_MONTHS', DEFAULT_AFTER_MONTHS)
+    return months_before(now or timezone.now(), months)
+
+
+def archivable(model, before):
+    """Live records of ``model`` closed before ``before``"""
+    return model._base_manager.filter(
+        status=model.CLOSED_STATUS, **{f'{model.CLOSED_AT_FIELD}__lt': before}
+    )
+
+
+def archive_records(model, before, batch_size=500):
+    """Move records of ``model`` closed before ``before`` to its archive
+
+    Works in batches, one transaction each, and returns the number of
+    records moved. Counters and status history are left alone; the fuzzy
+    name index entries go with the live rows, and the ``post_delete``
+    receivers retire cached pages.
+    """
+    archive_model = archive_for(model)
+    columns = [field.attname for field in archive_model._meta.concrete_fields if field.name != 'archived_at']
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                archivable(model, before).select_for_update()
+                .order_by('pk').values(*columns)[:batch_size]
+            )
+            if not rows:
+                break
+            now = timezone.now()
+            archive_model.objects.bulk_create([archive_model(**row, archived_at=now) for row in rows])
+            # A plain queryset delete: no tombstones, and counters stay as they are
+            records = model._base_manager.filter(pk__in=[row['id'] for row in rows])
+            fuzzy.queryset_deleted(records)
+            records.delete()
+        moved += len(rows)
+    return moved
+
+
+def requested(params):
+    """Whether the query string asks for archived records"""
+    return params.get('archive') == '1'
+
+
+def list_sources(model, params):
+    """Return the tables a list or export of ``model`` reads for ``params``
+
+    The archive is only probed (one indexed ``EXISTS``) when a date filter
+    is set.
+    """
+    archive_model = archive_for(model)
+    if archive_model is None:
+        return [model]
+    if requested(params):
+        return [archive_model]
+    first, last = date_range(params)
+    if (first or last) and archive_model._base_manager.filter(**timestamp_range(first, last)).exists():
+        return [model, archive_model]
+    return [model]
+
+
+async def alist_sources(model, params):
+    """Async :func:`list_sources`"""
+    archive_model = archive_for(model)
+    if archive_model is None:
+        return [model]
+    if requested(params):
+        return [archive_model]
+    first, last = date_range(params)
+    if (first or last) and await archive_model._base_manager.filter(**timestamp_range(first, last)).aexists():
+        return [model, archive_model]
+    return [model]
+
+
+def combined(querysets):
+    """Return a single queryset as is, or several merged newest first
+
+    The merged sequence works with :class:`django.core.paginator.Paginator`.
+    """
+    if len(querysets) == 1:
+        return querysets[0]
+    return MergedSearchResults(querysets)
+
+
+async def aget_record_or_404(model, **lookup):
+    """Return the live record matching ``lookup``, or the archived one
+
+    The owning user is loaded with the record, so templates can show it
+    without a query from async code.
+    """
+    for source in (model, archive_for(model)):
+        if source is None:
+            continue
+        try:
+            return await source._default_manager.select_related().aget(**lookup)
+        except source.DoesNotExist:
+            pass
+    raise Http404(f'No {model._meta.object_name} matches the given query.')
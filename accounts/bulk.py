@@ -0,0 +1,52 @@
+"""Bulk status changes and deletes for record querysets.
+
+Each operation is a single ``UPDATE``/``DELETE ... WHERE`` statement rather
+than a ``save()``/``delete()`` per record, so the per-instance side effects
+are applied here in bulk: the closing timestamp (``CLOSED_AT_FIELD``) is
+stamped the way ``save()`` does it, and :mod:`accounts.hooks` keeps the
+derived stores in step.
+"""
+from django.db import transaction
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import hooks
+
+
+def status_changes(model, status, now=None):
+    """Return the ``update()`` arguments for moving records to ``status``
+
+    Like ``save()``, entering the closing status sets the closing timestamp
+    unless the record already has one; leaving it keeps the timestamp.
+    ``updated_at`` is stamped as ``auto_now`` would (``update()`` skips it).
+    """
+    if status not in dict(model.STATUS_CHOICES):
+        raise ValueError(f'{status!r} is not a valid {model.__name__} status')
+    now = now or timezone.now()
+    changes = {'status': status, 'updated_at': now}
+    closed_at = getattr(model, 'CLOSED_AT_FIELD', None)
+    if closed_at and status == model.CLOSED_STATUS:
+        changes[closed_at] = Coalesce(closed_at, Value(now))
+    return changes
+
+
+def set_status(queryset, status, now=None):
+    """Move every record in ``queryset`` to ``status``; returns rows changed"""
+    model = queryset.model
+    changes = status_changes(model, status, now)
+    with transaction.atomic():
+        pks = list(queryset.exclude(status=status).values_list('pk', flat=True))
+        changing = model._base_manager.filter(pk__in=pks)
+        state = hooks.before_queryset_update(changing)
+        updated = changing.update(**changes)
+        hooks.after_queryset_update(changing, state)
+    return updated
+
+
+def delete_records(queryset):
+    """Delete every record in ``queryset``; returns rows deleted"""
+    with transaction.atomic():
+        hooks.before_queryset_delete(queryset)
+        deleted, _ = queryset.delete()
+    return deleted
@@ -0,0 +1,26 @@
+from django.conf import settings
+
+from . import page_cache
+from .roles import group_names, ADMIN_GROUP
+
+
+def roles(request):
+    """Expose the current user's cached group names and admin flag"""
+    names = group_names(getattr(request, 'user', None))
+    return {
+        'user_group_names': names,
+        'is_admin': ADMIN_GROUP in names,
+    }
+
+
+def page_cache_timeout(request):
+    """Expose the fragment cache timeout to the record list templates"""
+    return {'page_cache_timeout': page_cache.timeout()}
+
+
+def fragment_cache(request):
+    """Expose the timeout and release key of cached static template fragments"""
+    return {
+        'fragment_cache_timeout': getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 3600),
+        'fragment_cache_version': getattr(settings, 'FRAGMENT_CACHE_VERSION', ''),
+    }
@@ -0,0 +1,233 @@
+"""Incremental maintenance of :class:`accounts.models.RecordCounter` rows.
+
+The counters are daily rollups keyed by ``(module, user, status, day)``.
+Each bucket holds three sums over the records now in ``status``:
+
+* ``count`` -- records recorded (``timestamp``) on ``day``;
+* ``closed`` -- records closed (``CLOSED_AT_FIELD``) on ``day``;
+* ``quantity`` -- thermal rolls (``quantity``) recorded on ``day``.
+
+A record therefore contributes to at most two buckets. Record models
+(through :mod:`accounts.hooks`) call :func:`stored_contributions` before
+saving, then :func:`record_saved` afterwards so only the difference between
+the old and new contributions is written. Deletes go through
+:func:`record_deleted` or :func:`queryset_deleted`, bulk inserts through
+:func:`records_created` and bulk updates through :func:`queryset_updated`.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from . import archive
+from .models import RecordCounter
+from .stats import dashboard_modules
+
+SUMS = ('count', 'closed', 'quantity')
+
+
+def module_for(model):
+    """Return ``(module, user_field)`` for a record model or its archive"""
+    model = archive.live_model(model)
+    for prefix, module_model, user_field in dashboard_modules():
+        if module_model is model:
+            return prefix, user_field
+    raise LookupError(f'{model.__name__} is not a counted record model')
+
+
+def _value_fields(model):
+    _, user_field = module_for(model)
+    fields = [f'{user_field}_id', 'timestamp']
+    if hasattr(model, 'STATUS_CHOICES'):
+        fields.append('status')
+    if getattr(model, 'CLOSED_AT_FIELD', None):
+        fields.append(model.CLOSED_AT_FIELD)
+    if hasattr(model, 'quantity'):
+        fields.append('quantity')
+    return fields
+
+
+def contributions(model, values):
+    """Return ``{key: [count, closed, quantity]}`` for one record's values"""
+    module, user_field = module_for(model)
+    user_id = values[f'{user_field}_id']
+    status = values.get('status', '')
+    opened_key = (module, user_id, status, timezone.localtime(values['timestamp']).date())
+    result = defaultdict(lambda: [0, 0, 0])
+    result[opened_key][0] += 1
+    result[opened_key][2] += values.get('quantity') or 0
+    closed_at = values.get(getattr(model, 'CLOSED_AT_FIELD', None))
+    if closed_at is not None:
+        result[(module, user_id, status, timezone.localtime(closed_at).date())][1] += 1
+    return dict(result)
+
+
+def instance_contributions(instance):
+    """Return the contributions of an in-memory record"""
+    model = type(instance)
+    return contributions(model, {field: getattr(instance, field) for field in _value_fields(model)})
+
+
+def stored_values(instance, extra=()):
+    """Return the counted fields, and ``extra`` fields, of the record as stored (None if new)"""
+    if instance._state.adding or instance.pk is None:
+        return None
+    model = type(instance)
+    return model._base_manager.filter(pk=instance.pk).values(*_value_fields(model), *extra).first()
+
+
+def stored_contributions(instance, stored=None):
+    """Return the contributions of the record as stored ({} if new)
+
+    Pass the row from :func:`stored_values` as ``stored`` to avoid reading
+    it again.
+    """
+    row = stored if stored is not None else stored_values(instance)
+    if row is None:
+        return {}
+    return contributions(type(instance), row)
+
+
+def adjust(key, count=0, closed=0, quantity=0):
+    """Add the given deltas to the counter bucket identified by ``key``"""
+    deltas = {name: delta for name, delta in zip(SUMS, (count, closed, quantity)) if delta}
+    if not deltas:
+        return
+    module, user_id, status, day = key
+    with transaction.atomic():
+        counter, _ = RecordCounter.objects.get_or_create(
+            module=module, user_id=user_id, status=status, day=day
+        )
+        RecordCounter.objects.filter(pk=counter.pk).update(
+            **{name: F(name) + delta for name, delta in deltas.items()}
+        )
+
+
+def apply(old, new):
+    """Write the difference between two contribution maps"""
+    for key in set(old) | set(new):
+        before, after = old.get(key, (0, 0, 0)), new.get(key, (0, 0, 0))
+        adjust(key, *(a - b for a, b in zip(after, before)))
+
+
+def record_saved(instance, previous):
+    """Move a saved record from its previous contributions to its current ones"""
+    current = instance_contributions(instance)
+    if current != previous:
+        apply(previous, current)
+
+
+def record_deleted(instance):
+    """Remove a record that is about to be deleted from its buckets"""
+    apply(stored_contributions(instance) or instance_contributions(instance), {})
+
+
+def records_created(instances):
+    """Add records inserted with ``bulk_create`` to their buckets"""
+    totals = defaultdict(lambda: [0, 0, 0])
+    for instance in instances:
+        for key, sums in instance_contributions(instance).items():
+            totals[key] = [a + b for a, b in zip(totals[key], sums)]
+    apply({}, totals)
+
+
+def grouped_contributions(queryset):
+    """Return ``{key: [count, closed, quantity]}`` summed over a queryset"""
+    model = queryset.model
+    module, user_field = module_for(model)
+    has_status = hasattr(model, 'STATUS_CHOICES')
+    fields = [user_field, 'day'] + (['status'] if has_status else [])
+    totals = defaultdict(lambda: [0, 0, 0])
+
+    opened = {'total': Count('pk')}
+    if hasattr(model, 'quantity'):
+        opened['rolls'] = Sum('quantity')
+    rows = queryset.order_by().annotate(day=TruncDate('timestamp')).values(*fields).annotate(**opened)
+    for row in rows:
+        key = (module, row[user_field], row['status'] if has_status else '', row['day'])
+        totals[key][0] += row['total']
+        totals[key][2] += row.get('rolls') or 0
+
+    closed_at = getattr(model, 'CLOSED_AT_FIELD', None)
+    if closed_at:
+        rows = (
+            queryset.order_by()
+            .filter(**{f'{closed_at}__isnull': False})
+            .annotate(day=TruncDate(closed_at))
+            .values(*fields)
+            .annotate(total=Count('pk'))
+        )
+        for row in rows:
+            totals[(module, row[user_field], row['status'], row['day'])][1] += row['total']
+    return dict(totals)
+
+
+def queryset_deleted(queryset):
+    """Remove every record in a queryset that is about to be deleted"""
+    apply(grouped_contributions(queryset), {})
+
+
+def queryset_updated(queryset, previous):
+    """Move records updated in bulk from ``previous`` to their stored state
+
+    ``previous`` is :func:`grouped_contributions` of the same queryset taken
+    before the ``update()``.
+    """
+    apply(previous, grouped_contributions(queryset))
+
+
+def recount(model):
+    """Return the contributions of every record of ``model``, archived ones included"""
+    totals = grouped_contributions(model._base_manager.all())
+    archive_model = archive.archive_for(model)
+    if archive_model is not None:
+        for key, sums in grouped_contributions(archive_model._base_manager.all()).items():
+            totals[key] = [a + b for a, b in zip(totals.get(key, (0, 0, 0)), sums)]
+    return totals
+
+
+@transaction.atomic
+def rebuild(models=None):
+    """Recompute counters from the record tables and return rows written"""
+    written = 0
+    for module, model, _ in dashboard_modules():
+        if models and model not in models:
+            continue
+        RecordCounter.objects.filter(module=module).delete()
+        counters = [
+            RecordCounter(
+                module=key[0], user_id=key[1], status=key[2], day=key[3],
+                count=count, closed=closed, quantity=quantity,
+            )
+            for key, (count, closed, quantity) in recount(model).items()
+        ]
+        RecordCounter.objects.bulk_create(counters, batch_size=1000)
+        written += len(counters)
+    return written
+
+
+def check():
+    """Compare counters with the record tables
+
+    Returns a list of ``(key, stored, expected)`` tuples, with
+    ``(count, closed, quantity)`` sums, for every bucket whose stored sums
+    differ from a fresh recount.
+    """
+    expected = {}
+    for _, model, _ in dashboard_modules():
+        for key, sums in recount(model).items():
+            expected[key] = tuple(sums)
+
+    stored = {
+        (row['module'], row['user_id'], row['status'], row['day']): (row['count'], row['closed'], row['quantity'])
+        for row in RecordCounter.objects.values('module', 'user_id', 'status', 'day', *SUMS)
+    }
+
+    empty = (0, 0, 0)
+    mismatches = []
+    for key in sorted(set(expected) | set(stored), key=str):
+        if expected.get(key, empty) != stored.get(key, empty):
+            mismatches.append((key, stored.get(key, empty), expected.get(key, empty)))
+    return mismatches
@@ -0,0 +1,105 @@
+"""Query-string filters shared by the record list views and exports.
+
+The list pages, the export endpoints and the ``export_records`` command all
+narrow a record queryset with the same parameters:
+
+* ``search`` -- full-text search, or fuzzy name matching with
+  ``match=fuzzy`` (see :mod:`accounts.search` and :mod:`accounts.fuzzy`;
+  models without a fuzzy index, like the archives, fall back to search);
+* ``status`` -- exact status, for models that have one;
+* ``from`` / ``to`` -- first and last local day (``YYYY-MM-DD``, both
+  included), or ``period`` -- ``today``, ``week`` or ``month`` so far, which
+  wins over them. Days become a half-open ``timestamp`` range, which reads
+  the ``-timestamp`` indexes.
+
+Role scoping stays with the caller, which knows who is asking.
+"""
+from datetime import date, datetime, time, timedelta
+
+from django.utils import timezone
+
+from .fuzzy import fuzzy_search
+from .search import search_records
+
+PERIODS = {
+    'today': 'Today',
+    'week': 'This week',
+    'month': 'This month',
+}
+
+
+def period_start(period, today):
+    """Return the first day of a ``PERIODS`` preset containing ``today``"""
+    if period == 'week':
+        return today - timedelta(days=today.weekday())
+    if period == 'month':
+        return today.replace(day=1)
+    return today
+
+
+def parse_day(value):
+    """Return the day in a ``YYYY-MM-DD`` value, or ``None``"""
+    try:
+        return date.fromisoformat(value or '')
+    except ValueError:
+        return None
+
+
+def date_range(params, today=None):
+    """Return the ``(first, last)`` days selected in ``params``
+
+    Either may be ``None`` for an open end; invalid dates are ignored.
+    """
+    period = params.get('period', '')
+    if period in PERIODS:
+        today = today or timezone.localdate()
+        return period_start(period, today), None
+    return parse_day(params.get('from')), parse_day(params.get('to'))
+
+
+def timestamp_range(first, last):
+    """Return ``timestamp`` lookups covering the local days ``first`` to ``last``"""
+    lookups = {}
+    if first:
+        lookups['timestamp__gte'] = timezone.make_aware(datetime.combine(first, time.min))
+    if last == date.max:
+        # No next day to stop before
+        lookups['timestamp__lte'] = timezone.make_aware(datetime.combine(last, time.max))
+    elif last:
+        lookups['timestamp__lt'] = timezone.make_aware(datetime.combine(last + timedelta(days=1), time.min))
+    return lookups
+
+
+def filter_records(queryset, params):
+    """Apply the search and status filters in ``params`` to a record queryset
+
+    ``params`` is ``request.GET`` or any mapping with the same keys. Returns
+    ``(queryset, filters)`` where ``filters`` holds the values the list
+    templates echo back.
+    """
+    search_query = params.get('search', '')
+    fuzzy_match = params.get('match') == 'fuzzy'
+    if search_query and fuzzy_match and getattr(queryset.model, 'FUZZY_FIELDS', None):
+        # Similar-name lookup, tolerant of typos
+        queryset = fuzzy_search(queryset, search_query)
+    elif search_query:
+        queryset = search_records(queryset, search_query, order_by_rank=True)
+    filters = {'search_query': search_query, 'fuzzy_match': fuzzy_match}
+
+    if hasattr(queryset.model, 'STATUS_CHOICES'):
+        status_filter = params.get('status', '')
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+        filters['status_filter'] = status_filter
+
+    first, last = date_range(params)
+    queryset = queryset.filter(**timestamp_range(first, last))
+    if params.get('period') in PERIODS:
+        filters.update(period=params['period'], date_from='', date_to='')
+    else:
+        filters.update(
+            period='',
+            date_from=first.isoformat() if first else '',
+            date_to=last.isoformat() if last else '',
+        )
+    return queryset, filters
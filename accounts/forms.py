@@ -0,0 +1,14 @@
+from django import forms
+
+
+class RecordImportForm(forms.Form):
+    """Upload form for bulk CSV imports"""
+    
+    file = forms.FileField(
+        help_text="CSV file with a header row of field names",
+        widget=forms.ClearableFileInput(attrs={'class': 'form-input', 'accept': '.csv,text/csv'}),
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        help_text="Only validate the file; nothing is saved",
+    )
@@ -0,0 +1,281 @@
+"""Fuzzy (trigram similarity) matching on record name fields.
+
+Each record model lists the columns it matches fuzzily in ``FUZZY_FIELDS``.
+Similarity follows ``pg_trgm``: values are lowercased, split into words,
+each word padded with two leading and one trailing space, and the score is
+the Jaccard overlap of the two trigram sets.
+
+* PostgreSQL: ``pg_trgm`` GIN indexes (``gin_trgm_ops``) serve the ``%``
+  operator; ``similarity()`` ranks the hits.
+* Other databases: an inverted trigram index in
+  :class:`accounts.models.NameTrigram`, maintained from Python on every save
+  and delete. A search only reads index rows for the query's trigrams.
+
+The indexes are created by the :class:`CreateTrigramIndex` migration
+operation. ``FUZZY_MATCH_THRESHOLD`` sets the minimum similarity and
+``FUZZY_MATCH_LIMIT`` caps the candidates taken from the Python index.
+"""
+import re
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.migrations.operations.base import Operation
+from django.db.models import BooleanField, Case, Count, F, FloatField, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+DEFAULT_THRESHOLD = 0.3
+DEFAULT_LIMIT = 200
+
+_WORD_RE = re.compile(r'[^\W_]+', re.UNICODE)
+
+
+def trigrams(value):
+    """Return the set of ``pg_trgm`` style trigrams of a string"""
+    grams = set()
+    for word in _WORD_RE.findall((value or '').lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a, b):
+    """Trigram similarity of two strings, between 0 and 1"""
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    shared = len(grams_a & grams_b)
+    return shared / (len(grams_a) + len(grams_b) - shared)
+
+
+def uses_pg_trgm(using='default'):
+    return connections[using].vendor == 'postgresql'
+
+
+def fuzzy_models():
+    from django.apps import apps
+
+    return [model for model in apps.get_models() if getattr(model, 'FUZZY_FIELDS', None)]
+
+
+def _entries(trigram_model, label, fields, row):
+    for field in fields:
+        grams = trigrams(row[field])
+        for gram in grams:
+            yield trigram_model(model=label, field=field, record_id=row['pk'], gram=gram, total=len(grams))
+
+
+def record_saved(instance, stored=None):
+    """Re-index the name fields of a saved record
+
+    ``stored`` is the row as it was before the save (``None`` for a new
+    record); when none of the name fields changed the index is left alone.
+    """
+    using = instance._state.db or 'default'
+    fields = getattr(instance, 'FUZZY_FIELDS', ())
+    if not fields or uses_pg_trgm(using):
+        return
+    if stored is not None and all(stored[field] == getattr(instance, field) for field in fields):
+        return
+    from .models import NameTrigram
+
+    label = instance._meta.label_lower
+    row = {field: getattr(instance, field) for field in fields}
+    row['pk'] = instance.pk
+    with transaction.atomic(using=using):
+        NameTrigram.objects.using(using).filter(model=label, record_id=instance.pk).delete()
+        NameTrigram.objects.using(using).bulk_create(_entries(NameTrigram, label, fields, row))
+
+
+def records_created(instances):
+    """Index records inserted with ``bulk_create``"""
+    instances = [instance for instance in instances if instance.pk is not None]
+    if not instances:
+        return
+    model = type(instances[0])
+    using = instances[0]._state.db or 'default'
+    fields = getattr(model, 'FUZZY_FIELDS', ())
+    if not fields or uses_pg_trgm(using):
+        return
+    from .models import NameTrigram
+
+    label = model._meta.label_lower
+    entries = []
+    for instance in instances:
+        row = {field: getattr(instance, field) for field in fields}
+        row['pk'] = instance.pk
+        entries.extend(_entries(NameTrigram, label, fields, row))
+    NameTrigram.objects.using(using).bulk_create(entries, batch_size=1000)
+
+
+def record_deleted(instance):
+    """Drop the index rows of a record that is about to be deleted"""
+    using = instance._state.db or 'default'
+    if not getattr(instance, 'FUZZY_FIELDS', ()) or uses_pg_trgm(using):
+        return
+    from .models import NameTrigram
+
+    NameTrigram.objects.using(using).filter(
+        model=instance._meta.label_lower, record_id=instance.pk
+    ).delete()
+
+
+def queryset_deleted(queryset):
+    """Drop the index rows of every record in a queryset about to be deleted"""
+    if not getattr(queryset.model, 'FUZZY_FIELDS', ()) or uses_pg_trgm(queryset.db):
+        return
+    from .models import NameTrigram
+
+    NameTrigram.objects.using(queryset.db).filter(
+        model=queryset.model._meta.label_lower,
+        record_id__in=list(queryset.values_list('pk', flat=True)),
+    ).delete()
+
+
+def populate(trigram_model, model, fields, using='default', batch_size=1000):
+    """Index every row of ``model``; returns the number of entries written"""
+    label = model._meta.label_lower
+    trigram_model.objects.using(using).filter(model=label).delete()
+    written = 0
+    batch = []
+    rows = model._base_manager.using(using).values('pk', *fields).iterator(chunk_size=batch_size)
+    for row in rows:
+        batch.extend(_entries(trigram_model, label, fields, row))
+        if len(batch) >= batch_size:
+            trigram_model.objects.using(using).bulk_create(batch)
+            written += len(batch)
+            batch = []
+    trigram_model.objects.using(using).bulk_create(batch)
+    return written + len(batch)
+
+
+@transaction.atomic
+def rebuild(models=None):
+    """Rebuild the Python trigram index and return the entries written"""
+    from .models import NameTrigram
+
+    if uses_pg_trgm():
+        return 0
+    written = 0
+    for model in fuzzy_models():
+        if models and model not in models:
+            continue
+        written += populate(NameTrigram, model, model.FUZZY_FIELDS)
+    return written
+
+
+def _threshold(threshold):
+    if threshold is None:
+        threshold = getattr(settings, 'FUZZY_MATCH_THRESHOLD', DEFAULT_THRESHOLD)
+    return float(threshold)
+
+
+def fuzzy_search(queryset, query, threshold=None):
+    """Filter a record queryset to rows whose names resemble ``query``
+
+    Adds a ``similarity`` annotation (the best score across the model's
+    ``FUZZY_FIELDS``) and orders the closest matches first.
+    """
+    model = queryset.model
+    fields = model.FUZZY_FIELDS
+    threshold = _threshold(threshold)
+    using = queryset.db
+
+    if uses_pg_trgm(using):
+        qn = connections[using].ops.quote_name
+        columns = [f'{qn(model._meta.db_table)}.{qn(field)}' for field in fields]
+        matches = ' OR '.join(f'{column} %% %s' for column in columns)
+        scores = ', '.join(f'similarity({column}, %s)' for column in columns)
+        return queryset.filter(
+            RawSQL(f'({matches})', [query] * len(columns), output_field=BooleanField())
+        ).annotate(
+            similarity=RawSQL(f'GREATEST({scores})', [query] * len(columns), output_field=FloatField()),
+        ).filter(similarity__gte=threshold).order_by('-similarity', '-timestamp', '-pk')
+
+    from .models import NameTrigram
+
+    grams = trigrams(query)
+    if not grams:
+        return queryset.none()
+    limit = getattr(settings, 'FUZZY_MATCH_LIMIT', DEFAULT_LIMIT)
+    candidates = (
+        NameTrigram.objects.using(using)
+        .filter(model=model._meta.label_lower, gram__in=grams, record_id__in=queryset.values('pk'))
+        .values('record_id', 'field', 'total')
+        .annotate(shared=Count('pk'))
+        .annotate(score=Cast('shared', FloatField()) / (len(grams) + F('total') - F('shared')))
+        .filter(score__gte=threshold)
+        .order_by('-score', '-record_id')
+    )[:limit]
+
+    scores = {}
+    for row in candidates:
+        scores[row['record_id']] = max(scores.get(row['record_id'], 0.0), row['score'])
+    if not scores:
+        return queryset.none()
+    return queryset.filter(pk__in=list(scores)).annotate(
+        similarity=Case(
+            *(When(pk=pk, then=Value(score)) for pk, score in scores.items()),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+    ).order_by('-similarity', '-timestamp', '-pk')
+
+
+def _index_name(table, field):
+    return f'{table}_{field}_trgm'
+
+
+class CreateTrigramIndex(Operation):
+    """Migration operation creating the fuzzy-match index for a model"""
+
+    reversible = True
+    reduces_to_sql = False
+
+    def __init__(self, model_name, fields):
+        self.model_name = model_name
+        self.fields = list(fields)
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        table = model._meta.db_table
+        qn = schema_editor.quote_name
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            for field in self.fields:
+                schema_editor.execute(
+                    f'CREATE INDEX IF NOT EXISTS {qn(_index_name(table, field))} '
+                    f'ON {qn(table)} USING gin ({qn(field)} gin_trgm_ops)'
+                )
+        else:
+            trigram_model = to_state.apps.get_model('accounts', 'NameTrigram')
+            populate(trigram_model, model, self.fields, using=schema_editor.connection.alias)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        table = model._meta.db_table
+        if schema_editor.connection.vendor == 'postgresql':
+            for field in self.fields:
+                schema_editor.execute(f'DROP INDEX IF EXISTS {schema_editor.quote_name(_index_name(table, field))}')
+        else:
+            trigram_model = from_state.apps.get_model('accounts', 'NameTrigram')
+            trigram_model.objects.using(schema_editor.connection.alias).filter(
+                model=model._meta.label_lower
+            ).delete()
+
+    def describe(self):
+        return f'Create trigram index for {self.model_name}'
+
+    @property
+    def migration_name_fragment(self):
+        return f'{self.model_name.lower()}_trigram_index'
+
+    def deconstruct(self):
+        return (self.__class__.__qualname__, [self.model_name, self.fields], {})
@@ -0,0 +1,167 @@
+"""Append-only status history of the stateful record models.
+
+A :class:`accounts.models.StatusTransition` row is written (through
+:mod:`accounts.hooks`) only when a record's ``status`` actually changes,
+by ``save()`` or by a bulk ``update()``. Creating a record writes nothing:
+the record's ``timestamp`` is when it entered its first status.
+
+Every row carries both ends of the stay in ``from_status``, so dwell times
+are read with one scan of the ``(model, from_status, changed_at)`` index
+and no self-join. Records still in a status are measured from their last
+transition (or ``timestamp``) up to now.
+"""
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import archive
+from .models import StatusTransition
+
+
+def is_stateful(model):
+    return hasattr(model, 'STATUS_CHOICES')
+
+
+def model_label(model):
+    # Archived records keep the history they had in the live table
+    return archive.live_model(model)._meta.label_lower
+
+
+def _entered_at(model, records):
+    """Return ``{record_id: last changed_at}`` for records with a history"""
+    rows = (
+        StatusTransition.objects.filter(model=model_label(model), record_id__in=list(records))
+        .values('record_id')
+        .annotate(last=Max('changed_at'))
+        .order_by()
+    )
+    return {row['record_id']: row['last'] for row in rows}
+
+
+def record_saved(instance, stored):
+    """Append a transition if ``instance`` changed status
+
+    ``stored`` is the row as it was before the save (``None`` for a new
+    record), with at least ``status`` and ``timestamp``.
+    """
+    model = type(instance)
+    if not is_stateful(model) or stored is None or stored['status'] == instance.status:
+        return
+    entered_at = _entered_at(model, [instance.pk]).get(instance.pk, stored['timestamp'])
+    StatusTransition.objects.create(
+        model=model_label(model),
+        record_id=instance.pk,
+        from_status=stored['status'],
+        to_status=instance.status,
+        entered_at=entered_at,
+        changed_at=timezone.now(),
+    )
+
+
+def stored_statuses(queryset):
+    """Return ``{pk: (status, timestamp)}`` before a bulk update"""
+    if not is_stateful(queryset.model):
+        return {}
+    return {pk: (status, timestamp) for pk, status, timestamp in queryset.values_list('pk', 'status', 'timestamp')}
+
+
+def queryset_updated(queryset, previous):
+    """Append transitions for records whose status a bulk update changed
+
+    ``previous`` is :func:`stored_statuses` of the same queryset taken
+    before the ``update()``.
+    """
+    model = queryset.model
+    if not previous:
+        return
+    changed = {
+        pk: status
+        for pk, status in queryset.filter(pk__in=list(previous)).values_list('pk', 'status')
+        if status != previous[pk][0]
+    }
+    if not changed:
+        return
+    entered = _entered_at(model, changed)
+    now = timezone.now()
+    StatusTransition.objects.bulk_create([
+        StatusTransition(
+            model=model_label(model),
+            record_id=pk,
+            from_status=previous[pk][0],
+            to_status=status,
+            entered_at=entered.get(pk, previous[pk][1]),
+            changed_at=now,
+        )
+        for pk, status in changed.items()
+    ], batch_size=1000)
+
+
+def record_history(instance):
+    """Return the transitions of one record, oldest first"""
+    return StatusTransition.objects.filter(
+        model=model_label(type(instance)), record_id=instance.pk
+    ).order_by('changed_at', 'pk')
+
+
+def completed_stays(model, status=None, since=None, until=None, records=None):
+    """Transitions out of ``status``, annotated with the ``dwell`` duration
+
+    Filtered on the ``(model, from_status, changed_at)`` index; ``since`` and
+    ``until`` bound when the records left the status. Pass a ``records``
+    queryset to restrict to some records (e.g. one officer's).
+    """
+    stays = StatusTransition.objects.filter(model=model_label(model))
+    if status is not None:
+        stays = stays.filter(from_status=status)
+    if since is not None:
+        stays = stays.filter(changed_at__gte=since)
+    if until is not None:
+        stays = stays.filter(changed_at__lt=until)
+    if records is not None:
+        stays = stays.filter(record_id__in=records.values('pk'))
+    return stays.annotate(
+        dwell=ExpressionWrapper(F('changed_at') - F('entered_at'), output_field=DurationField()),
+    )
+
+
+def dwell_stats(model, status, since=None, until=None, records=None):
+    """Return ``count``, ``average`` and ``longest`` time spent in ``status``
+
+    Only stays that ended (the record left ``status``) are counted.
+    """
+    stays = completed_stays(model, status, since, until, records)
+    return stays.aggregate(count=Count('pk'), average=Avg('dwell'), longest=Max('dwell'))
+
+
+def dwell_by_status(model, since=None, until=None, records=None):
+    """Return :func:`dwell_stats` for every status of ``model`` in one query"""
+    rows = (
+        completed_stays(model, since=since, until=until, records=records)
+        .values('from_status')
+        .annotate(count=Count('pk'), average=Avg('dwell'), longest=Max('dwell'))
+        .order_by()
+    )
+    return {row.pop('from_status'): row for row in rows}
+
+
+def current_stays(queryset, status=None, now=None):
+    """Records of ``queryset`` (now in ``status``), longest in it first
+
+    Annotates ``entered_at`` (last transition, or ``timestamp``) and
+    ``dwell`` (time since then).
+    """
+    now = now or timezone.now()
+    model = queryset.model
+    last_change = (
+        StatusTransition.objects.filter(model=model_label(model), record_id=OuterRef('pk'))
+        .order_by('-changed_at', '-pk')
+        .values('changed_at')[:1]
+    )
+    if status is not None:
+        queryset = queryset.filter(status=status)
+    return (
+        queryset
+        .annotate(entered_at=Coalesce(Subquery(last_change), F('timestamp')))
+        .annotate(dwell=ExpressionWrapper(Value(now) - F('entered_at'), output_field=DurationField()))
+        .order_by('entered_at', 'pk')
+    )
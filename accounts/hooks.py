@@ -0,0 +1,72 @@
+"""Bookkeeping run around every record save and delete.
+
+Record models call :func:`before_save` and :func:`after_save` around
+``Model.save()`` and :func:`before_delete` from ``Model.delete()``. Bulk
+operations use :func:`before_queryset_delete`, :func:`before_queryset_update`
+/ :func:`after_queryset_update` and, for ``bulk_create`` (CSV import),
+:func:`after_bulk_create`. Each derived store (record counters, fuzzy name
+index, status history, delete tombstones) is kept in step from here so the
+models only need one call site each. Cached pages are retired by
+``post_save``/``post_delete`` receivers, and from here for the bulk paths
+that send no signals.
+"""
+from . import counters, fuzzy, history, page_cache, tombstones
+
+
+def before_save(instance):
+    """Capture what the derived stores need to know about the stored row"""
+    # One read of the stored row, with the name fields the fuzzy index covers
+    stored = counters.stored_values(instance, extra=getattr(instance, 'FUZZY_FIELDS', ()))
+    return {
+        'counters': counters.stored_contributions(instance, stored),
+        'fuzzy': stored,
+        'history': stored,
+    }
+
+
+def after_save(instance, state):
+    """Update derived stores after ``instance`` was written"""
+    counters.record_saved(instance, state['counters'])
+    fuzzy.record_saved(instance, state['fuzzy'])
+    history.record_saved(instance, state['history'])
+
+
+def after_bulk_create(instances):
+    """Update derived stores for records inserted with ``bulk_create``"""
+    counters.records_created(instances)
+    fuzzy.records_created(instances)
+    if instances:
+        page_cache.invalidate(type(instances[0]))
+
+
+def before_queryset_update(queryset):
+    """Capture the state of records about to be changed with ``update()``
+
+    ``queryset`` must select the same rows before and after the update
+    (filter on primary keys, not on the columns being changed).
+    """
+    return {
+        'counters': counters.grouped_contributions(queryset),
+        'history': history.stored_statuses(queryset),
+    }
+
+
+def after_queryset_update(queryset, state):
+    """Update derived stores for records changed with ``update()``"""
+    counters.queryset_updated(queryset, state['counters'])
+    history.queryset_updated(queryset, state['history'])
+    page_cache.invalidate(queryset.model, using=queryset.db)
+
+
+def before_delete(instance):
+    """Update derived stores for a record about to be deleted"""
+    counters.record_deleted(instance)
+    fuzzy.record_deleted(instance)
+    tombstones.record_deleted(instance)
+
+
+def before_queryset_delete(queryset):
+    """Update derived stores for every record in a queryset about to be deleted"""
+    counters.queryset_deleted(queryset)
+    fuzzy.queryset_deleted(queryset)
+    tombstones.queryset_deleted(queryset)
@@ -0,0 +1,195 @@
+"""Bulk CSV import of records.
+
+Rows are read one at a time from a CSV file whose header names the form
+fields (the same headers :mod:`accounts.export` writes, so an export can be
+imported again). Each row is validated by the module's regular ModelForm, so
+``clean_phone_number``, ``clean_quantity`` and friends apply unchanged, and
+valid rows are written with ``bulk_create`` in batches, one transaction per
+batch. Invalid rows are reported with their line number and skipped. A
+file that is not UTF-8 text or not CSV is rejected as a whole, before the
+first batch is written, with :class:`InvalidImportFile`.
+
+Besides the form fields a file may carry:
+
+* ``timestamp`` and the closing timestamp (``resolved_at``/``returned_at``)
+  to keep the dates of historical records;
+* the owner column (``recorded_by``/``resolved_by``) as a username, when
+  the importing user may assign records to others.
+
+Columns the form does not know about (``id`` from an export) are ignored.
+"""
+import csv
+from collections import namedtuple
+
+from django import forms
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import hooks
+from .stats import dashboard_modules
+
+IMPORT_FORMS = {
+    'support': 'support_records.forms.SupportRecordForm',
+    'asset': 'asset_management.forms.AssetRecordForm',
+    'vendor': 'vendor_assistance.forms.VendorAssistanceForm',
+    'thermal': 'thermal_rolls.forms.ThermalRollRecordForm',
+}
+BATCH_SIZE = 1000
+
+RowError = namedtuple('RowError', ['line', 'messages'])
+
+
+class InvalidImportFile(ValueError):
+    """Raised when an import file cannot be read as UTF-8 CSV"""
+
+
+class ImportResult:
+    """Outcome of an import: rows written and rows rejected"""
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.imported = 0
+        self.errors = []
+
+    @property
+    def rejected(self):
+        return len(self.errors)
+
+
+def import_form_class(module):
+    """Return the validating form for ``module`` with the optional date columns"""
+    form_class = import_string(IMPORT_FORMS[module])
+    model = form_class._meta.model
+    date_fields = {'timestamp': forms.DateTimeField(required=False)}
+    closed_at = getattr(model, 'CLOSED_AT_FIELD', None)
+    if closed_at:
+        date_fields[closed_at] = forms.DateTimeField(required=False)
+    return type(f'{form_class.__name__}Import', (form_class,), date_fields)
+
+
+def import_columns(module):
+    """Return the column names an import file for ``module`` may use"""
+    form_class = import_form_class(module)
+    _, user_field = _module_model(module)
+    return list(form_class.base_fields) + [user_field]
+
+
+def _module_model(module):
+    for prefix, model, user_field in dashboard_modules():
+        if prefix == module:
+            return model, user_field
+    raise LookupError(f'Unknown record module "{module}"')
+
+
+class _Importer:
+    def __init__(self, module, user, allow_owner, dry_run):
+        self.model, self.user_field = _module_model(module)
+        self.form_class = import_form_class(module)
+        self.user = user
+        self.allow_owner = allow_owner
+        self.owners = {user.username: user}
+        self.now = timezone.now()
+        self.result = ImportResult(dry_run=dry_run)
+
+    def owner(self, username):
+        if not username:
+            return self.user
+        if username not in self.owners:
+            if not self.allow_owner:
+                raise forms.ValidationError('You can only import your own records')
+            owner = User.objects.filter(username=username).first()
+            if owner is None:
+                raise forms.ValidationError(f'Unknown user "{username}"')
+            self.owners[username] = owner
+        return self.owners[username]
+
+    def build(self, row):
+        """Return an unsaved record for a CSV row, or raise ValidationError"""
+        data = {}
+        for name, field in self.form_class.base_fields.items():
+            if name in row:
+                data[name] = row[name]
+            elif field.initial is not None:
+                data[name] = field.initial
+        form = self.form_class(data)
+        errors = {}
+        try:
+            owner = self.owner((row.get(self.user_field) or '').strip())
+        except forms.ValidationError as exc:
+            errors[self.user_field] = exc.messages
+        if not form.is_valid():
+            errors.update({field: list(messages) for field, messages in form.errors.items()})
+        if errors:
+            raise forms.ValidationError(errors)
+
+        record = form.save(commit=False)
+        setattr(record, self.user_field, owner)
+        if form.cleaned_data.get('timestamp'):
+            record.timestamp = form.cleaned_data['timestamp']
+        closed_at = getattr(self.model, 'CLOSED_AT_FIELD', None)
+        if closed_at:
+            setattr(record, closed_at, form.cleaned_data.get(closed_at))
+            # Same rule as save(): closing a record stamps when it happened
+            if record.status == self.model.CLOSED_STATUS and not getattr(record, closed_at):
+                setattr(record, closed_at, self.now)
+        return record
+
+    def flush(self, batch):
+        if batch and not self.result.dry_run:
+            with transaction.atomic():
+                created = self.model.objects.bulk_create(batch)
+                hooks.after_bulk_create(created)
+        self.result.imported += len(batch)
+
+    def run(self, rows, batch_size):
+        batch = []
+        for line, row in rows:
+            try:
+                batch.append(self.build(row))
+            except forms.ValidationError as exc:
+                self.result.errors.append(RowError(line, exc.message_dict))
+                continue
+            if len(batch) >= batch_size:
+                self.flush(batch)
+                batch = []
+        self.flush(batch)
+        return self.result
+
+
+def _check_file(text_file):
+    """Read ``text_file`` through once, then rewind it
+
+    Undecodable bytes or broken CSV raise :class:`InvalidImportFile` here,
+    not halfway through the import with earlier batches already committed.
+    """
+    reader = csv.reader(text_file)
+    try:
+        for _ in reader:
+            pass
+    except UnicodeDecodeError:
+        raise InvalidImportFile('The file is not UTF-8 text; save it as "CSV UTF-8" and try again')
+    except csv.Error as exc:
+        raise InvalidImportFile(f'Line {reader.line_num}: {exc}')
+    text_file.seek(0)
+
+
+def _csv_rows(text_file):
+    reader = csv.DictReader(text_file)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def import_records(module, text_file, user, allow_owner=False, dry_run=False, batch_size=BATCH_SIZE):
+    """Import ``module`` records from an open CSV text file
+
+    Records belong to ``user`` unless the file has an owner column and
+    ``allow_owner`` is set. With ``dry_run`` rows are validated but nothing
+    is written. Returns an :class:`ImportResult`; raises
+    :class:`InvalidImportFile` if the file cannot be read, with nothing
+    written. ``text_file`` must be seekable.
+    """
+    _check_file(text_file)
+    importer = _Importer(module, user, allow_owner, dry_run)
+    return importer.run(_csv_rows(text_file), batch_size)
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from accounts import archive
+
+
+class Command(BaseCommand):
+    help = 'Move records closed more than ARCHIVE_AFTER_MONTHS months ago to the archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months',
+            type=int,
+            help='Archive records closed more than this many months ago (default: ARCHIVE_AFTER_MONTHS)',
+        )
+        parser.add_argument(
+            '--module',
+            choices=[prefix for prefix, _, _, _ in archive.archived_modules()],
+            help='Only archive this module',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Records moved per transaction',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the records that would be archived',
+        )
+
+    def handle(self, *args, **options):
+        before = archive.cutoff(options['months'])
+        for prefix, model, _, _ in archive.archived_modules():
+            if options['module'] and prefix != options['module']:
+                continue
+            if options['dry_run']:
+                count = archive.archivable(model, before).count()
+                self.stdout.write(f'{prefix}: {count} record(s) closed before {before:%Y-%m-%d} would be archived')
+                continue
+            moved = archive.archive_records(model, before, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'{prefix}: archived {moved} record(s) closed before {before:%Y-%m-%d}'))
@@ -0,0 +1,62 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts import archive
+from accounts.export import EXPORT_FORMATS, stream_export
+from accounts.filters import filter_records
+from accounts.stats import dashboard_modules
+
+
+class Command(BaseCommand):
+    help = 'Stream records of one module as CSV or JSONL, with the list view filters'
+
+    def add_arguments(self, parser):
+        modules = [module for module, _, _ in dashboard_modules()]
+        parser.add_argument('module', choices=modules, help='Record module to export')
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv', help='Output format')
+        parser.add_argument('--search', default='', help='Search query, as in the list view')
+        parser.add_argument('--fuzzy', action='store_true', help='Match similar names instead of full-text search')
+        parser.add_argument('--status', default='', help='Only export records with this status')
+        parser.add_argument('--from', dest='date_from', default='', help='First day to export (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', default='', help='Last day to export (YYYY-MM-DD)')
+        parser.add_argument('--period', default='', help='today, week or month (overrides --from/--to)')
+        parser.add_argument('--user', help='Only export records belonging to this username')
+        parser.add_argument('--output', help='Write to this file instead of standard output')
+
+    def handle(self, *args, **options):
+        model, user_field = next(
+            (model, user_field) for module, model, user_field in dashboard_modules()
+            if module == options['module']
+        )
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f'Unknown user "{options["user"]}"')
+        params = {
+            'search': options['search'],
+            'match': 'fuzzy' if options['fuzzy'] else '',
+            'status': options['status'],
+            'from': options['date_from'],
+            'to': options['date_to'],
+            'period': options['period'],
+        }
+
+        # The archive is included when the date range reaches into it
+        querysets = []
+        for source in archive.list_sources(model, params):
+            records = source.objects.all()
+            if user is not None:
+                records = records.filter(**{user_field: user})
+            records, _ = filter_records(records, params)
+            querysets.append(records)
+
+        chunks = stream_export(querysets, options['format'])
+        if not options['output']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+            output.writelines(chunks)
+        self.stderr.write(self.style.SUCCESS(f'Exported {options["module"]} records to {options["output"]}'))
@@ -0,0 +1,38 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.importer import BATCH_SIZE, IMPORT_FORMS, InvalidImportFile, import_records
+
+
+class Command(BaseCommand):
+    help = 'Import records of one module from a CSV file, validating every row'
+
+    def add_arguments(self, parser):
+        parser.add_argument('module', choices=sorted(IMPORT_FORMS), help='Record module to import into')
+        parser.add_argument('path', help='CSV file with a header row of field names')
+        parser.add_argument('--user', required=True, help='Username owning rows without an owner column')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Rows written per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the file without saving anything')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f'Unknown user "{options["user"]}"')
+
+        with open(options['path'], newline='', encoding='utf-8-sig') as csv_file:
+            try:
+                result = import_records(
+                    options['module'], csv_file, user, allow_owner=True,
+                    dry_run=options['dry_run'], batch_size=options['batch_size'],
+                )
+            except InvalidImportFile as exc:
+                raise CommandError(str(exc))
+
+        for line, messages in result.errors:
+            for field, errors in messages.items():
+                self.stdout.write(self.style.WARNING(f'Line {line}: {field}: {" ".join(errors)}'))
+        verb = 'Validated' if result.dry_run else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {result.imported} record(s), rejected {result.rejected} row(s)'
+        ))
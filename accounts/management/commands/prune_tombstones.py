@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from accounts import tombstones
+
+
+class Command(BaseCommand):
+    help = 'Delete record tombstones older than SYNC_TOMBSTONE_DAYS'
+
+    def handle(self, *args, **options):
+        deleted = tombstones.prune()
+        self.stdout.write(self.style.SUCCESS(f'Pruned {deleted} tombstone(s)'))
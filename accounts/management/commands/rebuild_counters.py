@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts import counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the dashboard record counters from the record tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report counters that differ from the record tables',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            mismatches = counters.check()
+            for (module, user_id, status, day), stored, expected in mismatches:
+                self.stdout.write(self.style.WARNING(
+                    f'{module} user={user_id} status={status or "-"} day={day}: '
+                    f'stored {stored}, expected {expected}'
+                ))
+            if mismatches:
+                raise CommandError(
+                    f'{len(mismatches)} counter bucket(s) are out of date. '
+                    f'Run "rebuild_counters" to fix them.'
+                )
+            self.stdout.write(self.style.SUCCESS('Record counters are consistent'))
+            return
+
+        written = counters.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} record counter bucket(s)'))
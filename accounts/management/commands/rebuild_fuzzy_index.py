@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from accounts import fuzzy
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the trigram index used for fuzzy name matching (non-PostgreSQL databases)'
+
+    def handle(self, *args, **options):
+        if fuzzy.uses_pg_trgm():
+            self.stdout.write('PostgreSQL keeps its pg_trgm indexes up to date; nothing to rebuild')
+            return
+        written = fuzzy.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} trigram index entr{"y" if written == 1 else "ies"}'))
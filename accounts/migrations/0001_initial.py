@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-17 09:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecordCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('module', models.CharField(choices=[('support', 'Support Records'), ('asset', 'Asset Records'), ('vendor', 'Vendor Assistance'), ('thermal', 'Thermal Rolls')], help_text='Record module', max_length=20)),
+                ('status', models.CharField(blank=True, help_text='Record status (blank for modules without one)', max_length=20)),
+                ('day', models.DateField(help_text='Day the records were recorded')),
+                ('count', models.IntegerField(default=0, help_text='Number of records in this bucket')),
+                ('user', models.ForeignKey(help_text='ICT staff the records belong to', on_delete=django.db.models.deletion.CASCADE, related_name='record_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Record Counter',
+                'verbose_name_plural': 'Record Counters',
+                'indexes': [models.Index(fields=['module', 'day'], name='accounts_re_module_7809b4_idx')],
+                'constraints': [models.UniqueConstraint(fields=('module', 'user', 'status', 'day'), name='unique_record_counter_bucket')],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+# (module, app_label, model_name, user_field, has_status)
+RECORD_MODELS = [
+    ('support', 'support_records', 'SupportRecord', 'recorded_by', True),
+    ('asset', 'asset_management', 'AssetRecord', 'recorded_by', True),
+    ('vendor', 'vendor_assistance', 'VendorAssistance', 'resolved_by', True),
+    ('thermal', 'thermal_rolls', 'ThermalRollRecord', 'recorded_by', False),
+]
+
+
+def populate_counters(apps, schema_editor):
+    """Fill the counters table from records that already exist"""
+    RecordCounter = apps.get_model('accounts', 'RecordCounter')
+    RecordCounter.objects.all().delete()
+
+    for module, app_label, model_name, user_field, has_status in RECORD_MODELS:
+        model = apps.get_model(app_label, model_name)
+        fields = [user_field, 'day'] + (['status'] if has_status else [])
+        rows = (
+            model.objects.order_by()
+            .annotate(day=TruncDate('timestamp'))
+            .values(*fields)
+            .annotate(total=Count('pk'))
+        )
+        RecordCounter.objects.bulk_create([
+            RecordCounter(
+                module=module,
+                user_id=row[user_field],
+                status=row['status'] if has_status else '',
+                day=row['day'],
+                count=row['total'],
+            )
+            for row in rows
+        ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('support_records', '0001_initial'),
+        ('asset_management', '0001_initial'),
+        ('vendor_assistance', '0001_initial'),
+        ('thermal_rolls', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
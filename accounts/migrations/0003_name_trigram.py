@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_populate_record_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NameTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(help_text='Record model label (app_label.model)', max_length=100)),
+                ('field', models.CharField(help_text='Indexed name field', max_length=50)),
+                ('record_id', models.BigIntegerField(help_text='Primary key of the record')),
+                ('gram', models.CharField(help_text='Trigram of the padded, lowercased value', max_length=3)),
+                ('total', models.PositiveSmallIntegerField(help_text='Number of distinct trigrams in the value')),
+            ],
+            options={
+                'verbose_name': 'Name Trigram',
+                'verbose_name_plural': 'Name Trigrams',
+                'indexes': [models.Index(fields=['model', 'gram'], name='accounts_na_model_d342ea_idx'), models.Index(fields=['model', 'record_id'], name='accounts_na_model_046901_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:42
+
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+
+
+# (module, app_label, model_name, user_field, closed_at_field, quantity_field)
+RECORD_MODELS = [
+    ('support', 'support_records', 'SupportRecord', 'recorded_by', 'resolved_at', None),
+    ('asset', 'asset_management', 'AssetRecord', 'recorded_by', 'returned_at', None),
+    ('vendor', 'vendor_assistance', 'VendorAssistance', 'resolved_by', 'resolved_at', None),
+    ('thermal', 'thermal_rolls', 'ThermalRollRecord', 'recorded_by', None, 'quantity'),
+]
+
+
+def populate_closed_and_quantity(apps, schema_editor):
+    """Fill the new sums from records that already exist"""
+    RecordCounter = apps.get_model('accounts', 'RecordCounter')
+
+    for module, app_label, model_name, user_field, closed_at, quantity in RECORD_MODELS:
+        model = apps.get_model(app_label, model_name)
+        status = ['status'] if closed_at else []
+        if quantity:
+            rows = (
+                model.objects.order_by()
+                .annotate(day=TruncDate('timestamp'))
+                .values(user_field, 'day', *status)
+                .annotate(total=Sum(quantity))
+            )
+            field = 'quantity'
+        else:
+            rows = (
+                model.objects.order_by()
+                .filter(**{f'{closed_at}__isnull': False})
+                .annotate(day=TruncDate(closed_at))
+                .values(user_field, 'day', *status)
+                .annotate(total=Count('pk'))
+            )
+            field = 'closed'
+        for row in rows:
+            counter, _ = RecordCounter.objects.get_or_create(
+                module=module, user_id=row[user_field], status=row.get('status', ''), day=row['day']
+            )
+            RecordCounter.objects.filter(pk=counter.pk).update(**{field: F(field) + row['total']})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_name_trigram'),
+        ('support_records', '0001_initial'),
+        ('asset_management', '0001_initial'),
+        ('vendor_assistance', '0001_initial'),
+        ('thermal_rolls', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recordcounter',
+            name='closed',
+            field=models.IntegerField(default=0, help_text='Number of records closed (solved/returned/resolved) on this day'),
+        ),
+        migrations.AddField(
+            model_name='recordcounter',
+            name='quantity',
+            field=models.IntegerField(default=0, help_text='Thermal rolls recorded on this day'),
+        ),
+        migrations.AlterField(
+            model_name='recordcounter',
+            name='count',
+            field=models.IntegerField(default=0, help_text='Number of records recorded on this day'),
+        ),
+        migrations.RunPython(populate_closed_and_quantity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_record_counter_closed_quantity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(help_text='Record model label (app_label.model)', max_length=100)),
+                ('record_id', models.BigIntegerField(help_text='Primary key of the record')),
+                ('from_status', models.CharField(help_text='Status before the change', max_length=20)),
+                ('to_status', models.CharField(help_text='Status after the change', max_length=20)),
+                ('entered_at', models.DateTimeField(help_text='When the record entered the previous status')),
+                ('changed_at', models.DateTimeField(help_text='When the status changed')),
+            ],
+            options={
+                'verbose_name': 'Status Transition',
+                'verbose_name_plural': 'Status Transitions',
+                'indexes': [models.Index(fields=['model', 'record_id', 'changed_at'], name='accounts_st_model_2e31c4_idx'), models.Index(fields=['model', 'from_status', 'changed_at'], name='accounts_st_model_06174c_idx')],
+            },
+        ),
+    ]
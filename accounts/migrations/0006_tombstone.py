@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_status_transition'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(help_text='Record model label (app_label.model)', max_length=100)),
+                ('record_id', models.BigIntegerField(help_text='Primary key of the deleted record')),
+                ('owner_id', models.BigIntegerField(help_text='User who owned the record')),
+                ('deleted_at', models.DateTimeField(help_text='When the record was deleted')),
+            ],
+            options={
+                'verbose_name': 'Tombstone',
+                'verbose_name_plural': 'Tombstones',
+                'indexes': [models.Index(fields=['model', 'deleted_at'], name='accounts_to_model_8506ed_idx'), models.Index(fields=['model', 'owner_id', 'deleted_at'], name='accounts_to_model_06798d_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,126 @@
 from django.db import models
+from django.contrib.auth.models import User
 
-# Create your models here.
+
+class RecordCounter(models.Model):
+    """Daily rollup of records per module, user, status and day
+
+    Rows are adjusted incrementally whenever a record is saved or deleted so
+    the dashboard and reports can read totals without scanning the record
+    tables (see :mod:`accounts.counters`).
+    """
+
+    MODULE_CHOICES = [
+        ('support', 'Support Records'),
+        ('asset', 'Asset Records'),
+        ('vendor', 'Vendor Assistance'),
+        ('thermal', 'Thermal Rolls'),
+    ]
+
+    module = models.CharField(max_length=20, choices=MODULE_CHOICES, help_text="Record module")
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='record_counters',
+        help_text="ICT staff the records belong to"
+    )
+    status = models.CharField(max_length=20, blank=True, help_text="Record status (blank for modules without one)")
+    day = models.DateField(help_text="Day the records were recorded")
+    count = models.IntegerField(default=0, help_text="Number of records recorded on this day")
+    closed = models.IntegerField(default=0, help_text="Number of records closed (solved/returned/resolved) on this day")
+    quantity = models.IntegerField(default=0, help_text="Thermal rolls recorded on this day")
+
+    class Meta:
+        verbose_name = "Record Counter"
+        verbose_name_plural = "Record Counters"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['module', 'user', 'status', 'day'],
+                name='unique_record_counter_bucket',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['module', 'day']),
+        ]
+
+    def __str__(self):
+        return f"{self.module} {self.status or '-'} {self.day}: {self.count}"
+
+
+class NameTrigram(models.Model):
+    """Trigram index entry for fuzzy name matching on SQLite
+
+    One row per distinct trigram of a record's name field. PostgreSQL uses
+    ``pg_trgm`` GIN indexes instead and leaves this table empty.
+    """
+
+    model = models.CharField(max_length=100, help_text="Record model label (app_label.model)")
+    field = models.CharField(max_length=50, help_text="Indexed name field")
+    record_id = models.BigIntegerField(help_text="Primary key of the record")
+    gram = models.CharField(max_length=3, help_text="Trigram of the padded, lowercased value")
+    total = models.PositiveSmallIntegerField(help_text="Number of distinct trigrams in the value")
+
+    class Meta:
+        verbose_name = "Name Trigram"
+        verbose_name_plural = "Name Trigrams"
+        indexes = [
+            models.Index(fields=['model', 'gram']),
+            models.Index(fields=['model', 'record_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.model}.{self.field}#{self.record_id}: {self.gram!r}"
+
+
+class StatusTransition(models.Model):
+    """One status change of a record, appended whenever the status changes
+
+    ``entered_at`` is when the record entered ``from_status`` (its previous
+    transition, or its ``timestamp`` if it never changed before), so the
+    time spent in a status is ``changed_at - entered_at`` on a single row
+    (see :mod:`accounts.history`). Rows are never updated.
+    """
+
+    model = models.CharField(max_length=100, help_text="Record model label (app_label.model)")
+    record_id = models.BigIntegerField(help_text="Primary key of the record")
+    from_status = models.CharField(max_length=20, help_text="Status before the change")
+    to_status = models.CharField(max_length=20, help_text="Status after the change")
+    entered_at = models.DateTimeField(help_text="When the record entered the previous status")
+    changed_at = models.DateTimeField(help_text="When the status changed")
+
+    class Meta:
+        verbose_name = "Status Transition"
+        verbose_name_plural = "Status Transitions"
+        indexes = [
+            models.Index(fields=['model', 'record_id', 'changed_at']),
+            models.Index(fields=['model', 'from_status', 'changed_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.model}#{self.record_id}: {self.from_status} -> {self.to_status} at {self.changed_at}"
+
+
+class Tombstone(models.Model):
+    """Marker left behind by a deleted record for the sync feed
+
+    Offline clients learn about deletes from these rows (see
+    :mod:`api.sync`). ``owner_id`` keeps the record's owner so the feed can
+    scope deletes by role like the records themselves. Rows older than
+    ``SYNC_TOMBSTONE_DAYS`` are removed by ``prune_tombstones``.
+    """
+
+    model = models.CharField(max_length=100, help_text="Record model label (app_label.model)")
+    record_id = models.BigIntegerField(help_text="Primary key of the deleted record")
+    owner_id = models.BigIntegerField(help_text="User who owned the record")
+    deleted_at = models.DateTimeField(help_text="When the record was deleted")
+
+    class Meta:
+        verbose_name = "Tombstone"
+        verbose_name_plural = "Tombstones"
+        indexes = [
+            models.Index(fields=['model', 'deleted_at']),
+            models.Index(fields=['model', 'owner_id', 'deleted_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.model}#{self.record_id} deleted at {self.deleted_at}"
@@ -0,0 +1,125 @@
+"""Caching of the dashboard and record list pages.
+
+Cached entries are keyed on a version number per record model. Every write
+to a record model bumps its version, from the ``post_save``/``post_delete``
+receivers in :mod:`accounts.signals` and from :mod:`accounts.hooks` for the
+bulk paths that send no signals (``bulk_create`` and ``update()``), so a
+changed model simply stops matching its old entries; nothing is deleted.
+Versions are bumped again when the transaction commits so a page rendered
+from uncommitted data is not kept.
+
+Entries are cached per role scope: admins share one copy, other users get
+their own (they only see their own records). ``PAGE_CACHE_TIMEOUT`` bounds
+how long an entry lives; ``0`` disables page caching. Async views use
+:func:`acached`, over the cache's async API.
+
+Versions live in the cache backend, so a bump only reaches the workers
+sharing it. With the per-process local-memory backend, the other workers
+would keep serving pages from before a write until the timeout; page caching
+is therefore off by default there and only on with a shared backend (``file``
+or ``redis``, see ``CACHE_BACKEND``).
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.functional import SimpleLazyObject
+
+from .pagination import paginate_records
+
+DEFAULT_TIMEOUT = 0
+
+
+def timeout():
+    return getattr(settings, 'PAGE_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def version_key(model):
+    return f'page_cache:version:{model._meta.label_lower}'
+
+
+def versions(models):
+    """Return the current version of each model, as one string"""
+    keys = [version_key(model) for model in models]
+    current = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in current}
+    if missing:
+        # Start from the clock so a lost counter never reuses an old version
+        cache.set_many(missing, None)
+        current.update(missing)
+    return '.'.join(str(current[key]) for key in keys)
+
+
+async def aversions(models):
+    """Async :func:`versions`"""
+    keys = [version_key(model) for model in models]
+    current = await cache.aget_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in current}
+    if missing:
+        await cache.aset_many(missing, None)
+        current.update(missing)
+    return '.'.join(str(current[key]) for key in keys)
+
+
+def _bump(model):
+    key = version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def invalidate(model, using='default'):
+    """Retire every cached page built from ``model`` records"""
+    _bump(model)
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(lambda: _bump(model), using=using)
+
+
+def scope(user, is_admin):
+    """Cache scope for a user: shared by admins, per user otherwise"""
+    return 'admin' if is_admin else f'user-{user.pk}'
+
+
+def cached(name, models, user, is_admin, build):
+    """Return ``build()``, cached until one of ``models`` changes"""
+    if not timeout():
+        return build()
+    key = f'page_cache:{name}:{scope(user, is_admin)}:{versions(models)}'
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, timeout())
+    return value
+
+
+async def acached(name, models, user, is_admin, build):
+    """Async :func:`cached`: return ``await build()``, cached until one of ``models`` changes"""
+    if not timeout():
+        return await build()
+    key = f'page_cache:{name}:{scope(user, is_admin)}:{await aversions(models)}'
+    value = await cache.aget(key)
+    if value is None:
+        value = await build()
+        await cache.aset(key, value, timeout())
+    return value
+
+
+def list_cache_key(request, model, is_admin):
+    """Fragment cache key for one record list page (``{% cache %}`` vary_on)
+
+    Covers the role scope, the model version and the query string (filters,
+    page, cursor), so each distinct page is cached separately.
+    """
+    return f'{scope(request.user, is_admin)}:{versions([model])}:{request.GET.urlencode()}'
+
+
+def lazy_page(request, queryset, per_page):
+    """Return ``(page_obj, records)`` evaluated only if the page is rendered
+
+    A list page served from the fragment cache never touches them, so it
+    costs no record queries at all.
+    """
+    page_obj = SimpleLazyObject(lambda: paginate_records(request, queryset, per_page))
+    return page_obj, SimpleLazyObject(lambda: page_obj.object_list)
@@ -0,0 +1,169 @@
+"""Pagination helpers shared by the record list views.
+
+Record lists support two modes:
+
+* offset pagination (``?page=N``) using Django's :class:`Paginator`;
+* keyset pagination (``?paginate=cursor`` / ``?cursor=<token>``) keyed on
+  ``(timestamp, pk)`` so deep pages cost the same as the first one. Adding
+  ``count=0`` skips the ``COUNT(*)`` query for the total.
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.core.paginator import Paginator
+from django.db.models import Q, QuerySet
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token cannot be decoded"""
+
+
+def encode_cursor(record, direction):
+    """Return an opaque token pointing just past ``record``
+
+    ``record`` is a model instance or a ``values()`` row with ``timestamp``
+    and ``pk`` keys.
+    """
+    if isinstance(record, dict):
+        timestamp, pk = record['timestamp'], record['pk']
+    else:
+        timestamp, pk = record.timestamp, record.pk
+    payload = json.dumps({
+        't': timestamp.isoformat(),
+        'pk': pk,
+        'd': direction,
+    }, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return ``(timestamp, pk, direction)`` from a cursor token"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction = payload['d']
+        if direction not in ('n', 'p'):
+            raise ValueError(direction)
+        return datetime.fromisoformat(payload['t']), int(payload['pk']), direction
+    except (ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursor(token) from exc
+
+
+class CursorPage:
+    """One page of records returned by :class:`CursorPaginator`"""
+
+    is_cursor_page = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next or not self.object_list:
+            return None
+        return encode_cursor(self.object_list[-1], 'n')
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous or not self.object_list:
+            return None
+        return encode_cursor(self.object_list[0], 'p')
+
+
+class CursorPaginator:
+    """Keyset paginator over a queryset ordered by ``(-timestamp, -pk)``"""
+
+    def __init__(self, queryset, per_page, with_count=True):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.with_count = with_count
+        self._count = None
+
+    @property
+    def count(self):
+        """Total number of records, or None when counting is disabled"""
+        if not self.with_count:
+            return None
+        if self._count is None:
+            self._count = self.queryset.count()
+        return self._count
+
+    def _slice(self, timestamp, pk, direction):
+        queryset = self.queryset
+        if direction == 'p':
+            if timestamp is not None:
+                queryset = queryset.filter(
+                    Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, pk__gt=pk)
+                )
+            return queryset.order_by('timestamp', 'pk')
+        if timestamp is not None:
+            queryset = queryset.filter(
+                Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, pk__lt=pk)
+            )
+        return queryset.order_by('-timestamp', '-pk')
+
+    def page(self, cursor=None):
+        """Return the page after (or before) ``cursor``; the first page if None"""
+        timestamp = pk = None
+        direction = 'n'
+        if cursor:
+            timestamp, pk, direction = decode_cursor(cursor)
+
+        rows = list(self._slice(timestamp, pk, direction)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if direction == 'p':
+            rows.reverse()
+            return CursorPage(rows, self, has_next=True, has_previous=has_more)
+        return CursorPage(rows, self, has_next=has_more, has_previous=timestamp is not None)
+
+    def get_page(self, cursor=None):
+        """Like :meth:`page` but falls back to the first page on a bad cursor"""
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page(None)
+
+    def iter_pages(self):
+        """Yield every page in order, walking the keyset from the start"""
+        page = self.page(None)
+        while True:
+            yield page
+            if not page.has_next():
+                return
+            page = self.page(page.next_cursor)
+
+
+def paginate_records(request, queryset, per_page=10):
+    """Paginate a record queryset in the mode requested by the query string
+
+    Records merged from several tables (a live table and its archive) are
+    always paginated by offset: keyset pagination needs one queryset.
+    """
+    wants_cursor = request.GET.get('cursor') or request.GET.get('paginate') == 'cursor'
+    if wants_cursor and isinstance(queryset, QuerySet):
+        paginator = CursorPaginator(
+            queryset, per_page, with_count=request.GET.get('count') != '0'
+        )
+        return paginator.get_page(request.GET.get('cursor'))
+    return Paginator(queryset, per_page).get_page(request.GET.get('page'))
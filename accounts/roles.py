@@ -0,0 +1,81 @@
+"""Role resolution shared by every view, admin class and template.
+
+A user's group names are loaded once per request (memoized on the user
+object) and, with ``ROLE_CACHE_TIMEOUT`` set, cached across requests in the
+configured cache backend for that many seconds. Group membership changes
+invalidate the cache through the receivers in :mod:`accounts.signals`.
+Local-memory caches are per process, so other workers would keep granting a
+revoked role until the timeout: the setting therefore defaults to 0 (no
+cross-request cache) unless a shared cache backend is configured.
+
+Async views use the ``a``-prefixed variants, which share the same cache.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+ADMIN_GROUP = 'Admin'
+
+
+def cache_key(user_id):
+    return f'accounts:group_names:{user_id}'
+
+
+def timeout():
+    return getattr(settings, 'ROLE_CACHE_TIMEOUT', 0)
+
+
+def group_names(user):
+    """Return the names of the user's groups ordered by group id"""
+    if user is None or not user.is_authenticated:
+        return ()
+    names = getattr(user, '_group_names', None)
+    if names is None:
+        key = cache_key(user.pk)
+        names = cache.get(key) if timeout() else None
+        if names is None:
+            names = tuple(user.groups.order_by('pk').values_list('name', flat=True))
+            if timeout():
+                cache.set(key, names, timeout())
+        user._group_names = names
+    return names
+
+
+async def agroup_names(user):
+    """Async :func:`group_names`"""
+    if user is None or not user.is_authenticated:
+        return ()
+    names = getattr(user, '_group_names', None)
+    if names is None:
+        key = cache_key(user.pk)
+        names = await cache.aget(key) if timeout() else None
+        if names is None:
+            names = tuple([name async for name in user.groups.order_by('pk').values_list('name', flat=True)])
+            if timeout():
+                await cache.aset(key, names, timeout())
+        user._group_names = names
+    return names
+
+
+def user_is_admin(user):
+    """Check if user is in Admin group"""
+    return ADMIN_GROUP in group_names(user)
+
+
+async def auser_is_admin(user):
+    """Async :func:`user_is_admin`"""
+    return ADMIN_GROUP in await agroup_names(user)
+
+
+async def arequest_user(request):
+    """Return the user of an async view's request
+
+    Also stores it as ``request.user``: the lazy default may not query the
+    database from async code, and templates and context processors read it.
+    """
+    request.user = await request.auser()
+    return request.user
+
+
+def invalidate(user_ids):
+    """Forget cached group names for the given user ids"""
+    cache.delete_many([cache_key(user_id) for user_id in user_ids])
@@ -0,0 +1,278 @@
+"""Full-text search for the record list views and admin.
+
+Each searchable record model lists its indexed columns in ``SEARCH_FIELDS``.
+The database keeps the index in step with every write on its own, so saves,
+bulk inserts, ``update()`` and deletes are all covered:
+
+* PostgreSQL: a generated ``search_vector`` tsvector column with a GIN
+  index; matches are ranked with ``ts_rank``.
+* SQLite: an external-content FTS5 table (``<table>_fts``) maintained by
+  triggers.
+* Any other database falls back to ``icontains`` lookups.
+
+The index objects are created by the :class:`CreateSearchIndex` migration
+operation. Models with ``SEARCH_INDEX = False`` (the record archives) have
+none and always use ``icontains``. Search terms match whole words or word prefixes, so ``jo sm``
+finds "John Smith". ``RECORD_SEARCH_BACKEND = 'basic'`` forces the
+``icontains`` fallback everywhere.
+"""
+import heapq
+import re
+from functools import reduce
+from itertools import islice
+from operator import or_
+
+from django.conf import settings
+from django.db import connections
+from django.db.migrations.operations.base import Operation
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'simple'
+VECTOR_COLUMN = 'search_vector'
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_tokens(query):
+    """Split a user search string into index tokens"""
+    return _TOKEN_RE.findall(query or '')
+
+
+def fts_table(table):
+    return f'{table}_fts'
+
+
+def _fts_triggers(table):
+    return [f'{table}_fts_ai', f'{table}_fts_ad', f'{table}_fts_au']
+
+
+def backend_name(using='default'):
+    """Return 'postgresql', 'sqlite' or 'basic' for a database alias"""
+    if getattr(settings, 'RECORD_SEARCH_BACKEND', 'auto') == 'basic':
+        return 'basic'
+    vendor = connections[using].vendor
+    if vendor in ('postgresql', 'sqlite'):
+        return vendor
+    return 'basic'
+
+
+def basic_search(queryset, query, fields):
+    """Filter with ``icontains`` on every field (no index support)"""
+    return queryset.filter(reduce(or_, (Q(**{f'{field}__icontains': query}) for field in fields)))
+
+
+def search_records(queryset, query, order_by_rank=False):
+    """Filter a record queryset to rows matching ``query``
+
+    Adds a ``search_rank`` annotation on PostgreSQL. With
+    ``order_by_rank`` the best matches come first there; other backends keep
+    the queryset's own ordering.
+    """
+    model = queryset.model
+    fields = model.SEARCH_FIELDS
+    tokens = search_tokens(query)
+    using = queryset.db
+    backend = backend_name(using)
+    if not tokens or backend == 'basic' or not getattr(model, 'SEARCH_INDEX', True):
+        return basic_search(queryset, query, fields)
+
+    qn = connections[using].ops.quote_name
+    table = model._meta.db_table
+
+    if backend == 'postgresql':
+        tsquery = ' & '.join(f'{token}:*' for token in tokens)
+        column = f'{qn(table)}.{qn(VECTOR_COLUMN)}'
+        queryset = queryset.filter(
+            RawSQL(f'{column} @@ to_tsquery(%s, %s)', [SEARCH_CONFIG, tsquery], output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(
+                f'ts_rank({column}, to_tsquery(%s, %s))', [SEARCH_CONFIG, tsquery],
+                output_field=FloatField(),
+            ),
+        )
+        if order_by_rank:
+            queryset = queryset.order_by('-search_rank', '-timestamp', '-pk')
+        return queryset
+
+    match = ' '.join(f'"{token}"*' for token in tokens)
+    fts = qn(fts_table(table))
+    return queryset.filter(
+        pk__in=RawSQL(f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', [match])
+    )
+
+
+def _result_key(record):
+    return (getattr(record, 'search_rank', None) or 0.0, record.timestamp, record.pk)
+
+
+class MergedSearchResults:
+    """Sequence of search hits merged across several record querysets
+
+    Results are ordered by relevance (PostgreSQL only) and then newest first.
+    Slicing ``[start:stop]`` pulls at most ``stop`` rows from each queryset
+    and merges them lazily with a heap, so a page never loads whole result
+    sets. Works with :class:`django.core.paginator.Paginator`.
+    """
+
+    def __init__(self, querysets):
+        self.querysets = [
+            queryset.order_by(
+                *(['-search_rank'] if 'search_rank' in queryset.query.annotations else []),
+                '-timestamp', '-pk',
+            )
+            for queryset in querysets
+        ]
+
+    def count(self):
+        return sum(queryset.count() for queryset in self.querysets)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice) or key.step not in (None, 1):
+            raise TypeError('MergedSearchResults only supports contiguous slices')
+        start, stop = key.start or 0, key.stop
+        if stop is None or start < 0 or stop < 0:
+            raise ValueError('MergedSearchResults needs a bounded, non-negative slice')
+        streams = [queryset[:stop].iterator(chunk_size=max(stop, 1)) for queryset in self.querysets]
+        merged = heapq.merge(*streams, key=_result_key, reverse=True)
+        return list(islice(merged, start, stop))
+
+
+def _postgres_install(schema_editor, table, fields):
+    qn = schema_editor.quote_name
+    document = " || ' ' || ".join(f"coalesce({qn(field)}, '')" for field in fields)
+    schema_editor.execute(
+        f'ALTER TABLE {qn(table)} ADD COLUMN IF NOT EXISTS {qn(VECTOR_COLUMN)} tsvector '
+        f"GENERATED ALWAYS AS (to_tsvector('{SEARCH_CONFIG}', {document})) STORED"
+    )
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {qn(table + "_search_gin")} '
+        f'ON {qn(table)} USING gin ({qn(VECTOR_COLUMN)})'
+    )
+
+
+def _sqlite_install_triggers(schema_editor, table, fields):
+    qn = schema_editor.quote_name
+    fts = fts_table(table)
+    columns = ', '.join(qn(field) for field in fields)
+    new_values = ', '.join(f'new.{qn(field)}' for field in fields)
+    old_values = ', '.join(f'old.{qn(field)}' for field in fields)
+    insert_trigger, delete_trigger, update_trigger = _fts_triggers(table)
+
+    for trigger in _fts_triggers(table):
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {qn(trigger)}')
+    schema_editor.execute(
+        f'CREATE TRIGGER {qn(insert_trigger)} AFTER INSERT ON {qn(table)} BEGIN '
+        f'INSERT INTO {qn(fts)}(rowid, {columns}) VALUES (new.id, {new_values}); END'
+    )
+    schema_editor.execute(
+        f'CREATE TRIGGER {qn(delete_trigger)} AFTER DELETE ON {qn(table)} BEGIN '
+        f"INSERT INTO {qn(fts)}({qn(fts)}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END"
+    )
+    schema_editor.execute(
+        f'CREATE TRIGGER {qn(update_trigger)} AFTER UPDATE ON {qn(table)} BEGIN '
+        f"INSERT INTO {qn(fts)}({qn(fts)}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+        f'INSERT INTO {qn(fts)}(rowid, {columns}) VALUES (new.id, {new_values}); END'
+    )
+    schema_editor.execute(f"INSERT INTO {qn(fts)}({qn(fts)}) VALUES ('rebuild')")
+
+
+def _sqlite_install(schema_editor, table, fields):
+    qn = schema_editor.quote_name
+    columns = ', '.join(qn(field) for field in fields)
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {qn(fts_table(table))} USING fts5('
+        f"{columns}, content='{table}', content_rowid='id', tokenize='unicode61')"
+    )
+    _sqlite_install_triggers(schema_editor, table, fields)
+
+
+def install_search_index(schema_editor, table, fields):
+    """Create the full-text index objects for ``table``"""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _postgres_install(schema_editor, table, fields)
+    elif vendor == 'sqlite':
+        _sqlite_install(schema_editor, table, fields)
+
+
+def drop_search_index(schema_editor, table):
+    """Remove the full-text index objects for ``table``"""
+    qn = schema_editor.quote_name
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {qn(table + "_search_gin")}')
+        schema_editor.execute(f'ALTER TABLE {qn(table)} DROP COLUMN IF EXISTS {qn(VECTOR_COLUMN)}')
+    elif vendor == 'sqlite':
+        for trigger in _fts_triggers(table):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {qn(trigger)}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {qn(fts_table(table))}')
+
+
+class CreateSearchIndex(Operation):
+    """Migration operation creating the full-text index for a model"""
+
+    reversible = True
+    reduces_to_sql = False
+
+    def __init__(self, model_name, fields):
+        self.model_name = model_name
+        self.fields = list(fields)
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            install_search_index(schema_editor, model._meta.db_table, self.fields)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            drop_search_index(schema_editor, model._meta.db_table)
+
+    def describe(self):
+        return f'Create full-text search index for {self.model_name}'
+
+    @property
+    def migration_name_fragment(self):
+        return f'{self.model_name.lower()}_search_index'
+
+    def deconstruct(self):
+        return (self.__class__.__qualname__, [self.model_name, self.fields], {})
+
+
+def searchable_models():
+    from django.apps import apps
+
+    return [
+        model for model in apps.get_models()
+        if getattr(model, 'SEARCH_FIELDS', None) and getattr(model, 'SEARCH_INDEX', True)
+    ]
+
+
+def repair_sqlite_triggers(using='default', **kwargs):
+    """Re-create FTS triggers dropped when SQLite rebuilt a record table
+
+    SQLite migrations that alter a table copy it to a new one, which drops
+    its triggers. Runs after ``migrate`` (``post_migrate``) and only touches
+    tables whose FTS table exists but whose triggers are missing.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = {row[0] for row in cursor.fetchall()}
+    for model in searchable_models():
+        table = model._meta.db_table
+        if fts_table(table) not in existing:
+            continue
+        if all(trigger in existing for trigger in _fts_triggers(table)):
+            continue
+        with connection.schema_editor() as schema_editor:
+            _sqlite_install_triggers(schema_editor, table, model.SEARCH_FIELDS)
@@ -0,0 +1,61 @@
+"""Signal receivers that keep cached role information and pages up to date."""
+from django.contrib.auth.models import Group, User
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import page_cache, roles
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def group_membership_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalidate users whose group membership changed"""
+    if action not in ('post_add', 'post_remove', 'pre_clear', 'post_clear'):
+        return
+    if not reverse:
+        # user.groups.add(...) / remove(...) / clear()
+        roles.invalidate([instance.pk])
+    elif action == 'pre_clear':
+        # group.user_set.clear(): the members are only known before clearing
+        roles.invalidate(instance.user_set.values_list('pk', flat=True))
+    elif pk_set:
+        roles.invalidate(pk_set)
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, **kwargs):
+    """Invalidate members of a renamed group"""
+    if not created:
+        roles.invalidate(instance.user_set.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    """Invalidate members of a group that is about to disappear"""
+    roles.invalidate(instance.user_set.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=User)
+def user_created(sender, instance, created, **kwargs):
+    """Start new users afresh in case their id was used before"""
+    if created:
+        roles.invalidate([instance.pk])
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    """Drop cached roles of deleted users"""
+    roles.invalidate([instance.pk])
+
+
+def record_changed(sender, **kwargs):
+    """Retire cached pages showing records of the saved or deleted model"""
+    page_cache.invalidate(sender, using=kwargs.get('using') or 'default')
+
+
+def connect_record_receivers():
+    """Connect :func:`record_changed` to every record model"""
+    from .stats import dashboard_modules
+
+    for _, model, _ in dashboard_modules():
+        post_save.connect(record_changed, sender=model, dispatch_uid=f'page_cache_save_{model._meta.label_lower}')
+        post_delete.connect(record_changed, sender=model, dispatch_uid=f'page_cache_delete_{model._meta.label_lower}')
@@ -0,0 +1,163 @@
+"""Dashboard statistics for the four record modules.
+
+Every per-module figure shown on the dashboard (total, per-status counts and
+"this week" count) is computed either from the materialized
+:class:`accounts.models.RecordCounter` rows (one query in total) or with a
+single conditional-aggregate query per record model. ``DASHBOARD_USE_COUNTERS``
+selects the source. :func:`aget_dashboard_stats` runs the same queries
+through the async ORM.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+
+def dashboard_modules():
+    """Return ``(prefix, model, user_field)`` for each dashboard module"""
+    from support_records.models import SupportRecord
+    from asset_management.models import AssetRecord
+    from vendor_assistance.models import VendorAssistance
+    from thermal_rolls.models import ThermalRollRecord
+
+    return [
+        ('support', SupportRecord, 'recorded_by'),
+        ('asset', AssetRecord, 'recorded_by'),
+        ('vendor', VendorAssistance, 'resolved_by'),
+        ('thermal', ThermalRollRecord, 'recorded_by'),
+    ]
+
+
+def module_statuses(model):
+    """Return the status values tracked for a model (empty if it has none)"""
+    return [value for value, _ in getattr(model, 'STATUS_CHOICES', [])]
+
+
+def module_aggregates(prefix, statuses, since):
+    """Return the total, per-status and recent count expressions for one module
+
+    Keyed like the dashboard context, e.g. ``support_count``,
+    ``support_pending`` and ``support_this_week``.
+    """
+    aggregates = {
+        f'{prefix}_count': Count('pk'),
+        f'{prefix}_this_week': Count('pk', filter=Q(timestamp__gte=since)),
+    }
+    for status in statuses:
+        aggregates[f'{prefix}_{status.lower()}'] = Count('pk', filter=Q(status=status))
+    return aggregates
+
+
+def module_stats(queryset, prefix, statuses, since):
+    """Aggregate total, per-status and recent counts for one queryset
+
+    Returns a dict keyed like the dashboard context, e.g. ``support_count``,
+    ``support_pending`` and ``support_this_week``.
+    """
+    # aggregate() without an explicit order avoids the Meta ordering clause
+    return queryset.order_by().aggregate(**module_aggregates(prefix, statuses, since))
+
+
+def module_querysets(user, is_admin):
+    """Return ``(prefix, model, queryset)`` for each module, scoped to the user"""
+    querysets = []
+    for prefix, model, user_field in dashboard_modules():
+        queryset = model.objects.all()
+        if not is_admin:
+            queryset = queryset.filter(**{user_field: user})
+        querysets.append((prefix, model, queryset))
+    return querysets
+
+
+def with_total(stats):
+    """Add ``total_count``, the sum of the per-module totals, to ``stats``"""
+    stats['total_count'] = sum(
+        stats[f'{prefix}_count'] for prefix, _, _ in dashboard_modules()
+    )
+    return stats
+
+
+def aggregate_dashboard_stats(user, is_admin, now=None):
+    """Compute dashboard statistics straight from the record tables"""
+    now = now or timezone.now()
+    since = now - timedelta(days=7)
+
+    stats = {}
+    for prefix, model, queryset in module_querysets(user, is_admin):
+        stats.update(module_stats(queryset, prefix, module_statuses(model), since))
+    return with_total(stats)
+
+
+async def aaggregate_dashboard_stats(user, is_admin, now=None):
+    """Async :func:`aggregate_dashboard_stats`"""
+    now = now or timezone.now()
+    since = now - timedelta(days=7)
+
+    stats = {}
+    for prefix, model, queryset in module_querysets(user, is_admin):
+        aggregates = module_aggregates(prefix, module_statuses(model), since)
+        stats.update(await queryset.order_by().aaggregate(**aggregates))
+    return with_total(stats)
+
+
+def counter_rows(user, is_admin, now=None):
+    """Per module and status totals and "this week" counts, from the record counters
+
+    Counters are bucketed per day, so "this week" covers every record from
+    the calendar day seven days ago onwards.
+    """
+    from .models import RecordCounter
+
+    now = now or timezone.now()
+    since = timezone.localtime(now - timedelta(days=7)).date()
+
+    counters = RecordCounter.objects.all()
+    if not is_admin:
+        counters = counters.filter(user=user)
+    return counters.values('module', 'status').annotate(
+        total=Sum('count'),
+        recent=Sum('count', filter=Q(day__gte=since)),
+    ).order_by()
+
+
+def counter_stats(rows):
+    """Fold :func:`counter_rows` into dashboard statistics"""
+    stats = {}
+    for prefix, model, _ in dashboard_modules():
+        stats[f'{prefix}_count'] = 0
+        stats[f'{prefix}_this_week'] = 0
+        for status in module_statuses(model):
+            stats[f'{prefix}_{status.lower()}'] = 0
+
+    for row in rows:
+        prefix = row['module']
+        stats[f'{prefix}_count'] += row['total'] or 0
+        stats[f'{prefix}_this_week'] += row['recent'] or 0
+        if row['status']:
+            stats[f'{prefix}_{row["status"].lower()}'] = row['total'] or 0
+    return with_total(stats)
+
+
+def counter_dashboard_stats(user, is_admin, now=None):
+    """Compute dashboard statistics from the materialized record counters"""
+    return counter_stats(counter_rows(user, is_admin, now))
+
+
+async def acounter_dashboard_stats(user, is_admin, now=None):
+    """Async :func:`counter_dashboard_stats`"""
+    return counter_stats([row async for row in counter_rows(user, is_admin, now)])
+
+
+def get_dashboard_stats(user, is_admin, now=None):
+    """Return dashboard statistics from the configured source"""
+    if getattr(settings, 'DASHBOARD_USE_COUNTERS', True):
+        return counter_dashboard_stats(user, is_admin, now)
+    return aggregate_dashboard_stats(user, is_admin, now)
+
+
+async def aget_dashboard_stats(user, is_admin, now=None):
+    """Async :func:`get_dashboard_stats`"""
+    if getattr(settings, 'DASHBOARD_USE_COUNTERS', True):
+        return await acounter_dashboard_stats(user, is_admin, now)
+    return await aaggregate_dashboard_stats(user, is_admin, now)
@@ -12,3 +12,23 @@ def replace(value, arg):
         return value
     old, new = arg.split(',', 1)
     return value.replace(old, new)
+
+
+@register.filter(name='seconds_duration')
+def seconds_duration(value):
+    """
+    Format a number of seconds (or a timedelta) as a short duration.
+    Usage: {{ 5400|seconds_duration }} -> "1h 30m"
+    """
+    if value is None or value == '':
+        return '-'
+    if hasattr(value, 'total_seconds'):
+        value = value.total_seconds()
+    minutes = int(round(float(value) / 60))
+    days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+    if days:
+        return f'{days}d {hours}h'
+    if hours:
+        return f'{hours}h {minutes}m'
+    return f'{minutes}m'
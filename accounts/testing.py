@@ -0,0 +1,64 @@
+"""Test helpers shared by the record apps."""
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryCountTestMixin:
+    """Assert that a page costs the same number of queries at any page size"""
+
+    def count_queries(self, url, data=None):
+        """GET ``url`` and return how many queries the request issued"""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, data)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def assertConstantQueries(self, url, create_records, sizes=(1, 10), data=None):
+        """Grow the data set through ``sizes`` and compare query counts
+
+        ``create_records(n)`` must add ``n`` more visible records, ideally
+        owned by different users so lazy foreign key loads would show up.
+        """
+        # Warm per-user caches (e.g. group names) so only rows are compared
+        self.client.get(url, data)
+        counts = []
+        created = 0
+        for size in sizes:
+            create_records(size - created)
+            created = size
+            counts.append(self.count_queries(url, data))
+        self.assertEqual(
+            len(set(counts)), 1,
+            f'Query count changed with the number of rows rendered: {counts}'
+        )
+
+
+class QueryPlanTestMixin:
+    """Assert that a queryset is answered from a given index"""
+
+    def index_name(self, model, fields):
+        """Name of the index of ``model`` declared on ``fields``"""
+        for index in model._meta.indexes:
+            if list(index.fields) == list(fields):
+                return index.name
+        self.fail(f'{model.__name__} has no index on {fields}')
+
+    def query_plan(self, queryset):
+        """Return the database's plan for ``queryset``
+
+        PostgreSQL would pick a sequential scan for test-sized tables, so
+        those are disabled for the ``EXPLAIN``.
+        """
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def assertUsesIndex(self, queryset, index_name):
+        """Check the plan reads ``index_name`` and needs no separate sort"""
+        plan = self.query_plan(queryset)
+        self.assertIn(index_name, plan)
+        if connection.vendor == 'sqlite':
+            self.assertNotIn('TEMP B-TREE', plan)
+        elif connection.vendor == 'postgresql':
+            self.assertNotRegex(plan, r'(?m)^\s*(->\s*)?Sort\b')
@@ -1,3 +1,1110 @@
-from django.test import TestCase
+"""
+Tests for the accounts app (dashboard and shared statistics)
+"""
+import os
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management import call_command, CommandError
+from django.template import engines
+from django.test import SimpleTestCase, TestCase, Client, override_settings
+from django.contrib.auth.models import User, Group
+from django.urls import reverse
+from django.utils import timezone
+
+from support_records.models import ArchivedSupportRecord, SupportRecord
+from asset_management.models import AssetRecord
+from vendor_assistance.models import VendorAssistance
+from thermal_rolls.models import ThermalRollRecord
+from . import archive, bulk, counters, fuzzy, history, hooks, page_cache, roles
+from .filters import date_range, filter_records, timestamp_range
+from .models import NameTrigram, RecordCounter, StatusTransition, Tombstone
+from .pagination import CursorPaginator, decode_cursor, InvalidCursor
+from .roles import agroup_names, group_names, user_is_admin
+from .search import MergedSearchResults, search_records
+from .stats import (
+    aaggregate_dashboard_stats, acounter_dashboard_stats, aggregate_dashboard_stats, counter_dashboard_stats,
+)
+
+
+class DashboardTestMixin:
+    """Shared fixtures: an admin, a staff user and records in every module"""
+
+    def setUp(self):
+        self.admin_group = Group.objects.create(name='Admin')
+        self.admin_user = User.objects.create_user(username='admin', password='admin123')
+        self.admin_user.groups.add(self.admin_group)
+        self.staff_user = User.objects.create_user(username='staff', password='staff123')
+
+        old = timezone.now() - timedelta(days=30)
+        for status, timestamp in [
+            (SupportRecord.PENDING, timezone.now()),
+            (SupportRecord.SOLVED, old),
+            (SupportRecord.IN_PROGRESS, timezone.now()),
+        ]:
+            SupportRecord.objects.create(
+                staff_name="Staff", staff_id="EMP001", phone_number="0123456789",
+                issue_reported="Issue", status=status, timestamp=timestamp,
+                recorded_by=self.staff_user
+            )
+        SupportRecord.objects.create(
+            staff_name="Admin", staff_id="EMP002", phone_number="0123456789",
+            issue_reported="Issue", status=SupportRecord.PENDING,
+            recorded_by=self.admin_user
+        )
+        AssetRecord.objects.create(
+            staff_name="Staff", staff_id="EMP001", problem_reported="Broken",
+            asset_type="Laptop", division="IT", phone_number="0123456789",
+            status=AssetRecord.UNDER_REPAIR, recorded_by=self.staff_user
+        )
+        VendorAssistance.objects.create(
+            company_name="Acme", cashier_owner_name="Owner", problem_reported="POS down",
+            phone_number="0123456789", status=VendorAssistance.ONGOING,
+            resolved_by=self.staff_user, timestamp=old
+        )
+        ThermalRollRecord.objects.create(
+            vendor_name="Station 1", cashier_owner_name="Owner", quantity=5,
+            phone_number="0123456789", recorded_by=self.admin_user
+        )
+
+
+class DashboardStatsTest(DashboardTestMixin, TestCase):
+    """Test the conditional-aggregate dashboard statistics"""
+
+    def test_staff_stats_are_scoped(self):
+        """Test that staff statistics only count their own records"""
+        stats = aggregate_dashboard_stats(self.staff_user, is_admin=False)
+        self.assertEqual(stats['support_count'], 3)
+        self.assertEqual(stats['support_pending'], 1)
+        self.assertEqual(stats['support_in_progress'], 1)
+        self.assertEqual(stats['support_solved'], 1)
+        self.assertEqual(stats['support_this_week'], 2)
+        self.assertEqual(stats['asset_under_repair'], 1)
+        self.assertEqual(stats['vendor_ongoing'], 1)
+        self.assertEqual(stats['vendor_this_week'], 0)
+        self.assertEqual(stats['thermal_count'], 0)
+        self.assertEqual(stats['total_count'], 5)
+
+    def test_admin_stats_cover_everything(self):
+        """Test that admin statistics count all records"""
+        stats = aggregate_dashboard_stats(self.admin_user, is_admin=True)
+        self.assertEqual(stats['support_count'], 4)
+        self.assertEqual(stats['support_pending'], 2)
+        self.assertEqual(stats['thermal_count'], 1)
+        self.assertEqual(stats['thermal_this_week'], 1)
+        self.assertEqual(stats['total_count'], 7)
+
+    def test_one_query_per_module(self):
+        """Test that statistics use a single query per record model"""
+        with self.assertNumQueries(4):
+            aggregate_dashboard_stats(self.admin_user, is_admin=True)
+
+    def test_async_stats_match(self):
+        """Test that the async ORM path runs the same queries"""
+        for user, is_admin in [(self.staff_user, False), (self.admin_user, True)]:
+            with self.assertNumQueries(4):
+                stats = async_to_sync(aaggregate_dashboard_stats)(user, is_admin)
+            self.assertEqual(stats, aggregate_dashboard_stats(user, is_admin))
+
+
+class RecordCounterTest(DashboardTestMixin, TestCase):
+    """Test the materialized record counters"""
+
+    def assertCountersConsistent(self):
+        self.assertEqual(counters.check(), [])
+
+    def test_counters_match_aggregates(self):
+        """Test that counter statistics agree with the record tables"""
+        for user, is_admin in [(self.staff_user, False), (self.admin_user, True)]:
+            self.assertEqual(
+                counter_dashboard_stats(user, is_admin),
+                aggregate_dashboard_stats(user, is_admin),
+            )
+
+    def test_counter_stats_single_query(self):
+        """Test that counter statistics are read in one query"""
+        with self.assertNumQueries(1):
+            counter_dashboard_stats(self.admin_user, is_admin=True)
+        with self.assertNumQueries(1):
+            stats = async_to_sync(acounter_dashboard_stats)(self.staff_user, is_admin=False)
+        self.assertEqual(stats, counter_dashboard_stats(self.staff_user, is_admin=False))
+
+    def test_status_transition_moves_bucket(self):
+        """Test that changing status moves the record between buckets"""
+        record = SupportRecord.objects.filter(status=SupportRecord.PENDING).first()
+        record.status = SupportRecord.SOLVED
+        record.save()
+        self.assertIsNotNone(record.resolved_at)
+        self.assertCountersConsistent()
+
+        vendor = VendorAssistance.objects.get()
+        vendor.status = VendorAssistance.RESOLVED
+        vendor.save()
+        self.assertCountersConsistent()
+        stats = counter_dashboard_stats(self.staff_user, is_admin=False)
+        self.assertEqual(stats['vendor_resolved'], 1)
+        self.assertEqual(stats['vendor_ongoing'], 0)
+
+    def test_closed_and_quantity_sums(self):
+        """Test that closures are counted on the closing day and rolls summed"""
+        record = SupportRecord.objects.get(status=SupportRecord.SOLVED)
+        closed_day = timezone.localtime(record.resolved_at).date()
+        opened_day = timezone.localtime(record.timestamp).date()
+        counter = RecordCounter.objects.get(module='support', status=SupportRecord.SOLVED, day=closed_day)
+        self.assertEqual(counter.closed, 1)
+        self.assertEqual(
+            RecordCounter.objects.get(module='support', status=SupportRecord.SOLVED, day=opened_day).count, 1
+        )
+
+        thermal = ThermalRollRecord.objects.get()
+        thermal.quantity = 8
+        thermal.save()
+        self.assertEqual(RecordCounter.objects.get(module='thermal').quantity, 8)
+        self.assertCountersConsistent()
+
+    def test_resave_without_changes(self):
+        """Test that saving an unchanged record does not double count"""
+        record = AssetRecord.objects.get()
+        record.notes = "Checked"
+        record.save()
+        self.assertCountersConsistent()
+
+    def test_delete_updates_counters(self):
+        """Test that instance and queryset deletes decrement counters"""
+        ThermalRollRecord.objects.get().delete()
+        self.assertCountersConsistent()
+
+        queryset = SupportRecord.objects.filter(recorded_by=self.staff_user)
+        counters.queryset_deleted(queryset)
+        queryset.delete()
+        self.assertCountersConsistent()
+        stats = counter_dashboard_stats(self.admin_user, is_admin=True)
+        self.assertEqual(stats['support_count'], 1)
+
+    def test_rebuild_counters_command(self):
+        """Test that rebuild_counters repairs drifted counters"""
+        RecordCounter.objects.update(count=99)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_counters', check=True, stdout=StringIO())
+
+        out = StringIO()
+        call_command('rebuild_counters', stdout=out)
+        self.assertIn('Rebuilt', out.getvalue())
+        self.assertCountersConsistent()
+        call_command('rebuild_counters', check=True, stdout=out)
+        self.assertIn('consistent', out.getvalue())
+
+
+class DashboardViewTest(DashboardTestMixin, TestCase):
+    """Test the dashboard view"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+
+    def test_dashboard_requires_login(self):
+        """Test that anonymous users are redirected to login"""
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_dashboard_context(self):
+        """Test that the dashboard exposes the expected statistics"""
+        self.client.login(username='staff', password='staff123')
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['support_count'], 3)
+        self.assertEqual(response.context['asset_under_repair'], 1)
+        self.assertEqual(response.context['total_count'], 5)
+        self.assertFalse(response.context['is_admin'])
+
+    async def test_async_views(self):
+        """Test the async dashboard, list and detail views on the async client"""
+        await self.async_client.alogin(username='staff', password='staff123')
+        response = await self.async_client.get(reverse('dashboard'))
+        self.assertEqual(response.context['total_count'], 5)
+        self.assertEqual(len(response.context['recent_activity']), 5)
+        record = await SupportRecord.objects.filter(recorded_by=self.staff_user).afirst()
+        response = await self.async_client.get(reverse('support_records:list'), {'search': 'Staf', 'match': 'fuzzy'})
+        self.assertEqual(len(response.context['records']), 3)
+        response = await self.async_client.get(reverse('support_records:detail', args=[record.pk]))
+        self.assertContains(response, "staff")
+        response = await self.async_client.get(reverse('thermal_rolls:detail', args=[1]))
+        self.assertEqual(response.status_code, 404)
+
+
+class AsgiApplicationTest(SimpleTestCase):
+    """Test the ASGI entry point"""
+
+    async def test_serves_requests(self):
+        """Test that a request goes through the middleware to the async dashboard"""
+        from thirdyear.asgi import application
+
+        path = reverse('dashboard')
+        communicator = ApplicationCommunicator(application, {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+            'query_string': b'', 'root_path': '', 'headers': [(b'host', b'testserver')],
+            'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+        })
+        await communicator.send_input({'type': 'http.request', 'body': b''})
+        start = await communicator.receive_output()
+        self.assertEqual(start['status'], 302)
+        self.assertIn((b'Location', reverse('accounts:login').encode()), start['headers'])
+        await communicator.wait()
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=300)
+class PageCacheTest(DashboardTestMixin, TestCase):
+    """Test the per-role page cache and its model version counters"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client = Client()
+
+    def test_writes_bump_the_model_version(self):
+        """Test that save, bulk status changes, bulk_create and delete retire cached pages"""
+        seen = {page_cache.versions([AssetRecord])}
+        record = AssetRecord.objects.first()
+        record.division = "Finance"
+        record.save()
+        seen.add(page_cache.versions([AssetRecord]))
+        bulk.set_status(AssetRecord.objects.filter(pk=record.pk), AssetRecord.RETURNED)
+        seen.add(page_cache.versions([AssetRecord]))
+        created = AssetRecord.objects.bulk_create([
+            AssetRecord(staff_name="Bulk", staff_id="EMP009", problem_reported="Broken",
+                        asset_type="Laptop", division="IT", phone_number="0123456789",
+                        recorded_by=self.staff_user)
+        ])
+        hooks.after_bulk_create(created)
+        seen.add(page_cache.versions([AssetRecord]))
+        bulk.delete_records(AssetRecord.objects.filter(pk=record.pk))
+        seen.add(page_cache.versions([AssetRecord]))
+        self.assertEqual(len(seen), 5)
+
+    def test_other_models_keep_their_version(self):
+        """Test that a write only retires pages built from its own model"""
+        before = page_cache.versions([SupportRecord])
+        ThermalRollRecord.objects.create(
+            vendor_name="Station 2", cashier_owner_name="Owner", quantity=1,
+            phone_number="0123456789", recorded_by=self.staff_user
+        )
+        self.assertEqual(page_cache.versions([SupportRecord]), before)
+
+    def test_dashboard_is_served_from_cache(self):
+        """Test that a repeat dashboard visit skips the statistics queries"""
+        self.client.login(username='staff', password='staff123')
+        self.client.get(reverse('dashboard'))
+        with self.assertNumQueries(3):
+            # Session, user and group name lookups only
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['support_count'], 3)
+
+        SupportRecord.objects.create(
+            staff_name="Staff", staff_id="EMP001", phone_number="0123456789",
+            issue_reported="Issue", recorded_by=self.staff_user
+        )
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['support_count'], 4)
+
+    def test_dashboard_is_cached_per_role(self):
+        """Test that admins and staff never share a cached dashboard"""
+        self.client.login(username='staff', password='staff123')
+        self.assertEqual(self.client.get(reverse('dashboard')).context['support_count'], 3)
+        self.client.login(username='admin', password='admin123')
+        self.assertEqual(self.client.get(reverse('dashboard')).context['support_count'], 4)
+
+    @override_settings(PAGE_CACHE_TIMEOUT=0)
+    def test_zero_timeout_disables_caching(self):
+        """Test that PAGE_CACHE_TIMEOUT=0 builds the dashboard every time"""
+        calls = []
+        page_cache.cached('test', [SupportRecord], self.staff_user, False, lambda: calls.append(1))
+        page_cache.cached('test', [SupportRecord], self.staff_user, False, lambda: calls.append(1))
+        self.assertEqual(len(calls), 2)
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=300)
+class FragmentCacheTest(DashboardTestMixin, TestCase):
+    """Test the cached static fragments of the base and dashboard templates"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client = Client()
+
+    def test_navbar_is_served_from_cache(self):
+        """Test that the navigation links are rendered once per role"""
+        self.client.login(username='staff', password='staff123')
+        self.client.get(reverse('dashboard'))
+        key = make_template_fragment_key('navbar', [False, ''])
+        self.assertIn(reverse('reports:trends'), cache.get(key))
+
+        cache.set(key, '<div>cached navigation</div>')
+        self.assertContains(self.client.get(reverse('dashboard')), 'cached navigation')
+        self.client.login(username='admin', password='admin123')
+        self.assertNotContains(self.client.get(reverse('dashboard')), 'cached navigation')
+
+    def test_dashboard_charts_read_json_data(self):
+        """Test that chart numbers are passed as data, outside cached markup"""
+        self.client.login(username='staff', password='staff123')
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['chart_data']['support'], [1, 1, 1])
+        self.assertContains(response, 'id="dashboard-chart-data"')
+
+    def test_status_options_keep_selection(self):
+        """Test that cached status options still mark the filtered status"""
+        self.client.login(username='staff', password='staff123')
+        url = reverse('support_records:list')
+        self.client.get(url)
+        response = self.client.get(url, {'status': SupportRecord.SOLVED})
+        self.assertContains(response, '<option value="SOLVED" selected>Solved</option>', html=True)
+        self.assertContains(response, '<option value="PENDING">Pending</option>', html=True)
+
+    def test_cached_template_loader(self):
+        """Test that compiled templates are kept in memory outside DEBUG"""
+        loader, = engines['django'].engine.template_loaders
+        self.assertEqual(type(loader).__module__, 'django.template.loaders.cached')
+
+
+class CursorPaginatorTest(TestCase):
+    """Test keyset pagination over (timestamp, pk)"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='staff', password='staff123')
+        base = timezone.now()
+        # Pairs of records share a timestamp so the pk tiebreaker is exercised
+        for i in range(7):
+            ThermalRollRecord.objects.create(
+                vendor_name=f"Vendor {i}", cashier_owner_name="Owner", quantity=1,
+                phone_number="0123456789", recorded_by=self.user,
+                timestamp=base - timedelta(minutes=i // 2)
+            )
+        self.expected = list(
+            ThermalRollRecord.objects.order_by('-timestamp', '-pk').values_list('pk', flat=True)
+        )
+
+    def test_walk_forward_and_back(self):
+        """Test that next/previous cursors visit every record exactly once"""
+        paginator = CursorPaginator(ThermalRollRecord.objects.all(), 3)
+        pages = [[r.pk for r in page] for page in paginator.iter_pages()]
+        self.assertEqual([pk for page in pages for pk in page], self.expected)
+        self.assertEqual(len(pages), 3)
+
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        self.assertTrue(second.has_previous())
+        back = paginator.page(second.previous_cursor)
+        self.assertEqual([r.pk for r in back], pages[0])
+        self.assertFalse(back.has_previous())
+        self.assertTrue(back.has_next())
+
+    def test_count_can_be_skipped(self):
+        """Test that the total count query is optional"""
+        paginator = CursorPaginator(ThermalRollRecord.objects.all(), 3, with_count=False)
+        with self.assertNumQueries(1):
+            page = paginator.page()
+            self.assertIsNone(page.paginator.count)
+        self.assertEqual(CursorPaginator(ThermalRollRecord.objects.all(), 3).count, 7)
+
+    def test_bad_cursor(self):
+        """Test that malformed cursors are rejected or fall back to page one"""
+        with self.assertRaises(InvalidCursor):
+            decode_cursor('not-a-cursor')
+        page = CursorPaginator(ThermalRollRecord.objects.all(), 3).get_page('garbage')
+        self.assertEqual([r.pk for r in page], self.expected[:3])
+
+
+@override_settings(ROLE_CACHE_TIMEOUT=300)
+class RoleResolutionTest(TestCase):
+    """Test cached group membership lookups"""
+
+    def setUp(self):
+        self.admin_group = Group.objects.create(name='Admin')
+        self.staff_group = Group.objects.create(name='ICT Staff')
+        self.user = User.objects.create_user(username='staff', password='staff123')
+        self.user.groups.add(self.staff_group)
+
+    def fresh_user(self):
+        """Return a new instance, as a new request would"""
+        return User.objects.get(pk=self.user.pk)
+
+    def test_groups_cached_across_requests(self):
+        """Test that group names are only queried once"""
+        self.assertFalse(user_is_admin(self.fresh_user()))
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertEqual(group_names(user), ('ICT Staff',))
+            self.assertFalse(user_is_admin(user))
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertEqual(async_to_sync(agroup_names)(user), ('ICT Staff',))
+
+    def test_membership_change_invalidates(self):
+        """Test that adding or removing groups is seen straight away"""
+        self.assertFalse(user_is_admin(self.fresh_user()))
+        self.user.groups.add(self.admin_group)
+        self.assertTrue(user_is_admin(self.fresh_user()))
+        self.admin_group.user_set.remove(self.user)
+        self.assertFalse(user_is_admin(self.fresh_user()))
+        self.admin_group.user_set.add(self.user)
+        self.assertTrue(user_is_admin(self.fresh_user()))
+        self.admin_group.user_set.clear()
+        self.assertFalse(user_is_admin(self.fresh_user()))
+
+    def test_group_rename_invalidates(self):
+        """Test that renaming a group refreshes its members"""
+        self.assertEqual(group_names(self.fresh_user()), ('ICT Staff',))
+        self.staff_group.name = 'Admin Staff'
+        self.staff_group.save()
+        self.assertEqual(group_names(self.fresh_user()), ('Admin Staff',))
+
+    @override_settings(ROLE_CACHE_TIMEOUT=0)
+    def test_per_request_only_by_default(self):
+        """Test that without a role cache timeout a revoked role is seen on the next request"""
+        self.user.groups.add(self.admin_group)
+        self.assertTrue(user_is_admin(self.fresh_user()))
+        # Another worker's cache is not reached by the invalidation
+        self.admin_group.user_set.through.objects.filter(group=self.admin_group).delete()
+        self.assertFalse(user_is_admin(self.fresh_user()))
+        self.assertIsNone(cache.get(roles.cache_key(self.user.pk)))
+
+    def test_anonymous_user(self):
+        """Test that anonymous users have no roles"""
+        from django.contrib.auth.models import AnonymousUser
+        self.assertEqual(group_names(AnonymousUser()), ())
+        self.assertFalse(user_is_admin(AnonymousUser()))
+
+    def test_template_context(self):
+        """Test that templates receive the cached roles"""
+        self.user.groups.add(self.admin_group)
+        client = Client()
+        client.login(username='staff', password='staff123')
+        response = client.get(reverse('accounts:profile'))
+        self.assertEqual(response.context['user_group_names'], ('Admin', 'ICT Staff'))
+        self.assertTrue(response.context['is_admin'])
+
+
+class FullTextSearchTest(TestCase):
+    """Test the full-text search backend"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='staff', password='staff123')
+        self.printer = SupportRecord.objects.create(
+            staff_name="John Smith", staff_id="EMP001", phone_number="0123456789",
+            issue_reported="Printer jammed on floor two", recorded_by=self.user
+        )
+        self.network = SupportRecord.objects.create(
+            staff_name="Mary Jones", staff_id="EMP002", phone_number="0987654321",
+            issue_reported="Network cable unplugged", recorded_by=self.user
+        )
+
+    def search(self, query):
+        return set(search_records(SupportRecord.objects.all(), query).values_list('pk', flat=True))
+
+    def test_word_and_prefix_matches(self):
+        """Test that whole words and prefixes across fields match"""
+        self.assertEqual(self.search('printer'), {self.printer.pk})
+        self.assertEqual(self.search('jo sm'), {self.printer.pk})
+        self.assertEqual(self.search('EMP002'), {self.network.pk})
+        self.assertEqual(self.search('0987654321'), {self.network.pk})
+        self.assertEqual(self.search('scanner'), set())
+
+    def test_index_follows_writes(self):
+        """Test that saves, bulk updates and deletes keep the index in sync"""
+        self.network.issue_reported = "Scanner offline"
+        self.network.save()
+        self.assertEqual(self.search('scanner'), {self.network.pk})
+        self.assertEqual(self.search('network'), set())
+
+        SupportRecord.objects.filter(pk=self.printer.pk).update(staff_name="Peter Pan")
+        self.assertEqual(self.search('peter'), {self.printer.pk})
+
+        self.printer.delete()
+        self.assertEqual(self.search('peter'), set())
+
+    def test_punctuation_only_query(self):
+        """Test that queries without words fall back to substring matching"""
+        self.assertEqual(self.search('--'), set())
+
+    @override_settings(RECORD_SEARCH_BACKEND='basic')
+    def test_basic_backend(self):
+        """Test the icontains fallback"""
+        self.assertEqual(self.search('MP00'), {self.printer.pk, self.network.pk})
+
+    def test_admin_search(self):
+        """Test that the admin changelist uses the full-text index"""
+        User.objects.create_superuser(username='root', password='root123')
+        client = Client()
+        client.login(username='root', password='root123')
+        response = client.get(
+            reverse('admin:support_records_supportrecord_changelist'), {'q': 'printer'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+
+class FuzzyMatchTest(TestCase):
+    """Test trigram fuzzy matching on record names"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='staff', password='staff123')
+        self.other = User.objects.create_user(username='other', password='other123')
+        self.shoprite = VendorAssistance.objects.create(
+            company_name="Shoprite Holdings", cashier_owner_name="Thandiwe Nkosi",
+            problem_reported="POS down", phone_number="0123456789", resolved_by=self.user
+        )
+        self.spar = VendorAssistance.objects.create(
+            company_name="Spar Express", cashier_owner_name="Peter Owens",
+            problem_reported="Printer", phone_number="0987654321", resolved_by=self.other
+        )
+
+    def fuzzy(self, queryset, query):
+        return list(fuzzy.fuzzy_search(queryset, query).values_list('pk', flat=True))
+
+    def test_similarity(self):
+        """Test that trigram similarity follows pg_trgm"""
+        self.assertEqual(fuzzy.trigrams('Ab'), {'  a', ' ab', 'ab '})
+        self.assertEqual(fuzzy.similarity('Smith', 'smith'), 1.0)
+        self.assertGreater(fuzzy.similarity('Shoprite', 'Shopryte'), 0.3)
+        self.assertEqual(fuzzy.similarity('', 'abc'), 0.0)
+
+    def test_typos_match_any_fuzzy_field(self):
+        """Test that misspelt company and owner names are found"""
+        records = VendorAssistance.objects.all()
+        self.assertEqual(self.fuzzy(records, 'Shopryte Holdngs'), [self.shoprite.pk])
+        self.assertEqual(self.fuzzy(records, 'Tandiwe Nkossi'), [self.shoprite.pk])
+        self.assertEqual(self.fuzzy(records, 'Spar Expres'), [self.spar.pk])
+        self.assertEqual(self.fuzzy(records, 'zzz'), [])
+        match = fuzzy.fuzzy_search(records, 'Spar Expres').get()
+        self.assertAlmostEqual(match.similarity, fuzzy.similarity('Spar Express', 'Spar Expres'))
+
+    def test_scoped_queryset(self):
+        """Test that only rows of the given queryset are candidates"""
+        mine = VendorAssistance.objects.filter(resolved_by=self.user)
+        self.assertEqual(self.fuzzy(mine, 'Spar Expres'), [])
+
+    def test_index_follows_writes(self):
+        """Test that saves and deletes keep the trigram index in sync"""
+        self.spar.company_name = "Pick n Pay"
+        self.spar.save()
+        records = VendorAssistance.objects.all()
+        self.assertEqual(self.fuzzy(records, 'Spar Expres'), [])
+        self.assertEqual(self.fuzzy(records, 'Pick and Pay'), [self.spar.pk])
+
+        spar_pk = self.spar.pk
+        self.spar.delete()
+        self.assertFalse(NameTrigram.objects.filter(record_id=spar_pk, model='vendor_assistance.vendorassistance').exists())
+
+    def test_unchanged_names_are_not_reindexed(self):
+        """Test that saves leaving the name fields alone keep their trigram rows"""
+        rows = NameTrigram.objects.filter(record_id=self.spar.pk, model='vendor_assistance.vendorassistance')
+        before = set(rows.values_list('pk', flat=True))
+        self.spar.status = VendorAssistance.RESOLVED
+        self.spar.resolution_notes = "Replaced the printer"
+        self.spar.save()
+        self.assertEqual(set(rows.values_list('pk', flat=True)), before)
+
+    def test_rebuild_command(self):
+        """Test rebuilding the trigram index from the record tables"""
+        NameTrigram.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_fuzzy_index', stdout=out)
+        self.assertIn('Rebuilt', out.getvalue())
+        self.assertEqual(
+            self.fuzzy(VendorAssistance.objects.all(), 'Shopryte Holdngs'), [self.shoprite.pk]
+        )
+
+    def test_list_view_fuzzy_mode(self):
+        """Test the list view's fuzzy match option"""
+        client = Client()
+        client.login(username='staff', password='staff123')
+        url = reverse('vendor_assistance:list')
+        response = client.get(url, {'search': 'Shopryte Holdngs', 'match': 'fuzzy'})
+        self.assertEqual(list(response.context['records']), [self.shoprite])
+        self.assertTrue(response.context['fuzzy_match'])
+        response = client.get(url, {'search': 'Shopryte Holdngs'})
+        self.assertEqual(list(response.context['records']), [])
+
+
+class ExportRecordsCommandTest(TestCase):
+    """Test the export_records management command"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='staff', password='staff123')
+        self.other = User.objects.create_user(username='other', password='other123')
+        for i, user in enumerate([self.user, self.user, self.other]):
+            ThermalRollRecord.objects.create(
+                vendor_name=f"Station {i}", cashier_owner_name="Owner", quantity=i + 1,
+                phone_number="0123456789", recorded_by=user
+            )
+
+    def test_csv_to_stdout(self):
+        """Test exporting every record of a module"""
+        out = StringIO()
+        call_command('export_records', 'thermal', stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith('id,vendor_name,cashier_owner_name,quantity'))
+        self.assertEqual(len(lines), 4)
+
+    def test_filters_and_user_scope(self):
+        """Test the search and user options"""
+        out = StringIO()
+        call_command('export_records', 'thermal', '--format', 'jsonl', '--user', 'staff', stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
+        out = StringIO()
+        call_command('export_records', 'thermal', '--format', 'jsonl', '--search', 'station', '--user', 'other', stdout=out)
+        self.assertIn('"recorded_by": "other"', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('export_records', 'thermal', '--user', 'nobody', stdout=StringIO())
+
+
+class ImportRecordsTest(TestCase):
+    """Test bulk CSV imports"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='staff', password='staff123')
+        self.other = User.objects.create_user(username='other', password='other123')
+
+    def write_csv(self, content):
+        handle = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False)
+        handle.write(content)
+        handle.close()
+        self.addCleanup(os.remove, handle.name)
+        return handle.name
+
+    def test_batches_update_counters_and_indexes(self):
+        """Test that bulk inserts keep counters and the fuzzy index in step"""
+        rows = ''.join(
+            f"Staff {i},EMP{i:03d},Issue {i},0123456789,{'SOLVED' if i % 2 else 'PENDING'}\n"
+            for i in range(25)
+        )
+        path = self.write_csv("staff_name,staff_id,issue_reported,phone_number,status\n" + rows)
+        out = StringIO()
+        call_command('import_records', 'support', path, '--user', 'staff', '--batch-size', '10', stdout=out)
+        self.assertIn('Imported 25 record(s), rejected 0 row(s)', out.getvalue())
+        self.assertEqual(SupportRecord.objects.count(), 25)
+        self.assertEqual(
+            SupportRecord.objects.filter(status='SOLVED', resolved_at__isnull=False).count(), 12
+        )
+        self.assertEqual(counters.check(), [])
+        self.assertEqual(
+            list(fuzzy.fuzzy_search(SupportRecord.objects.all(), 'Staf 7').values_list('staff_id', flat=True))[:1],
+            ['EMP007'],
+        )
+
+    def test_row_errors_use_form_validation(self):
+        """Test that clean_* rules reject rows and report their line"""
+        path = self.write_csv(
+            "staff_name,staff_id,issue_reported,phone_number\n"
+            "Ann,E1,Printer,0123456789\n"
+            "Ben,EMP002,Printer,0123456789\n"
+        )
+        out = StringIO()
+        call_command('import_records', 'support', path, '--user', 'staff', stdout=out)
+        self.assertIn('Line 2: staff_id: Staff ID must be at least 3 characters', out.getvalue())
+        record = SupportRecord.objects.get()
+        self.assertEqual(record.status, SupportRecord.PENDING)
+        self.assertEqual(record.recorded_by, self.user)
+
+    def test_undecodable_file_writes_nothing(self):
+        """Test that a bad byte after the first batch fails the import before any write"""
+        rows = ''.join(f"Staff {i},EMP{i:03d},Issue,0123456789\n" for i in range(5))
+        path = self.write_csv("staff_name,staff_id,issue_reported,phone_number\n" + rows)
+        with open(path, 'ab') as handle:
+            handle.write("Zoë,EMP999,Issue,0123456789\n".encode('cp1252'))
+        with self.assertRaisesMessage(CommandError, 'UTF-8'):
+            call_command('import_records', 'support', path, '--user', 'staff', '--batch-size', '2', stdout=StringIO())
+        self.assertFalse(SupportRecord.objects.exists())
+
+    def test_export_round_trip(self):
+        """Test that an export can be imported again with owners and dates"""
+        timestamp = timezone.now() - timedelta(days=40)
+        VendorAssistance.objects.create(
+            company_name="Acme", cashier_owner_name="Owner", problem_reported="POS",
+            phone_number="0123456789", status=VendorAssistance.RESOLVED,
+            resolved_by=self.other, timestamp=timestamp
+        )
+        out = StringIO()
+        call_command('export_records', 'vendor', stdout=out)
+        path = self.write_csv(out.getvalue())
+        VendorAssistance.objects.get().delete()
+
+        call_command('import_records', 'vendor', path, '--user', 'staff', stdout=StringIO())
+        record = VendorAssistance.objects.get()
+        self.assertEqual(record.resolved_by, self.other)
+        self.assertEqual(record.timestamp, timestamp)
+        self.assertIsNotNone(record.resolved_at)
+        self.assertEqual(counters.check(), [])
+
+
+class GlobalSearchTest(TestCase):
+    """Test searching every record module at once"""
+
+    def setUp(self):
+        self.admin_group = Group.objects.create(name='Admin')
+        self.admin_user = User.objects.create_user(username='admin', password='admin123')
+        self.admin_user.groups.add(self.admin_group)
+        self.staff_user = User.objects.create_user(username='staff', password='staff123')
+        now = timezone.now()
+        self.support = SupportRecord.objects.create(
+            staff_name="Acme Clerk", staff_id="EMP001", phone_number="0123456789",
+            issue_reported="Email down", recorded_by=self.staff_user,
+            timestamp=now - timedelta(hours=3)
+        )
+        self.vendor = VendorAssistance.objects.create(
+            company_name="Acme Stores", cashier_owner_name="Owner", problem_reported="POS down",
+            phone_number="0123456789", resolved_by=self.staff_user,
+            timestamp=now - timedelta(hours=1)
+        )
+        self.thermal = ThermalRollRecord.objects.create(
+            vendor_name="Acme Fuel", cashier_owner_name="Owner", quantity=3,
+            phone_number="0123456789", recorded_by=self.admin_user,
+            timestamp=now - timedelta(hours=2)
+        )
+        AssetRecord.objects.create(
+            staff_name="Other", staff_id="EMP009", problem_reported="Broken",
+            asset_type="Laptop", division="IT", phone_number="0123456789",
+            recorded_by=self.staff_user
+        )
+        self.client = Client()
+
+    def querysets(self):
+        return [
+            search_records(model.objects.all(), 'acme')
+            for model in (SupportRecord, AssetRecord, VendorAssistance, ThermalRollRecord)
+        ]
+
+    def test_merged_results_newest_first(self):
+        """Test that hits from every module are merged by timestamp"""
+        results = MergedSearchResults(self.querysets())
+        self.assertEqual(results.count(), 3)
+        self.assertEqual(
+            [type(record) for record in results[0:3]],
+            [VendorAssistance, ThermalRollRecord, SupportRecord],
+        )
+        self.assertEqual([record.pk for record in results[1:2]], [self.thermal.pk])
+
+    def test_admin_sees_all_modules(self):
+        """Test the search page for an admin"""
+        self.client.login(username='admin', password='admin123')
+        response = self.client.get(reverse('search'), {'search': 'acme'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['page_obj'].paginator.count, 3)
+        self.assertEqual(
+            [result['type'] for result in response.context['results']],
+            ['vendor', 'thermal', 'support'],
+        )
+        self.assertContains(response, reverse('vendor_assistance:detail', args=[self.vendor.pk]))
+
+    def test_staff_search_is_scoped(self):
+        """Test that staff only find their own records"""
+        self.client.login(username='staff', password='staff123')
+        response = self.client.get(reverse('search'), {'search': 'acme'})
+        self.assertEqual(
+            {result['type'] for result in response.context['results']},
+            {'vendor', 'support'},
+        )
+
+    def test_empty_query(self):
+        """Test that the search page renders without a query"""
+        self.client.login(username='staff', password='staff123')
+        response = self.client.get(reverse('search'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context['page_obj'])
+
+
+class StatusHistoryTest(TestCase):
+    """Test the append-only status transition history"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='staff', password='staff123')
+        self.start = timezone.now() - timedelta(days=10)
+        self.asset = AssetRecord.objects.create(
+            staff_name="Staff", staff_id="EMP001", problem_reported="Broken",
+            asset_type="Laptop", division="IT", phone_number="0123456789",
+            status=AssetRecord.IN_USE, recorded_by=self.user, timestamp=self.start
+        )
+
+    def test_only_status_changes_are_recorded(self):
+        """Test that creating and editing without a status change writes nothing"""
+        self.asset.division = "Finance"
+        self.asset.save()
+        self.assertFalse(StatusTransition.objects.exists())
+
+        self.asset.status = AssetRecord.UNDER_REPAIR
+        self.asset.save()
+        transition, = history.record_history(self.asset)
+        self.assertEqual((transition.from_status, transition.to_status), (AssetRecord.IN_USE, AssetRecord.UNDER_REPAIR))
+        self.assertEqual(transition.entered_at, self.start)
+        self.assertEqual(transition.model, 'asset_management.assetrecord')
+
+    def test_dwell_time_per_status(self):
+        """Test that each stay is measured from the previous transition"""
+        self.asset.status = AssetRecord.UNDER_REPAIR
+        self.asset.save()
+        entered = StatusTransition.objects.get().changed_at
+        StatusTransition.objects.update(changed_at=entered - timedelta(days=3))
+        self.asset.status = AssetRecord.RETURNED
+        self.asset.save()
+
+        repair = history.dwell_stats(AssetRecord, AssetRecord.UNDER_REPAIR)
+        self.assertEqual(repair['count'], 1)
+        self.assertAlmostEqual(repair['average'].total_seconds(), timedelta(days=3).total_seconds(), delta=60)
+        by_status = history.dwell_by_status(AssetRecord)
+        self.assertEqual(set(by_status), {AssetRecord.IN_USE, AssetRecord.UNDER_REPAIR})
+        self.assertEqual(by_status[AssetRecord.IN_USE]['count'], 1)
+
+    def test_bulk_status_update_is_recorded(self):
+        """Test that bulk status changes append one transition per changed record"""
+        other = AssetRecord.objects.create(
+            staff_name="Other", staff_id="EMP002", problem_reported="Broken",
+            asset_type="Laptop", division="IT", phone_number="0123456789",
+            status=AssetRecord.UNDER_REPAIR, recorded_by=self.user
+        )
+        bulk.set_status(AssetRecord.objects.all(), AssetRecord.UNDER_REPAIR)
+        transition, = StatusTransition.objects.all()
+        self.assertEqual(transition.record_id, self.asset.pk)
+        self.assertEqual(transition.entered_at, self.start)
+        self.assertFalse(history.record_history(other).exists())
+
+    def test_current_stays(self):
+        """Test that records in a status are measured from their last change"""
+        self.asset.status = AssetRecord.UNDER_REPAIR
+        self.asset.save()
+        stay, = history.current_stays(AssetRecord.objects.all(), AssetRecord.UNDER_REPAIR)
+        self.assertLess(stay.dwell, timedelta(minutes=1))
+        self.assertFalse(history.current_stays(AssetRecord.objects.all(), AssetRecord.IN_USE).exists())
+
+
+class TombstoneTest(TestCase):
+    """Test the tombstones left by deleted records"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='staff', password='staff123')
+        self.records = [
+            ThermalRollRecord.objects.create(
+                vendor_name="Station", cashier_owner_name="Owner", quantity=1,
+                phone_number="0123456789", recorded_by=self.user
+            )
+            for _ in range(3)
+        ]
+
+    def test_deletes_leave_tombstones(self):
+        """Test that single and bulk deletes record the id and owner"""
+        pks = [record.pk for record in self.records]
+        self.records[0].delete()
+        bulk.delete_records(ThermalRollRecord.objects.filter(pk__in=pks[1:]))
+        self.assertEqual(
+            sorted(Tombstone.objects.values_list('record_id', 'owner_id', 'model')),
+            [(pk, self.user.pk, 'thermal_rolls.thermalrollrecord') for pk in pks],
+        )
+
+    @override_settings(SYNC_TOMBSTONE_DAYS=30)
+    def test_prune(self):
+        """Test that prune_tombstones keeps tombstones within the retention period"""
+        old, recent = self.records[0].pk, self.records[1].pk
+        self.records[0].delete()
+        self.records[1].delete()
+        Tombstone.objects.filter(record_id=old).update(deleted_at=timezone.now() - timedelta(days=31))
+        out = StringIO()
+        call_command('prune_tombstones', stdout=out)
+        self.assertIn('Pruned 1 tombstone(s)', out.getvalue())
+        self.assertEqual(list(Tombstone.objects.values_list('record_id', flat=True)), [recent])
+
+
+class DateFilterTest(TestCase):
+    """Test the from/to and period filters of the list pages and exports"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='staff', password='staff123')
+        now = timezone.localtime()
+        self.today = now.date()
+        for days in (0, 1, 40):
+            ThermalRollRecord.objects.create(
+                vendor_name=f"Station {days}", cashier_owner_name="Owner", quantity=1,
+                phone_number="0123456789", recorded_by=self.user, timestamp=now - timedelta(days=days)
+            )
+
+    def names(self, **params):
+        records, _ = filter_records(ThermalRollRecord.objects.all(), params)
+        return {record.vendor_name for record in records}
+
+    def test_presets(self):
+        """Test that presets start on the first day of the period"""
+        wednesday = date(2026, 10, 14)
+        self.assertEqual(date_range({'period': 'today'}, wednesday), (wednesday, None))
+        self.assertEqual(date_range({'period': 'week'}, wednesday), (date(2026, 10, 12), None))
+        self.assertEqual(date_range({'period': 'month', 'from': '2020-01-01'}, wednesday), (date(2026, 10, 1), None))
+        self.assertEqual(self.names(period='today'), {"Station 0"})
+
+    def test_from_to_is_inclusive(self):
+        """Test that both days are included, and invalid dates ignored"""
+        yesterday = (self.today - timedelta(days=1)).isoformat()
+        self.assertEqual(self.names(**{'from': yesterday, 'to': yesterday}), {"Station 1"})
+        self.assertEqual(self.names(to=yesterday), {"Station 1", "Station 40"})
+        self.assertEqual(self.names(**{'from': 'yesterday'}), {"Station 0", "Station 1", "Station 40"})
+        self.assertEqual(timestamp_range(None, None), {})
+
+    def test_last_day_of_the_calendar(self):
+        """Test that a range ending on 9999-12-31 is open-ended rather than a 500"""
+        self.assertEqual(self.names(to='9999-12-31'), {"Station 0", "Station 1", "Station 40"})
+        self.client.login(username='staff', password='staff123')
+        response = self.client.get(reverse('thermal_rolls:list'), {'to': '9999-12-31'})
+        self.assertEqual(len(response.context['records']), 3)
+        response = self.client.get(reverse('support_records:export'), {'from': '9999-12-31', 'to': '9999-12-31'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_keeps_filters(self):
+        """Test that the list page shows the selected range"""
+        self.client.login(username='staff', password='staff123')
+        first = (self.today - timedelta(days=1)).isoformat()
+        response = self.client.get(reverse('thermal_rolls:list'), {'from': first})
+        self.assertEqual(len(response.context['records']), 2)
+        self.assertContains(response, f'name="from" value="{first}"')
+
+
+@override_settings(ARCHIVE_AFTER_MONTHS=12)
+class ArchiveTest(TestCase):
+    """Test moving long-closed records to the archive tables"""
+
+    def setUp(self):
+        """Create old solved, recently solved and open tickets for two users"""
+        self.admin_user = User.objects.create_user(username='admin', password='admin123')
+        self.admin_user.groups.add(Group.objects.create(name='Admin'))
+        self.staff_user = User.objects.create_user(username='staff', password='staff123')
+        self.other_user = User.objects.create_user(username='other', password='other123')
+        long_ago = timezone.now() - timedelta(days=500)
+        self.old = self.create_record("Old Ticket", SupportRecord.SOLVED, long_ago)
+        self.other_old = self.create_record("Other Ticket", SupportRecord.SOLVED, long_ago, user=self.other_user)
+        self.recent = self.create_record("Recent Ticket", SupportRecord.SOLVED, timezone.now() - timedelta(days=30))
+        self.open = self.create_record("Open Ticket", SupportRecord.PENDING, long_ago)
+        self.client = Client()
+
+    def create_record(self, name, status, when, user=None):
+        record = SupportRecord.objects.create(
+            staff_name=name, staff_id="EMP001", phone_number="+1234567890", issue_reported="Printer jam",
+            status=SupportRecord.PENDING, recorded_by=user or self.staff_user, timestamp=when,
+        )
+        if status != SupportRecord.PENDING:
+            record.status = status
+            record.resolved_at = when
+            record.save()
+        return record
+
+    def archive(self):
+        out = StringIO()
+        call_command('archive_records', stdout=out)
+        return out.getvalue()
+
+    def test_command_moves_only_long_closed_records(self):
+        """Test that records closed before the cutoff move, keeping their ids and columns"""
+        self.assertIn('support: archived 2 record(s)', self.archive())
+        self.assertEqual(
+            set(SupportRecord.objects.values_list('pk', flat=True)), {self.recent.pk, self.open.pk}
+        )
+        archived = ArchivedSupportRecord.objects.get(pk=self.old.pk)
+        self.assertEqual(archived.staff_name, "Old Ticket")
+        self.assertEqual(archived.recorded_by, self.staff_user)
+        self.assertEqual(archived.resolved_at, self.old.resolved_at)
+        self.assertIn('archived 0 record(s)', self.archive())
+
+    def test_dry_run(self):
+        """Test that a dry run only counts"""
+        out = StringIO()
+        call_command('archive_records', '--dry-run', '--module', 'support', stdout=out)
+        self.assertIn('support: 2 record(s)', out.getvalue())
+        self.assertEqual(ArchivedSupportRecord.objects.count(), 0)
+
+    def test_history_and_counters_are_kept(self):
+        """Test that archiving leaves dashboard counters and status history in place"""
+        stats = counter_dashboard_stats(self.admin_user, True)
+        self.archive()
+        self.assertEqual(counter_dashboard_stats(self.admin_user, True), stats)
+        self.assertEqual(counters.check(), [])
+        self.assertFalse(Tombstone.objects.exists())
+        archived = ArchivedSupportRecord.objects.get(pk=self.old.pk)
+        self.assertEqual([t.to_status for t in history.record_history(archived)], [SupportRecord.SOLVED])
+
+    def test_fuzzy_index_entries_leave_with_the_record(self):
+        """Test that trigram rows of archived records are dropped (SQLite)"""
+        self.archive()
+        self.assertFalse(NameTrigram.objects.filter(record_id=self.old.pk, model='support_records.supportrecord').exists())
+
+    def test_list_reads_archive_on_request(self):
+        """Test that the list page shows archived records only with ?archive=1"""
+        self.archive()
+        self.client.login(username='staff', password='staff123')
+        url = reverse('support_records:list')
+        self.assertNotContains(self.client.get(url), "Old Ticket")
+        response = self.client.get(url, {'archive': '1', 'search': 'old'})
+        self.assertContains(response, "Old Ticket")
+        self.assertNotContains(response, "Other Ticket")
+        self.assertNotContains(response, reverse('support_records:update', args=[self.old.pk]))
+
+    def test_date_range_reads_archive(self):
+        """Test that a date range reaching into the archive lists live and archived records together"""
+        self.archive()
+        self.client.login(username='staff', password='staff123')
+        url = reverse('support_records:list')
+        first = (timezone.localtime() - timedelta(days=501)).date().isoformat()
+        response = self.client.get(url, {'from': first})
+        names = [record.staff_name for record in response.context['records']]
+        self.assertEqual(names, ["Recent Ticket", "Open Ticket", "Old Ticket"])
+        self.assertNotContains(response, reverse('support_records:update', args=[self.old.pk]))
+        self.assertContains(response, reverse('support_records:update', args=[self.recent.pk]))
+        # A range the archive has nothing in reads the live table only
+        response = self.client.get(url, {'from': (timezone.localtime() - timedelta(days=60)).date().isoformat()})
+        self.assertEqual([record.staff_name for record in response.context['records']], ["Recent Ticket"])
+
+    def test_export_date_range_reads_archive(self):
+        """Test that exports over an archived date range include archived rows"""
+        self.archive()
+        self.client.login(username='admin', password='admin123')
+        day = (timezone.localtime() - timedelta(days=500)).date().isoformat()
+        response = self.client.get(reverse('support_records:export'), {'from': day, 'to': day, 'format': 'jsonl'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        out = StringIO()
+        call_command('export_records', 'support', '--from', day, '--to', day, '--user', 'staff', stdout=out)
+        # Header and two rows
+        self.assertEqual(len(out.getvalue().splitlines()), 3)
+
+    def test_detail_falls_back_to_archive(self):
+        """Test that archived records keep their detail page, read-only and scoped"""
+        self.archive()
+        self.client.login(username='staff', password='staff123')
+        response = self.client.get(reverse('support_records:detail', args=[self.old.pk]))
+        self.assertContains(response, "Archived")
+        self.assertNotContains(response, reverse('support_records:update', args=[self.old.pk]))
+        self.assertEqual(self.client.get(reverse('support_records:detail', args=[self.other_old.pk])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('support_records:update', args=[self.old.pk])).status_code, 404)
+
+    def test_global_search_includes_archive_on_request(self):
+        """Test that the global search covers the archive only when asked to"""
+        self.archive()
+        self.client.login(username='admin', password='admin123')
+        url = reverse('search')
+        titles = [activity['title'] for activity in self.client.get(url, {'search': 'ticket'}).context['results']]
+        self.assertEqual(len(titles), 2)
+        response = self.client.get(url, {'search': 'ticket', 'archive': '1'})
+        self.assertEqual(len(response.context['results']), 4)
+        urls = {activity['url'] for activity in response.context['results']}
+        self.assertIn(reverse('support_records:detail', args=[self.old.pk]), urls)
+
+    def test_archive_tables_mirror_live_tables(self):
+        """Test that every archive has the columns of its live table"""
+        for _, model, archive_model, _ in archive.archived_modules():
+            live = {field.attname for field in model._meta.concrete_fields}
+            archived = {field.attname for field in archive_model._meta.concrete_fields}
+            self.assertEqual(archived, live | {'archived_at'}, archive_model.__name__)
+
+    def test_cutoff_is_calendar_months(self):
+        """Test that the cutoff steps back whole months, clamping the day"""
+        moment = timezone.now().replace(year=2025, month=3, day=31)
+        self.assertEqual(archive.cutoff(now=moment).date().isoformat(), '2024-03-31')
+        self.assertEqual(archive.months_before(moment, 1).date().isoformat(), '2025-02-28')
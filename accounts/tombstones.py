@@ -0,0 +1,66 @@
+"""Tombstones for deleted records, read by the sync feed (:mod:`api.sync`).
+
+A :class:`accounts.models.Tombstone` is written (through
+:mod:`accounts.hooks`) for every record deleted with ``delete()`` or a bulk
+queryset delete, in the same transaction as the delete. Tombstones are only
+needed until every offline client has synced past them, so
+``prune_tombstones`` drops those older than ``SYNC_TOMBSTONE_DAYS``.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Tombstone
+from .stats import dashboard_modules
+
+DEFAULT_RETENTION_DAYS = 90
+
+
+def retention():
+    return timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_DAYS', DEFAULT_RETENTION_DAYS))
+
+
+def model_label(model):
+    return model._meta.label_lower
+
+
+def owner_field(model):
+    """Name of the field holding the user who owns records of ``model``"""
+    for _, module_model, user_field in dashboard_modules():
+        if module_model is model:
+            return user_field
+    return None
+
+
+def record_deleted(instance):
+    """Leave a tombstone for one record about to be deleted"""
+    model = type(instance)
+    user_field = owner_field(model)
+    if user_field is None:
+        return
+    Tombstone.objects.create(
+        model=model_label(model),
+        record_id=instance.pk,
+        owner_id=getattr(instance, f'{user_field}_id'),
+        deleted_at=timezone.now(),
+    )
+
+
+def queryset_deleted(queryset):
+    """Leave tombstones for every record in a queryset about to be deleted"""
+    user_field = owner_field(queryset.model)
+    if user_field is None:
+        return
+    now = timezone.now()
+    Tombstone.objects.bulk_create([
+        Tombstone(model=model_label(queryset.model), record_id=pk, owner_id=owner_id, deleted_at=now)
+        for pk, owner_id in queryset.values_list('pk', user_field).iterator(chunk_size=2000)
+    ], batch_size=1000)
+
+
+def prune(now=None):
+    """Delete tombstones past the retention period; returns how many"""
+    cutoff = (now or timezone.now()) - retention()
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
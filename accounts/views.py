@@ -1,3 +1,5 @@
+import io
+
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib.auth import logout
@@ -5,7 +7,16 @@ from django.views.decorators.http import require_POST
 from django.contrib.auth.models import Group
 from django.shortcuts import render, redirect
 from django.contrib import messages
-from django.urls import reverse_lazy
+from django.core.paginator import Paginator
+from django.urls import reverse, reverse_lazy
+from django.utils.http import url_has_allowed_host_and_scheme
+
+from . import archive, bulk, page_cache
+from .forms import RecordImportForm
+from .importer import InvalidImportFile, import_columns, import_records
+from .roles import arequest_user, auser_is_admin, user_is_admin
+from .search import MergedSearchResults, search_records
+from .stats import aget_dashboard_stats, dashboard_modules
 
 
 class CustomLoginView(LoginView):
@@ -43,7 +54,7 @@ def profile_view(request):
     """View and edit user profile"""
     user = request.user
     user_groups = user.groups.all()
-    is_admin = user.groups.filter(name='Admin').exists()
+    is_admin = user_is_admin(user)
     
     context = {
         'user': user,
@@ -53,153 +64,230 @@ def profile_view(request):
     return render(request, 'accounts/profile.html', context)
 
 
-def dashboard_view(request):
+def record_activity(record):
+    """Summarise a record of any module for activity and search listings"""
+    from support_records.models import SupportRecord
+    from asset_management.models import AssetRecord
+    from vendor_assistance.models import VendorAssistance
+    
+    # Archived records are listed like the live records they were
+    model = archive.live_model(type(record))
+    if model is SupportRecord:
+        activity_type = 'support'
+        title = f'Support: {record.staff_name} - {record.issue_reported[:50]}...'
+        url = reverse('support_records:detail', args=[record.pk])
+    elif model is AssetRecord:
+        activity_type = 'asset'
+        title = f'Asset: {record.staff_name} - {record.asset_type}'
+        url = reverse('asset_management:detail', args=[record.pk])
+    elif model is VendorAssistance:
+        activity_type = 'vendor'
+        title = f'Vendor: {record.company_name}'
+        url = reverse('vendor_assistance:detail', args=[record.pk])
+    else:
+        activity_type = 'thermal'
+        title = f'Thermal Rolls: {record.vendor_name} - {record.quantity} rolls'
+        url = reverse('thermal_rolls:detail', args=[record.pk])
+    
+    return {
+        'type': activity_type,
+        'icon': activity_type,
+        'title': title,
+        'url': url,
+        'timestamp': record.timestamp,
+        'status': getattr(record, 'status', None),
+    }
+
+
+async def dashboard_view(request):
     """Enhanced dashboard view with detailed statistics and charts"""
-    if not request.user.is_authenticated:
+    user = await arequest_user(request)
+    if not user.is_authenticated:
         return redirect('accounts:login')
     
     from django.utils import timezone
-    from django.db.models import Count, Q
-    from datetime import timedelta
-    from itertools import chain
     from operator import attrgetter
     from support_records.models import SupportRecord
     from asset_management.models import AssetRecord
     from vendor_assistance.models import VendorAssistance
     from thermal_rolls.models import ThermalRollRecord
     
-    is_admin = request.user.groups.filter(name='Admin').exists()
+    is_admin = await auser_is_admin(user)
     
-    # Base querysets based on user role
-    if is_admin:
-        support_records = SupportRecord.objects.all()
-        asset_records = AssetRecord.objects.all()
-        vendor_records = VendorAssistance.objects.all()
-        thermal_records = ThermalRollRecord.objects.all()
-    else:
-        support_records = SupportRecord.objects.filter(recorded_by=request.user)
-        asset_records = AssetRecord.objects.filter(recorded_by=request.user)
-        vendor_records = VendorAssistance.objects.filter(resolved_by=request.user)
-        thermal_records = ThermalRollRecord.objects.filter(recorded_by=request.user)
-    
-    # Total counts
-    support_count = support_records.count()
-    asset_count = asset_records.count()
-    vendor_count = vendor_records.count()
-    thermal_count = thermal_records.count()
-    total_count = support_count + asset_count + vendor_count + thermal_count
-    
-    # Status breakdowns for Support Records
-    support_pending = support_records.filter(status='PENDING').count()
-    support_in_progress = support_records.filter(status='IN_PROGRESS').count()
-    support_solved = support_records.filter(status='SOLVED').count()
-    
-    # Status breakdowns for Asset Management
-    asset_in_use = asset_records.filter(status='IN_USE').count()
-    asset_returned = asset_records.filter(status='RETURNED').count()
-    asset_under_repair = asset_records.filter(status='UNDER_REPAIR').count()
-    
-    # Status breakdowns for Vendor Assistance
-    vendor_pending = vendor_records.filter(status='PENDING').count()
-    vendor_ongoing = vendor_records.filter(status='ONGOING').count()
-    vendor_resolved = vendor_records.filter(status='RESOLVED').count()
-    
-    # Recent activity (last 10 records across all modules)
-    support_recent = support_records.order_by('-timestamp')[:10]
-    asset_recent = asset_records.order_by('-timestamp')[:10]
-    vendor_recent = vendor_records.order_by('-timestamp')[:10]
-    thermal_recent = thermal_records.order_by('-timestamp')[:10]
-    
-    # Combine and sort all recent records
-    all_recent = sorted(
-        chain(support_recent, asset_recent, vendor_recent, thermal_recent),
-        key=attrgetter('timestamp'),
-        reverse=True
-    )[:10]
-    
-    # Format recent activity for template
-    recent_activity = []
-    for record in all_recent:
-        if isinstance(record, SupportRecord):
-            recent_activity.append({
-                'type': 'support',
-                'icon': 'support',
-                'title': f'Support: {record.staff_name} - {record.issue_reported[:50]}...',
-                'url': f'/support/{record.pk}/',
-                'timestamp': record.timestamp,
-                'status': record.status
-            })
-        elif isinstance(record, AssetRecord):
-            recent_activity.append({
-                'type': 'asset',
-                'icon': 'asset',
-                'title': f'Asset: {record.staff_name} - {record.asset_type}',
-                'url': f'/assets/{record.pk}/',
-                'timestamp': record.timestamp,
-                'status': record.status
-            })
-        elif isinstance(record, VendorAssistance):
-            recent_activity.append({
-                'type': 'vendor',
-                'icon': 'vendor',
-                'title': f'Vendor: {record.company_name}',
-                'url': f'/vendors/{record.pk}/',
-                'timestamp': record.timestamp,
-                'status': record.status
-            })
-        elif isinstance(record, ThermalRollRecord):
-            recent_activity.append({
-                'type': 'thermal',
-                'icon': 'thermal',
-                'title': f'Thermal Rolls: {record.vendor_name} - {record.quantity} rolls',
-                'url': f'/thermal-rolls/{record.pk}/',
-                'timestamp': record.timestamp,
-                'status': None
-            })
-    
-    # This week's activity
-    week_ago = timezone.now() - timedelta(days=7)
-    support_this_week = support_records.filter(timestamp__gte=week_ago).count()
-    asset_this_week = asset_records.filter(timestamp__gte=week_ago).count()
-    vendor_this_week = vendor_records.filter(timestamp__gte=week_ago).count()
-    thermal_this_week = thermal_records.filter(timestamp__gte=week_ago).count()
+    async def build():
+        # Base querysets based on user role
+        if is_admin:
+            support_records = SupportRecord.objects.all()
+            asset_records = AssetRecord.objects.all()
+            vendor_records = VendorAssistance.objects.all()
+            thermal_records = ThermalRollRecord.objects.all()
+        else:
+            support_records = SupportRecord.objects.filter(recorded_by=user)
+            asset_records = AssetRecord.objects.filter(recorded_by=user)
+            vendor_records = VendorAssistance.objects.filter(resolved_by=user)
+            thermal_records = ThermalRollRecord.objects.filter(recorded_by=user)
+        
+        # Totals, status breakdowns and this week's counts
+        stats = await aget_dashboard_stats(user, is_admin)
+        
+        # Recent activity (last 10 records across all modules)
+        recent = []
+        for records in (support_records, asset_records, vendor_records, thermal_records):
+            recent += [record async for record in records.order_by('-timestamp')[:10]]
+        
+        # Combine and sort all recent records
+        all_recent = sorted(recent, key=attrgetter('timestamp'), reverse=True)[:10]
+        
+        # Format recent activity for template
+        return {
+            'recent_activity': [record_activity(record) for record in all_recent],
+            **stats,
+        }
+    
+    # Served from the page cache until a record of any module changes
+    dashboard = await page_cache.acached(
+        'dashboard', [SupportRecord, AssetRecord, VendorAssistance, ThermalRollRecord],
+        user, is_admin, build,
+    )
     
     context = {
         # General
         'is_admin': is_admin,
         'today': timezone.now(),
-        'total_count': total_count,
-        
-        # Total counts
-        'support_count': support_count,
-        'asset_count': asset_count,
-        'vendor_count': vendor_count,
-        'thermal_count': thermal_count,
         
-        # Support Records status
-        'support_pending': support_pending,
-        'support_in_progress': support_in_progress,
-        'support_solved': support_solved,
+        # Recent activity, totals, per-status and this week's counts
+        **dashboard,
         
-        # Asset Management status
-        'asset_in_use': asset_in_use,
-        'asset_returned': asset_returned,
-        'asset_under_repair': asset_under_repair,
-        
-        # Vendor Assistance status
-        'vendor_pending': vendor_pending,
-        'vendor_ongoing': vendor_ongoing,
-        'vendor_resolved': vendor_resolved,
+        # Status breakdowns for the charts (read by the cached chart script)
+        'chart_data': {
+            'support': [dashboard['support_pending'], dashboard['support_in_progress'], dashboard['support_solved']],
+            'asset': [dashboard['asset_in_use'], dashboard['asset_returned'], dashboard['asset_under_repair']],
+            'vendor': [dashboard['vendor_pending'], dashboard['vendor_ongoing'], dashboard['vendor_resolved']],
+        },
+    }
+    
+    return render(request, 'dashboard.html', context)
+
+
+@login_required
+def global_search_view(request):
+    """Search support, asset, vendor and thermal roll records at once"""
+    is_admin = user_is_admin(request.user)
+    search_query = request.GET.get('search', '').strip()
+    include_archive = archive.requested(request.GET)
+    
+    page_obj = None
+    results = []
+    if search_query:
+        # Archived records are only searched on request
+        sources = [(model, user_field) for _, model, user_field in dashboard_modules()]
+        if include_archive:
+            sources += [(archived, user_field) for _, _, archived, user_field in archive.archived_modules()]
         
-        # Recent activity
-        'recent_activity': recent_activity,
+        # Same role scoping as the module list views
+        querysets = []
+        for model, user_field in sources:
+            records = model.objects.all()
+            if not is_admin:
+                records = records.filter(**{user_field: request.user})
+            querysets.append(search_records(records, search_query))
         
-        # This week's activity
-        'support_this_week': support_this_week,
-        'asset_this_week': asset_this_week,
-        'vendor_this_week': vendor_this_week,
-        'thermal_this_week': thermal_this_week,
+        paginator = Paginator(MergedSearchResults(querysets), 20)
+        page_obj = paginator.get_page(request.GET.get('page'))
+        results = [record_activity(record) for record in page_obj]
+    
+    context = {
+        'search_query': search_query,
+        'include_archive': include_archive,
+        'page_obj': page_obj,
+        'results': results,
+        'is_admin': is_admin,
     }
+    return render(request, 'search.html', context)
+
+
+def record_import_view(request, module, title, list_url):
+    """Upload a CSV file into one record module (shared by the module views)"""
+    result = None
+    if request.method == 'POST':
+        form = RecordImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            csv_file = io.TextIOWrapper(form.cleaned_data['file'].file, encoding='utf-8-sig', newline='')
+            try:
+                result = import_records(
+                    module, csv_file, request.user,
+                    allow_owner=user_is_admin(request.user),
+                    dry_run=form.cleaned_data['dry_run'],
+                )
+            except InvalidImportFile as exc:
+                form.add_error('file', str(exc))
+            if result and result.imported and not result.dry_run:
+                messages.success(request, f'Imported {result.imported} record(s).')
+    else:
+        form = RecordImportForm()
     
-    return render(request, 'dashboard.html', context)
+    context = {
+        'form': form,
+        'result': result,
+        'title': title,
+        'list_url': list_url,
+        'columns': import_columns(module),
+    }
+    return render(request, 'import.html', context)
+
 
+def record_queue_view(request, model, user_field, title, list_url):
+    """Open work queue of one record module, oldest first (shared by the module views)"""
+    is_admin = user_is_admin(request.user)
+    
+    # Only open records, in index order: served by the model's partial
+    # indexes, so closed history is never read
+    records = model.objects.filter(model.OPEN_RECORDS)
+    if not is_admin:
+        records = records.filter(**{user_field: request.user})
+    records = records.order_by('timestamp', 'pk')
+    
+    paginator = Paginator(records, 25)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    
+    context = {
+        'title': title,
+        'list_url': list_url,
+        'page_obj': page_obj,
+        'results': [record_activity(record) for record in page_obj],
+        'is_admin': is_admin,
+    }
+    return render(request, 'queue.html', context)
+
+
+def record_bulk_action(request, records, is_admin, list_url):
+    """Apply a list page bulk action to the selected records (shared by the module views)"""
+    selected = []
+    for value in request.POST.getlist('selected'):
+        # Not str.isdigit(): it passes digits like '²' that int() rejects
+        try:
+            selected.append(int(value))
+        except ValueError:
+            continue
+    records = records.filter(pk__in=selected)
+    action = request.POST.get('action')
+    
+    if not selected:
+        messages.warning(request, 'No records were selected.')
+    elif action == 'delete':
+        if is_admin:
+            deleted = bulk.delete_records(records)
+            messages.success(request, f'Deleted {deleted} record(s).')
+        else:
+            messages.error(request, 'You do not have permission to delete records.')
+    elif action == 'status' and hasattr(records.model, 'STATUS_CHOICES') \
+            and request.POST.get('status') in dict(records.model.STATUS_CHOICES):
+        updated = bulk.set_status(records, request.POST['status'])
+        messages.success(request, f'Updated the status of {updated} record(s).')
+    else:
+        messages.error(request, 'Unknown bulk action.')
+    
+    next_url = request.POST.get('next')
+    if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        return redirect(next_url)
+    return redirect(list_url)
@@ -0,0 +1,63 @@
+"""Record modules exposed by the JSON API and their serialization.
+
+Records are read with ``values()`` so no model instances are built. Every
+API field maps to a lookup, with the owner given by username as in
+:mod:`accounts.export`, and a row becomes a dict of the requested fields
+only. Writes are validated by the module's regular ModelForm.
+"""
+from functools import lru_cache
+
+from django.utils.module_loading import import_string
+
+from accounts.export import export_columns
+from accounts.importer import IMPORT_FORMS
+from accounts.stats import dashboard_modules
+
+
+class Resource:
+    """One record module: its model, owner field, form and API fields"""
+
+    def __init__(self, name, model, user_field):
+        self.name = name
+        self.model = model
+        self.user_field = user_field
+        self.form_class = import_string(IMPORT_FORMS[name])
+        self.fields = dict(export_columns(model))
+
+    def scoped(self, user, is_admin):
+        """Records ``user`` may see: all for admins, their own otherwise"""
+        queryset = self.model.objects.all()
+        if not is_admin:
+            queryset = queryset.filter(**{self.user_field: user})
+        return queryset
+
+    def select(self, requested=None):
+        """Return the field names to serialize for a ``?fields=`` value
+
+        ``id`` is always included; raises ``ValueError`` naming unknown
+        fields.
+        """
+        if not requested:
+            return list(self.fields)
+        names = [name.strip() for name in requested.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ValueError(f'Unknown fields: {", ".join(unknown)}')
+        return list(dict.fromkeys(['id', *names]))
+
+    def rows(self, queryset, fields):
+        """``values()`` of ``queryset`` with ``pk`` and ``timestamp`` for cursors"""
+        lookups = dict.fromkeys(['pk', 'timestamp', *(self.fields[name] for name in fields)])
+        return queryset.values(*lookups)
+
+    def serialize(self, row, fields):
+        return {name: row[self.fields[name]] for name in fields}
+
+
+@lru_cache(maxsize=None)
+def resources():
+    """Return ``{module: Resource}`` for every record module"""
+    return {
+        name: Resource(name, model, user_field)
+        for name, model, user_field in dashboard_modules()
+    }
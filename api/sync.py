@@ -0,0 +1,133 @@
+"""Incremental "changes since" feed for offline clients.
+
+A client starts without a cursor, which returns the records it may see,
+and then passes back the ``cursor`` of the previous response. It keeps
+going while ``has_more`` is true. Each response holds:
+
+* ``updated``: records created or changed since the cursor, oldest change
+  first, keyed on ``(updated_at, pk)``;
+* ``deleted``: ids of records deleted since the cursor, read from
+  :class:`accounts.models.Tombstone` rows.
+
+Only changes older than ``SYNC_SETTLE_SECONDS`` are returned. A
+transaction stamps ``updated_at`` before it commits, so the delay keeps a
+slow commit from landing behind a cursor that already moved past it.
+Tombstones are pruned after ``SYNC_TOMBSTONE_DAYS``. A cursor last synced
+before that could have missed deletes, so it is rejected with
+:class:`CursorExpired` and the client must start over.
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts import tombstones
+from accounts.models import Tombstone
+from accounts.pagination import InvalidCursor
+
+DEFAULT_SETTLE_SECONDS = 5
+
+
+class CursorExpired(Exception):
+    """Raised for a cursor older than the tombstone retention period"""
+
+
+class SyncCursor:
+    """Position of a client in the feed
+
+    ``synced`` is the time everything before which has been delivered;
+    ``updated`` and ``deleted`` are the ``(time, pk)`` of the last record
+    and tombstone delivered (``None`` before the first).
+    """
+
+    def __init__(self, synced, updated=None, deleted=None):
+        self.synced = synced
+        self.updated = updated
+        self.deleted = deleted
+
+    def encode(self):
+        def position(value):
+            return None if value is None else [value[0].isoformat(), value[1]]
+
+        payload = json.dumps({
+            's': self.synced.isoformat(),
+            'u': position(self.updated),
+            'd': position(self.deleted),
+        }, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    @classmethod
+    def decode(cls, token):
+        def position(value):
+            return None if value is None else (datetime.fromisoformat(value[0]), int(value[1]))
+
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return cls(datetime.fromisoformat(payload['s']), position(payload['u']), position(payload['d']))
+        except (ValueError, KeyError, TypeError, IndexError) as exc:
+            raise InvalidCursor(token) from exc
+
+
+def settle_delay():
+    return timedelta(seconds=getattr(settings, 'SYNC_SETTLE_SECONDS', DEFAULT_SETTLE_SECONDS))
+
+
+def after(field, position):
+    """Rows strictly after ``position`` in ``(field, pk)`` order"""
+    if position is None:
+        return Q()
+    moment, pk = position
+    return Q(**{f'{field}__gt': moment}) | Q(**{field: moment, 'pk__gt': pk})
+
+
+def changes(resource, user, is_admin, cursor=None, fields=None, limit=100, now=None):
+    """Return one batch of the feed after ``cursor`` (a token or ``None``)
+
+    Raises :class:`~accounts.pagination.InvalidCursor` for a malformed
+    token and :class:`CursorExpired` for one past the retention period.
+    """
+    now = now or timezone.now()
+    settled = now - settle_delay()
+    if cursor:
+        position = SyncCursor.decode(cursor)
+        if position.synced < now - tombstones.retention():
+            raise CursorExpired(cursor)
+    else:
+        # A fresh client has nothing to delete: skip older tombstones
+        position = SyncCursor(settled, deleted=(settled, 0))
+    fields = fields or list(resource.fields)
+
+    # Records changed since the cursor, oldest change first
+    rows = list(
+        resource.rows(resource.scoped(user, is_admin), [*fields, 'updated_at'])
+        .filter(after('updated_at', position.updated), updated_at__lt=settled)
+        .order_by('updated_at', 'pk')[:limit + 1]
+    )
+
+    # Deletes since the cursor, scoped like the records
+    deleted = Tombstone.objects.filter(model=tombstones.model_label(resource.model), deleted_at__lt=settled)
+    if not is_admin:
+        deleted = deleted.filter(owner_id=user.pk)
+    deleted = list(
+        deleted.filter(after('deleted_at', position.deleted))
+        .order_by('deleted_at', 'pk')
+        .values_list('deleted_at', 'pk', 'record_id')[:limit + 1]
+    )
+
+    has_more = len(rows) > limit or len(deleted) > limit
+    rows, deleted = rows[:limit], deleted[:limit]
+    next_position = SyncCursor(
+        position.synced if has_more else settled,
+        (rows[-1]['updated_at'], rows[-1]['pk']) if rows else position.updated,
+        deleted[-1][:2] if deleted else position.deleted,
+    )
+    return {
+        'updated': [resource.serialize(row, fields) for row in rows],
+        'deleted': [record_id for _, _, record_id in deleted],
+        'cursor': next_position.encode(),
+        'has_more': has_more,
+    }
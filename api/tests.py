@@ -0,0 +1,275 @@
+"""
+Tests for the JSON record API
+"""
+import json
+
+from django.contrib.auth.models import Group, User
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from accounts import bulk
+from accounts.models import Tombstone
+
+from support_records.models import SupportRecord
+from thermal_rolls.models import ThermalRollRecord
+from vendor_assistance.models import VendorAssistance
+
+
+class RecordApiTest(TestCase):
+    """Test listing, reading and writing records through the API"""
+
+    def setUp(self):
+        """Create an admin and a staff user with support records each"""
+        self.admin_user = User.objects.create_user(username='admin', password='admin123')
+        self.admin_user.groups.add(Group.objects.create(name='Admin'))
+        self.staff_user = User.objects.create_user(username='staff', password='staff123')
+        self.records = [
+            SupportRecord.objects.create(
+                staff_name=f"Staff {i}", staff_id=f"EMP{i:03d}", phone_number="+1234567890",
+                issue_reported="Issue", recorded_by=self.staff_user if i < 5 else self.admin_user
+            )
+            for i in range(6)
+        ]
+        self.client = Client()
+        self.url = reverse('api:collection', args=['support'])
+
+    def item_url(self, record, module='support'):
+        return reverse('api:item', args=[module, record.pk])
+
+    def send(self, method, url, data):
+        return getattr(self.client, method)(url, json.dumps(data), content_type='application/json')
+
+    def test_requires_login(self):
+        """Test that anonymous requests are refused with a JSON error"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+        self.assertIn('error', response.json())
+
+    def test_unknown_module(self):
+        """Test that unknown modules are 404s"""
+        self.client.login(username='staff', password='staff123')
+        self.assertEqual(self.client.get(reverse('api:collection', args=['bogus'])).status_code, 404)
+
+    def test_list_is_scoped_by_role(self):
+        """Test that staff only list their own records and admins list all"""
+        self.client.login(username='staff', password='staff123')
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['count'], 5)
+        self.assertEqual({row['recorded_by'] for row in data['results']}, {'staff'})
+
+        self.client.login(username='admin', password='admin123')
+        self.assertEqual(self.client.get(self.url).json()['count'], 6)
+
+    def test_sparse_fieldsets(self):
+        """Test that only the requested fields (and id) are returned"""
+        self.client.login(username='staff', password='staff123')
+        data = self.client.get(self.url, {'fields': 'staff_name,status'}).json()
+        self.assertEqual(set(data['results'][0]), {'id', 'staff_name', 'status'})
+        response = self.client.get(self.url, {'fields': 'staff_name,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.json()['error'])
+
+    def test_cursor_pagination(self):
+        """Test that following next visits every record once, newest first"""
+        self.client.login(username='admin', password='admin123')
+        data = self.client.get(self.url, {'limit': 4, 'count': 0}).json()
+        self.assertNotIn('count', data)
+        seen = [row['id'] for row in data['results']]
+        while data['next']:
+            data = self.client.get(data['next']).json()
+            seen.extend(row['id'] for row in data['results'])
+        self.assertEqual(seen, [record.pk for record in reversed(self.records)])
+        self.assertEqual(self.client.get(self.url, {'cursor': 'bogus'}).status_code, 400)
+
+    def test_values_serialization(self):
+        """Test that a page is one query per request, without the count"""
+        self.client.login(username='admin', password='admin123')
+        self.client.get(self.url)
+        with self.assertNumQueries(4):
+            # Session, user, group names and the page itself
+            self.client.get(self.url, {'count': 0})
+
+    def test_etag(self):
+        """Test that an unchanged list answers If-None-Match with 304"""
+        self.client.login(username='staff', password='staff123')
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.records[0].status = SupportRecord.SOLVED
+        self.records[0].save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail(self):
+        """Test reading one record, and that others' records are hidden"""
+        self.client.login(username='staff', password='staff123')
+        data = self.client.get(self.item_url(self.records[0])).json()
+        self.assertEqual(data['staff_name'], "Staff 0")
+        self.assertEqual(data['recorded_by'], 'staff')
+        self.assertEqual(self.client.get(self.item_url(self.records[5])).status_code, 404)
+
+    def test_create(self):
+        """Test that created records are validated and owned by the caller"""
+        self.client.login(username='staff', password='staff123')
+        response = self.send('post', self.url, {
+            'staff_name': "New", 'staff_id': "EMP100", 'phone_number': "+1234567890",
+            'issue_reported': "Printer jam", 'status': SupportRecord.PENDING,
+        })
+        self.assertEqual(response.status_code, 201)
+        record = SupportRecord.objects.get(pk=response.json()['id'])
+        self.assertEqual(record.recorded_by, self.staff_user)
+        self.assertEqual(response['Location'], self.item_url(record))
+
+        response = self.send('post', self.url, {'staff_name': "Missing fields"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('issue_reported', response.json()['errors'])
+
+    def test_create_thermal_roll(self):
+        """Test that each module validates with its own form"""
+        self.client.login(username='staff', password='staff123')
+        url = reverse('api:collection', args=['thermal'])
+        response = self.send('post', url, {
+            'vendor_name': "Station", 'cashier_owner_name': "Owner",
+            'quantity': 3, 'phone_number': "+1234567890",
+        })
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(ThermalRollRecord.objects.get().recorded_by, self.staff_user)
+
+    def test_vendor_owner_field(self):
+        """Test that vendor requests are scoped by resolved_by"""
+        VendorAssistance.objects.create(
+            company_name="Acme", cashier_owner_name="Owner", problem_reported="POS down",
+            phone_number="+1234567890", resolved_by=self.admin_user
+        )
+        self.client.login(username='staff', password='staff123')
+        self.assertEqual(self.client.get(reverse('api:collection', args=['vendor'])).json()['count'], 0)
+
+    def test_patch_keeps_other_fields(self):
+        """Test that PATCH only changes the fields sent"""
+        self.client.login(username='staff', password='staff123')
+        response = self.send('patch', self.item_url(self.records[0]), {'status': SupportRecord.SOLVED})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], SupportRecord.SOLVED)
+        record = SupportRecord.objects.get(pk=self.records[0].pk)
+        self.assertEqual(record.staff_name, "Staff 0")
+        self.assertIsNotNone(record.resolved_at)
+
+        response = self.send('patch', self.item_url(self.records[5]), {'status': SupportRecord.SOLVED})
+        self.assertEqual(response.status_code, 404)
+
+    def test_delete_is_admin_only(self):
+        """Test that only admins delete records"""
+        self.client.login(username='staff', password='staff123')
+        self.assertEqual(self.client.delete(self.item_url(self.records[0])).status_code, 403)
+        self.client.login(username='admin', password='admin123')
+        self.assertEqual(self.client.delete(self.item_url(self.records[0])).status_code, 204)
+        self.assertFalse(SupportRecord.objects.filter(pk=self.records[0].pk).exists())
+
+    def test_writes_need_csrf_token(self):
+        """Test that session-authenticated writes are CSRF protected"""
+        client = Client(enforce_csrf_checks=True)
+        client.login(username='admin', password='admin123')
+        self.assertEqual(client.delete(self.item_url(self.records[0])).status_code, 403)
+        self.assertTrue(SupportRecord.objects.filter(pk=self.records[0].pk).exists())
+
+        client.get(self.url)
+        token = client.cookies['csrftoken'].value
+        response = client.delete(self.item_url(self.records[0]), HTTP_X_CSRFTOKEN=token)
+        self.assertEqual(response.status_code, 204)
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class SyncFeedTest(TestCase):
+    """Test the changes-since feed for offline clients"""
+
+    def setUp(self):
+        """Create thermal roll records for a staff user and an admin"""
+        self.admin_user = User.objects.create_user(username='admin', password='admin123')
+        self.admin_user.groups.add(Group.objects.create(name='Admin'))
+        self.staff_user = User.objects.create_user(username='staff', password='staff123')
+        self.records = [self.create_record(self.staff_user) for _ in range(3)]
+        self.other = self.create_record(self.admin_user)
+        self.client = Client()
+        self.client.login(username='staff', password='staff123')
+        self.url = reverse('api:changes', args=['thermal'])
+
+    def create_record(self, user, quantity=5):
+        return ThermalRollRecord.objects.create(
+            vendor_name="Station", cashier_owner_name="Owner", quantity=quantity,
+            phone_number="+1234567890", recorded_by=user
+        )
+
+    def pull(self, cursor=None, **params):
+        if cursor:
+            params['cursor'] = cursor
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_initial_sync(self):
+        """Test that a fresh client gets its records and no old deletes"""
+        self.create_record(self.staff_user).delete()
+        data = self.pull()
+        self.assertEqual({row['id'] for row in data['updated']}, {record.pk for record in self.records})
+        self.assertEqual(data['deleted'], [])
+        self.assertFalse(data['has_more'])
+
+    def test_deltas_since_cursor(self):
+        """Test that only records changed, created or deleted since the cursor come back"""
+        cursor = self.pull()['cursor']
+        self.assertEqual(self.pull(cursor)['updated'], [])
+
+        self.records[0].quantity = 9
+        self.records[0].save()
+        created = self.create_record(self.staff_user)
+        deleted_pk = self.records[1].pk
+        self.records[1].delete()
+        self.create_record(self.admin_user).delete()
+
+        data = self.pull(cursor)
+        self.assertEqual([row['id'] for row in data['updated']], [self.records[0].pk, created.pk])
+        self.assertEqual(data['updated'][0]['quantity'], 9)
+        self.assertEqual(data['deleted'], [deleted_pk])
+        self.assertEqual(self.pull(data['cursor'])['updated'], [])
+
+    def test_bulk_changes_are_fed(self):
+        """Test that bulk status updates and deletes reach the feed"""
+        client = Client()
+        client.login(username='staff', password='staff123')
+        url = reverse('api:changes', args=['support'])
+        record = SupportRecord.objects.create(
+            staff_name="Staff", staff_id="EMP001", phone_number="+1234567890",
+            issue_reported="Issue", recorded_by=self.staff_user
+        )
+        cursor = client.get(url).json()['cursor']
+        bulk.set_status(SupportRecord.objects.filter(pk=record.pk), SupportRecord.SOLVED)
+        data = client.get(url, {'cursor': cursor}).json()
+        self.assertEqual([row['status'] for row in data['updated']], [SupportRecord.SOLVED])
+
+        bulk.delete_records(SupportRecord.objects.filter(pk=record.pk))
+        self.assertEqual(client.get(url, {'cursor': data['cursor']}).json()['deleted'], [record.pk])
+
+    def test_batches(self):
+        """Test that has_more pages through a large backlog"""
+        cursor, seen = None, []
+        while True:
+            data = self.pull(cursor, limit=2, fields='quantity')
+            seen.extend(row['id'] for row in data['updated'])
+            self.assertTrue(all(set(row) == {'id', 'quantity'} for row in data['updated']))
+            cursor = data['cursor']
+            if not data['has_more']:
+                break
+        self.assertEqual(seen, [record.pk for record in self.records])
+
+    @override_settings(SYNC_SETTLE_SECONDS=60)
+    def test_recent_changes_wait_to_settle(self):
+        """Test that changes younger than the settle delay are held back"""
+        self.assertEqual(self.pull()['updated'], [])
+
+    def test_bad_and_expired_cursors(self):
+        """Test that malformed cursors are 400s and expired ones 410s"""
+        self.assertEqual(self.client.get(self.url, {'cursor': 'bogus'}).status_code, 400)
+        cursor = self.pull()['cursor']
+        Tombstone.objects.all().delete()
+        with override_settings(SYNC_TOMBSTONE_DAYS=0):
+            self.assertEqual(self.client.get(self.url, {'cursor': cursor}).status_code, 410)
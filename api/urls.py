@@ -0,0 +1,10 @@
+from django.urls import path
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('<str:module>/', views.record_collection, name='collection'),
+    path('<str:module>/changes/', views.record_changes, name='changes'),
+    path('<str:module>/<int:pk>/', views.record_item, name='item'),
+]
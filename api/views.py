@@ -0,0 +1,221 @@
+"""JSON API for the record modules.
+
+``/api/<module>/`` lists (GET) and creates (POST) records, and
+``/api/<module>/<pk>/`` reads (GET), updates (PATCH/PUT) and deletes
+(DELETE) one, where ``<module>`` is ``support``, ``asset``, ``vendor`` or
+``thermal``. ``/api/<module>/changes/`` is the incremental sync feed of
+:mod:`api.sync`.
+
+* Role scoping matches the HTML views: admins see every record, other users
+  only their own, and only admins delete.
+* ``?fields=a,b`` returns only those fields (``id`` is always included).
+* Lists are cursor-paginated on ``(timestamp, pk)``: follow ``next``.
+  ``?limit=`` sets the page size, ``?count=0`` skips the total, and the
+  search, status and date filters of the list pages apply (live records
+  only).
+* GET responses carry an ``ETag``; a matching ``If-None-Match`` gets a 304.
+* Requests are authenticated by the session. Writes must send the value
+  of the ``csrftoken`` cookie (set by any GET) in an ``X-CSRFToken`` header.
+"""
+import json
+from functools import wraps
+
+from django.forms.models import model_to_dict
+from django.http import HttpResponse, JsonResponse
+from django.middleware.csrf import get_token
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, set_response_etag
+from django.views.decorators.csrf import csrf_protect
+from django.views.decorators.http import require_http_methods
+
+from accounts.filters import filter_records
+from accounts.pagination import CursorPaginator, InvalidCursor
+from accounts.roles import user_is_admin
+
+from . import sync
+from .resources import resources
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+class ApiError(Exception):
+    """A request the API rejects, answered with ``{"error": message}``
+
+    Form validation errors are added as ``errors``, keyed on field name.
+    """
+
+    def __init__(self, message, status=400, errors=None):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.errors = errors
+
+    def response(self):
+        data = {'error': self.message}
+        if self.errors is not None:
+            data['errors'] = self.errors
+        return JsonResponse(data, status=self.status)
+
+
+def api_view(view):
+    """Authenticate, look up the module and answer conditional GETs
+
+    The view is called with ``(request, resource, is_admin, ...)``.
+    """
+    @wraps(view)
+    def wrapper(request, module, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'Authentication required.'}, status=403)
+        resource = resources().get(module)
+        if resource is None:
+            return JsonResponse({'error': f'Unknown module: {module}'}, status=404)
+        try:
+            response = view(request, resource, user_is_admin(request.user), *args, **kwargs)
+        except ApiError as exc:
+            return exc.response()
+        if request.method in ('GET', 'HEAD') and response.status_code == 200:
+            # Hand out the CSRF cookie that later writes must echo back
+            get_token(request)
+            set_response_etag(response)
+            return get_conditional_response(request, etag=response['ETag'], response=response)
+        return response
+    return wrapper
+
+
+def selected_fields(request, resource):
+    try:
+        return resource.select(request.GET.get('fields'))
+    except ValueError as exc:
+        raise ApiError(str(exc))
+
+
+def page_limit(params):
+    try:
+        limit = int(params.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise ApiError('limit must be a number.')
+    return min(max(limit, 1), MAX_LIMIT)
+
+
+def json_body(request):
+    """Return the JSON object sent as the request body"""
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        raise ApiError('Request body is not valid JSON.')
+    if not isinstance(data, dict):
+        raise ApiError('Request body must be a JSON object.')
+    return data
+
+
+def page_url(request, cursor):
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+
+
+def get_record(resource, request, is_admin, pk):
+    try:
+        return resource.scoped(request.user, is_admin).get(pk=pk)
+    except resource.model.DoesNotExist:
+        raise ApiError('Record not found.', 404)
+
+
+def record_response(request, resource, is_admin, pk, status=200):
+    """Serialize one record (the requested fields) read with ``values()``"""
+    fields = selected_fields(request, resource)
+    row = resource.rows(resource.scoped(request.user, is_admin).filter(pk=pk), fields).first()
+    if row is None:
+        raise ApiError('Record not found.', 404)
+    return JsonResponse(resource.serialize(row, fields), status=status)
+
+
+def validated_record(resource, data, instance=None):
+    """Validate ``data`` with the module's form and return the unsaved record"""
+    form = resource.form_class(data, instance=instance)
+    if not form.is_valid():
+        raise ApiError('Invalid record.', errors=form.errors.get_json_data())
+    return form.save(commit=False)
+
+
+@require_http_methods(['GET', 'HEAD', 'POST'])
+@csrf_protect
+@api_view
+def record_collection(request, resource, is_admin):
+    """List the records of a module, or create one"""
+    if request.method == 'POST':
+        record = validated_record(resource, json_body(request))
+        setattr(record, resource.user_field, request.user)
+        record.save()
+        response = record_response(request, resource, is_admin, record.pk, status=201)
+        response['Location'] = reverse('api:item', args=[resource.name, record.pk])
+        return response
+
+    fields = selected_fields(request, resource)
+    records = resource.scoped(request.user, is_admin)
+    records, _ = filter_records(records, request.GET)
+
+    # Keyset pagination over values() rows
+    paginator = CursorPaginator(
+        resource.rows(records, fields), page_limit(request.GET),
+        with_count=request.GET.get('count') != '0',
+    )
+    try:
+        page = paginator.page(request.GET.get('cursor'))
+    except InvalidCursor:
+        raise ApiError('Invalid cursor.')
+
+    data = {
+        'next': page_url(request, page.next_cursor),
+        'previous': page_url(request, page.previous_cursor),
+        'results': [resource.serialize(row, fields) for row in page],
+    }
+    if paginator.with_count:
+        data['count'] = paginator.count
+    return JsonResponse(data)
+
+
+@require_http_methods(['GET', 'HEAD', 'PATCH', 'PUT', 'DELETE'])
+@csrf_protect
+@api_view
+def record_item(request, resource, is_admin, pk):
+    """Read, update or delete one record"""
+    if request.method in ('GET', 'HEAD'):
+        return record_response(request, resource, is_admin, pk)
+
+    record = get_record(resource, request, is_admin, pk)
+    if request.method == 'DELETE':
+        if not is_admin:
+            raise ApiError('Only admins can delete records.', 403)
+        record.delete()
+        return HttpResponse(status=204)
+
+    # PATCH keeps the fields left out of the body; PUT replaces them all
+    data = json_body(request)
+    if request.method == 'PATCH':
+        data = {**model_to_dict(record, fields=resource.form_class._meta.fields), **data}
+    record = validated_record(resource, data, instance=record)
+    record.save()
+    return record_response(request, resource, is_admin, pk)
+
+
+@require_http_methods(['GET', 'HEAD'])
+@csrf_protect
+@api_view
+def record_changes(request, resource, is_admin):
+    """Records changed and deleted since ``?cursor=``, for offline clients"""
+    try:
+        data = sync.changes(
+            resource, request.user, is_admin,
+            cursor=request.GET.get('cursor'),
+            fields=selected_fields(request, resource),
+            limit=page_limit(request.GET),
+        )
+    except InvalidCursor:
+        raise ApiError('Invalid cursor.')
+    except sync.CursorExpired:
+        raise ApiError('Cursor expired: sync again without a cursor.', 410)
+    return JsonResponse(data)
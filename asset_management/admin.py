@@ -1,15 +1,22 @@
 from django.contrib import admin
+from django.db import transaction
+
+from accounts import hooks
+from accounts.admin_mixins import BulkStatusActionsMixin, DeferredChangeListMixin, FullTextSearchMixin
+from accounts.roles import user_is_admin
 from .models import AssetRecord
 
 
 @admin.register(AssetRecord)
-class AssetRecordAdmin(admin.ModelAdmin):
+class AssetRecordAdmin(BulkStatusActionsMixin, FullTextSearchMixin, DeferredChangeListMixin, admin.ModelAdmin):
     list_display = ('staff_name', 'staff_id', 'asset_type', 'division', 'status', 'recorded_by', 'timestamp')
     list_filter = ('status', 'asset_type', 'division', 'timestamp', 'recorded_by')
-    search_fields = ('staff_name', 'staff_id', 'asset_type', 'division', 'phone_number', 'problem_reported')
+    search_fields = AssetRecord.SEARCH_FIELDS
     readonly_fields = ('timestamp', 'returned_at')
     date_hierarchy = 'timestamp'
     list_per_page = 25
+    list_select_related = ('recorded_by',)
+    changelist_defer = ('problem_reported', 'notes', 'signature')
     
     fieldsets = (
         ('Staff Information', {
@@ -33,10 +40,16 @@ class AssetRecordAdmin(admin.ModelAdmin):
             obj.recorded_by = request.user
         super().save_model(request, obj, form, change)
     
+    def delete_queryset(self, request, queryset):
+        """Keep record counters and indexes in step with bulk deletes"""
+        with transaction.atomic():
+            hooks.before_queryset_delete(queryset)
+            super().delete_queryset(request, queryset)
+    
     def get_queryset(self, request):
         """Filter queryset based on user group"""
         qs = super().get_queryset(request)
-        if request.user.is_superuser or request.user.groups.filter(name='Admin').exists():
+        if request.user.is_superuser or user_is_admin(request.user):
             return qs
         return qs.filter(recorded_by=request.user)
 
@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from accounts.search import CreateSearchIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset_management', '0001_initial'),
+    ]
+
+    operations = [
+        CreateSearchIndex('AssetRecord', fields=['staff_name', 'staff_id', 'asset_type', 'division', 'phone_number', 'problem_reported']),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations
+
+from accounts.fuzzy import CreateTrigramIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_name_trigram'),
+        ('asset_management', '0002_assetrecord_search_index'),
+    ]
+
+    operations = [
+        CreateTrigramIndex('AssetRecord', fields=['staff_name']),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:26
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    """Date existing records by when they were recorded, not by the migration"""
+    apps.get_model('asset_management', 'AssetRecord').objects.update(updated_at=F('timestamp'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset_management', '0003_assetrecord_trigram_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assetrecord',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='When this was last changed (see api.sync)'),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='assetrecord',
+            index=models.Index(fields=['updated_at'], name='asset_manag_updated_cb53cc_idx'),
+        ),
+    ]
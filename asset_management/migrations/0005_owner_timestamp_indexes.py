@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset_management', '0004_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assetrecord',
+            index=models.Index(fields=['recorded_by', '-timestamp', '-id'], name='asset_manag_recorde_b63578_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assetrecord',
+            index=models.Index(fields=['recorded_by', 'status', '-timestamp', '-id'], name='asset_manag_recorde_41d4a7_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset_management', '0005_owner_timestamp_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assetrecord',
+            index=models.Index(condition=models.Q(('status', 'UNDER_REPAIR')), fields=['status', 'timestamp', 'id'], name='assetrec_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assetrecord',
+            index=models.Index(condition=models.Q(('status', 'UNDER_REPAIR')), fields=['recorded_by', 'status', 'timestamp', 'id'], name='assetrec_open_owner_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:47
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset_management', '0006_open_queue_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAssetRecord',
+            fields=[
+                ('id', models.BigIntegerField(help_text='Id of the record in the live table', primary_key=True, serialize=False)),
+                ('staff_name', models.CharField(help_text='Person collecting/handling the asset', max_length=200)),
+                ('staff_id', models.CharField(help_text='Staff ID number', max_length=50)),
+                ('problem_reported', models.TextField(help_text='Reason for collection or issue with asset')),
+                ('asset_type', models.CharField(help_text='Type of asset/machine', max_length=100)),
+                ('division', models.CharField(help_text='Department or division', max_length=100)),
+                ('phone_number', models.CharField(help_text='Contact number', max_length=20)),
+                ('signature', models.CharField(blank=True, help_text='Digital signature or placeholder', max_length=200)),
+                ('status', models.CharField(choices=[('IN_USE', 'In Use'), ('RETURNED', 'Returned'), ('UNDER_REPAIR', 'Under Repair')], help_text='Status when archived', max_length=20)),
+                ('timestamp', models.DateTimeField(help_text='When this was recorded')),
+                ('updated_at', models.DateTimeField(help_text='When this was last changed before archiving')),
+                ('returned_at', models.DateTimeField(blank=True, help_text='When the asset was returned', null=True)),
+                ('notes', models.TextField(blank=True, help_text='Additional notes')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now, help_text='When this was moved to the archive')),
+                ('recorded_by', models.ForeignKey(help_text='ICT staff who recorded this', on_delete=django.db.models.deletion.PROTECT, related_name='archived_asset_records', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived Asset Record',
+                'verbose_name_plural': 'Archived Asset Records',
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['-timestamp', '-id'], name='asset_manag_timesta_f642af_idx'), models.Index(fields=['recorded_by', '-timestamp', '-id'], name='asset_manag_recorde_b51fbd_idx')],
+            },
+        ),
+    ]
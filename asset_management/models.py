@@ -1,7 +1,9 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+from accounts import hooks
+
 
 class AssetRecord(models.Model):
     """Model for tracking physical asset collection or handling"""
@@ -17,6 +19,14 @@ class AssetRecord(models.Model):
         (UNDER_REPAIR, 'Under Repair'),
     ]
     
+    # Status that closes a record, and the timestamp set when it does
+    CLOSED_STATUS = RETURNED
+    CLOSED_AT_FIELD = 'returned_at'
+    
+    # Assets under repair: the open work queue. Served by the partial
+    # indexes below, which leave in-use and returned assets out
+    OPEN_RECORDS = models.Q(status=UNDER_REPAIR)
+    
     staff_name = models.CharField(max_length=200, help_text="Person collecting/handling the asset")
     staff_id = models.CharField(max_length=50, help_text="Staff ID number")
     problem_reported = models.TextField(help_text="Reason for collection or issue with asset")
@@ -41,15 +51,29 @@ class AssetRecord(models.Model):
         help_text="ICT staff who recorded this"
     )
     timestamp = models.DateTimeField(default=timezone.now, help_text="When this was recorded")
+    updated_at = models.DateTimeField(auto_now=True, help_text="When this was last changed (see api.sync)")
     returned_at = models.DateTimeField(null=True, blank=True, help_text="When the asset was returned")
     notes = models.TextField(blank=True, help_text="Additional notes")
     
+    # Columns covered by the full-text search index (see accounts.search)
+    SEARCH_FIELDS = ('staff_name', 'staff_id', 'asset_type', 'division', 'phone_number', 'problem_reported')
+    
+    # Name columns with trigram indexes for fuzzy matching (see accounts.fuzzy)
+    FUZZY_FIELDS = ('staff_name',)
+    
     class Meta:
         ordering = ['-timestamp']
         verbose_name = "Asset Record"
         verbose_name_plural = "Asset Records"
         indexes = [
             models.Index(fields=['-timestamp']),
+            models.Index(fields=['updated_at']),
+            # Open work queue, oldest first; only open records are indexed
+            models.Index(fields=['status', 'timestamp', 'id'], condition=models.Q(status='UNDER_REPAIR'), name='assetrec_open_idx'),
+            models.Index(fields=['recorded_by', 'status', 'timestamp', 'id'], condition=models.Q(status='UNDER_REPAIR'), name='assetrec_open_owner_idx'),
+            # Role-scoped lists: own records newest first, optionally by status
+            models.Index(fields=['recorded_by', '-timestamp', '-id']),
+            models.Index(fields=['recorded_by', 'status', '-timestamp', '-id']),
             models.Index(fields=['status']),
             models.Index(fields=['staff_id']),
             models.Index(fields=['asset_type']),
@@ -62,5 +86,65 @@ class AssetRecord(models.Model):
         # Auto-set returned_at when status changes to RETURNED
         if self.status == self.RETURNED and not self.returned_at:
             self.returned_at = timezone.now()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            state = hooks.before_save(self)
+            super().save(*args, **kwargs)
+            hooks.after_save(self, state)
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            hooks.before_delete(self)
+            return super().delete(*args, **kwargs)
+
 
+class ArchivedAssetRecord(models.Model):
+    """Asset record returned long ago, moved out of the live table
+
+    Same columns and id as the :class:`AssetRecord` it was. Rows are
+    written by the ``archive_records`` command and never changed (see
+    :mod:`accounts.archive`).
+    """
+    
+    STATUS_CHOICES = AssetRecord.STATUS_CHOICES
+    CLOSED_STATUS = AssetRecord.CLOSED_STATUS
+    CLOSED_AT_FIELD = AssetRecord.CLOSED_AT_FIELD
+    
+    # Read-only: views show no edit, delete or bulk actions for these
+    is_archived = True
+    
+    # Searched with icontains: the archive has no full-text index
+    SEARCH_FIELDS = AssetRecord.SEARCH_FIELDS
+    SEARCH_INDEX = False
+    
+    id = models.BigIntegerField(primary_key=True, help_text="Id of the record in the live table")
+    staff_name = models.CharField(max_length=200, help_text="Person collecting/handling the asset")
+    staff_id = models.CharField(max_length=50, help_text="Staff ID number")
+    problem_reported = models.TextField(help_text="Reason for collection or issue with asset")
+    asset_type = models.CharField(max_length=100, help_text="Type of asset/machine")
+    division = models.CharField(max_length=100, help_text="Department or division")
+    phone_number = models.CharField(max_length=20, help_text="Contact number")
+    signature = models.CharField(max_length=200, blank=True, help_text="Digital signature or placeholder")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, help_text="Status when archived")
+    recorded_by = models.ForeignKey(
+        User,
+        on_delete=models.PROTECT,
+        related_name='archived_asset_records',
+        help_text="ICT staff who recorded this"
+    )
+    timestamp = models.DateTimeField(help_text="When this was recorded")
+    updated_at = models.DateTimeField(help_text="When this was last changed before archiving")
+    returned_at = models.DateTimeField(null=True, blank=True, help_text="When the asset was returned")
+    notes = models.TextField(blank=True, help_text="Additional notes")
+    archived_at = models.DateTimeField(default=timezone.now, help_text="When this was moved to the archive")
+    
+    class Meta:
+        ordering = ['-timestamp']
+        verbose_name = "Archived Asset Record"
+        verbose_name_plural = "Archived Asset Records"
+        indexes = [
+            models.Index(fields=['-timestamp', '-id']),
+            models.Index(fields=['recorded_by', '-timestamp', '-id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.staff_name} - {self.asset_type} ({self.status})"
@@ -4,6 +4,7 @@ from django.urls import reverse
 from django.utils import timezone
 from .models import AssetRecord
 from .forms import AssetRecordForm
+from accounts.testing import QueryCountTestMixin, QueryPlanTestMixin
 
 
 class AssetRecordModelTest(TestCase):
@@ -267,6 +268,46 @@ class AssetRecordViewTest(TestCase):
         self.assertIn(response.status_code, [302, 403, 404])
 
 
+class AssetRecordAdminActionTest(TestCase):
+    """Test the admin bulk status actions"""
+    
+    def setUp(self):
+        """Create a superuser and assets in use"""
+        self.root = User.objects.create_superuser(username='root', password='root123')
+        for i in range(3):
+            AssetRecord.objects.create(
+                staff_name=f"Staff {i}", staff_id=f"STF{i:03d}", problem_reported="Issue",
+                asset_type="Laptop", division="IT", phone_number="0123456789",
+                recorded_by=self.root
+            )
+        self.client = Client()
+        self.client.login(username='root', password='root123')
+        
+    def test_mark_returned(self):
+        """Test that the admin action returns assets and sets returned_at"""
+        url = reverse('admin:asset_management_assetrecord_changelist')
+        response = self.client.post(url, {
+            'action': 'mark_returned',
+            '_selected_action': list(AssetRecord.objects.values_list('pk', flat=True)),
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            AssetRecord.objects.filter(status=AssetRecord.RETURNED, returned_at__isnull=False).count(), 3
+        )
+        
+    def test_mark_in_use_keeps_returned_at(self):
+        """Test that reopening an asset keeps its returned_at, like save()"""
+        record = AssetRecord.objects.first()
+        record.status = AssetRecord.RETURNED
+        record.save()
+        self.client.post(reverse('admin:asset_management_assetrecord_changelist'), {
+            'action': 'mark_in_use', '_selected_action': [record.pk],
+        })
+        record.refresh_from_db()
+        self.assertEqual(record.status, AssetRecord.IN_USE)
+        self.assertIsNotNone(record.returned_at)
+
+
 class AssetRecordPermissionTest(TestCase):
     """Test suite for permissions"""
     
@@ -298,3 +339,90 @@ class AssetRecordPermissionTest(TestCase):
         response = self.client.get(reverse('asset_management:detail', args=[self.record1.id]))
         # Should return 404 (record not in filtered queryset) or 403 (permission denied)
         self.assertIn(response.status_code, [302, 403, 404])
+
+
+class AssetRecordQueryCountTest(QueryCountTestMixin, TestCase):
+    """Test that list pages do not issue a query per row"""
+    
+    def setUp(self):
+        """Create an admin, a superuser and a pool of record owners"""
+        self.admin_group = Group.objects.create(name='Admin')
+        self.admin_user = User.objects.create_user(username='admin', password='admin123')
+        self.admin_user.groups.add(self.admin_group)
+        User.objects.create_superuser(username='root', password='root123')
+        self.owners = [
+            User.objects.create_user(username=f'owner{i}', first_name=f'Owner {i}')
+            for i in range(3)
+        ]
+        self.created = 0
+        self.client = Client()
+        
+    def create_records(self, count):
+        """Create records owned by different users"""
+        for _ in range(count):
+            i = self.created
+            owner = self.owners[i % len(self.owners)]
+            AssetRecord.objects.create(
+                staff_name=f"Staff {i}",
+                staff_id=f"STF{i:03d}",
+                problem_reported="Issue",
+                asset_type="Laptop",
+                division="IT",
+                phone_number="0123456789",
+                recorded_by=owner
+            )
+            self.created += 1
+            
+    def test_list_view_query_count(self):
+        """Test that the list view query count is independent of page size"""
+        self.client.login(username='admin', password='admin123')
+        self.assertConstantQueries(reverse('asset_management:list'), self.create_records)
+        
+    def test_admin_changelist_query_count(self):
+        """Test that the admin changelist query count is independent of page size"""
+        self.client.login(username='root', password='root123')
+        self.assertConstantQueries(reverse('admin:asset_management_assetrecord_changelist'), self.create_records)
+
+
+class AssetRecordQueryPlanTest(QueryPlanTestMixin, TestCase):
+    """Test that role-scoped list queries are answered from the composite indexes"""
+    
+    def setUp(self):
+        """Create records for two users"""
+        self.users = [User.objects.create_user(username=f'user{i}') for i in range(2)]
+        for i in range(20):
+            AssetRecord.objects.create(
+                staff_name=f"Staff {i}", staff_id=f"EMP{i:03d}", problem_reported="Broken",
+                asset_type="Laptop", division="IT", phone_number="+1234567890", recorded_by=self.users[i % 2]
+            )
+            
+    def own_records(self):
+        """The list view queryset of a non-admin user, in cursor order"""
+        return (
+            AssetRecord.objects.select_related('recorded_by').defer('notes')
+            .filter(recorded_by=self.users[0]).order_by('-timestamp', '-pk')
+        )
+        
+    def test_own_list_uses_owner_index(self):
+        """Test that own records newest first read the (owner, timestamp) index"""
+        index = self.index_name(AssetRecord, ['recorded_by', '-timestamp', '-id'])
+        self.assertUsesIndex(self.own_records()[:10], index)
+        # Dashboard recent activity
+        self.assertUsesIndex(AssetRecord.objects.filter(recorded_by=self.users[0]).order_by('-timestamp')[:10], index)
+        
+    def test_status_filtered_list_uses_owner_status_index(self):
+        """Test that a status filter on own records reads the (owner, status, timestamp) index"""
+        records = self.own_records().filter(status=AssetRecord.IN_USE)
+        self.assertUsesIndex(records, self.index_name(AssetRecord, ['recorded_by', 'status', '-timestamp', '-id']))
+        
+    def test_open_queue_uses_partial_indexes(self):
+        """Test that the open work queue reads only the partial open-record indexes"""
+        records = AssetRecord.objects.filter(AssetRecord.OPEN_RECORDS).order_by('timestamp', 'pk')
+        self.assertUsesIndex(records[:25], 'assetrec_open_idx')
+        self.assertUsesIndex(records.filter(recorded_by=self.users[0])[:25], 'assetrec_open_owner_idx')
+        
+    def test_open_records_match_index_condition(self):
+        """Test that the queue filter is the condition of its partial indexes"""
+        for name in ('assetrec_open_idx', 'assetrec_open_owner_idx'):
+            index = next(index for index in AssetRecord._meta.indexes if index.name == name)
+            self.assertEqual(index.condition, AssetRecord.OPEN_RECORDS)
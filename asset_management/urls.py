@@ -5,6 +5,10 @@ app_name = 'asset_management'
 
 urlpatterns = [
     path('', views.asset_record_list, name='list'),
+    path('export/', views.asset_record_export, name='export'),
+    path('import/', views.asset_record_import, name='import'),
+    path('queue/', views.asset_record_queue, name='queue'),
+    path('bulk/', views.asset_record_bulk, name='bulk'),
     path('<int:pk>/', views.asset_record_detail, name='detail'),
     path('create/', views.asset_record_create, name='create'),
     path('<int:pk>/update/', views.asset_record_update, name='update'),
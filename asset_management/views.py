@@ -1,70 +1,112 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
-from django.db.models import Q
+from django.views.decorators.csrf import csrf_protect, ensure_csrf_cookie
+from django.views.decorators.http import require_POST
+from accounts import archive, history, page_cache
+from accounts.export import export_response
+from accounts.filters import filter_records
+from accounts.roles import arequest_user, auser_is_admin, user_is_admin
+from accounts.views import record_bulk_action, record_import_view, record_queue_view
 from .models import AssetRecord
 from .forms import AssetRecordForm
 
 
-def user_is_admin(user):
-    """Check if user is in Admin group"""
-    return user.groups.filter(name='Admin').exists()
-
-
 @login_required
-def asset_record_list(request):
+@ensure_csrf_cookie  # for the bulk action form
+async def asset_record_list(request):
     """List all asset records with filtering and search"""
-    is_admin = user_is_admin(request.user)
-    
-    if is_admin:
-        records = AssetRecord.objects.all()
-    else:
-        records = AssetRecord.objects.filter(recorded_by=request.user)
-    
-    # Search
-    search_query = request.GET.get('search', '')
-    if search_query:
-        records = records.filter(
-            Q(staff_name__icontains=search_query) |
-            Q(staff_id__icontains=search_query) |
-            Q(asset_type__icontains=search_query) |
-            Q(division__icontains=search_query)
-        )
+    user = await arequest_user(request)
+    is_admin = await auser_is_admin(user)
     
-    # Filter by status
-    status_filter = request.GET.get('status', '')
-    if status_filter:
-        records = records.filter(status=status_filter)
+    # The live table, plus the archive when the date range reaches into it
+    # (or the archive alone with ?archive=1; archived rows are read-only)
+    archived = archive.requested(request.GET)
+    querysets = []
+    for source in await archive.alist_sources(AssetRecord, request.GET):
+        # Load the owning user in the same query and skip text not shown in the list
+        records = source.objects.select_related('recorded_by').defer('notes')
+        if not is_admin:
+            records = records.filter(recorded_by=user)
+        
+        # Search, status and date filters (shared with the export); fuzzy
+        # matching reads the name index, which has no async query path
+        records, filters = await sync_to_async(filter_records)(records, request.GET)
+        querysets.append(records)
+    records = archive.combined(querysets)
     
-    # Pagination
-    paginator = Paginator(records, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Pagination (offset by default, keyset when a cursor is requested); only
+    # runs when the rows are not already in the fragment cache
+    page_obj, page_records = page_cache.lazy_page(request, records, 10)
     
     context = {
-        'records': records,  # For compatibility with templates
+        'records': page_records,  # Only the current page is rendered
         'page_obj': page_obj,
-        'search_query': search_query,
-        'status_filter': status_filter,
+        'list_cache_key': page_cache.list_cache_key(request, AssetRecord, is_admin),
+        **filters,
         'is_admin': is_admin,
+        'archived': archived,
         'status_choices': AssetRecord.STATUS_CHOICES,
     }
-    return render(request, 'asset_management/list.html', context)
+    # The page is paginated while rendering, by the sync-only paginators:
+    # render in a worker thread
+    return await sync_to_async(render)(request, 'asset_management/list.html', context)
 
 
 @login_required
-def asset_record_detail(request, pk):
-    """View details of a specific asset record"""
+def asset_record_export(request):
+    """Stream the filtered asset records as CSV or JSONL"""
     is_admin = user_is_admin(request.user)
+    querysets = []
+    for source in archive.list_sources(AssetRecord, request.GET):
+        records = source.objects.all()
+        if not is_admin:
+            records = records.filter(recorded_by=request.user)
+        records, _ = filter_records(records, request.GET)
+        querysets.append(records)
+    return export_response(request, querysets, 'asset_management')
+
+
+@login_required
+@csrf_protect
+def asset_record_import(request):
+    """Import asset records from an uploaded CSV file"""
+    return record_import_view(request, 'asset', 'Asset Records', 'asset_management:list')
+
+
+@login_required
+def asset_record_queue(request):
+    """Work queue of assets under repair, oldest first"""
+    return record_queue_view(request, AssetRecord, 'recorded_by', 'Asset Records', 'asset_management:list')
+
+
+@login_required
+@require_POST
+@csrf_protect
+def asset_record_bulk(request):
+    """Change the status of, or delete, the asset records selected on the list page"""
+    is_admin = user_is_admin(request.user)
+    records = AssetRecord.objects.all()
+    if not is_admin:
+        records = records.filter(recorded_by=request.user)
+    return record_bulk_action(request, records, is_admin, 'asset_management:list')
+
+
+@login_required
+async def asset_record_detail(request, pk):
+    """View details of a specific asset record"""
+    user = await arequest_user(request)
+    is_admin = await auser_is_admin(user)
     
     if is_admin:
-        record = get_object_or_404(AssetRecord, pk=pk)
+        record = await archive.aget_record_or_404(AssetRecord, pk=pk)
     else:
-        record = get_object_or_404(AssetRecord, pk=pk, recorded_by=request.user)
+        record = await archive.aget_record_or_404(AssetRecord, pk=pk, recorded_by=user)
     
     context = {
         'record': record,
+        'status_history': [transition async for transition in history.record_history(record)],
         'is_admin': is_admin,
     }
     return render(request, 'asset_management/detail.html', context)
@@ -0,0 +1,124 @@
+"""Trend series read from the daily record rollups.
+
+Everything here is answered from :class:`accounts.models.RecordCounter`
+(maintained on every save, rebuilt by ``rebuild_counters``), never from the
+record tables, so the cost depends on the number of days and users in the
+range rather than the number of records.
+"""
+from datetime import timedelta
+
+from django.db.models import Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from accounts.models import RecordCounter
+from accounts.stats import dashboard_modules, module_statuses
+
+GRANULARITIES = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+# span -> (label, days covered, default granularity)
+SPANS = {
+    '30d': ('Last 30 days', 30, 'day'),
+    '12w': ('Last 12 weeks', 84, 'week'),
+    '12m': ('Last 12 months', 365, 'month'),
+    '3y': ('Last 3 years', 3 * 365, 'month'),
+}
+DEFAULT_SPAN = '12m'
+
+
+def period_start(day, granularity):
+    """Return the first day of the period ``day`` falls in"""
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def periods(start, end, granularity):
+    """Return the start date of every period between ``start`` and ``end``"""
+    result = []
+    current = period_start(start, granularity)
+    while current <= end:
+        result.append(current)
+        if granularity == 'month':
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            current += timedelta(days=7 if granularity == 'week' else 1)
+    return result
+
+
+def report_range(span, today=None):
+    """Return ``(start, end)`` dates for a span key"""
+    end = today or timezone.localdate()
+    return end - timedelta(days=SPANS[span][1] - 1), end
+
+
+def scoped_counters(user, is_admin, start, end):
+    counters = RecordCounter.objects.filter(day__range=(start, end))
+    if not is_admin:
+        counters = counters.filter(user=user)
+    return counters
+
+
+def trend_series(user, is_admin, start, end, granularity):
+    """Return per-period sums for every module
+
+    The result maps each module to ``opened``, ``closed`` and ``quantity``
+    lists (one value per period) plus ``by_status`` with the records opened
+    in each period split by their current status. Runs one query.
+    """
+    trunc = GRANULARITIES[granularity]
+    period_list = periods(start, end, granularity)
+    index = {period: i for i, period in enumerate(period_list)}
+
+    series = {}
+    for prefix, model, _ in dashboard_modules():
+        series[prefix] = {
+            'opened': [0] * len(period_list),
+            'closed': [0] * len(period_list),
+            'quantity': [0] * len(period_list),
+            'by_status': {status: [0] * len(period_list) for status in module_statuses(model)},
+        }
+
+    rows = (
+        scoped_counters(user, is_admin, start, end)
+        .annotate(period=trunc('day'))
+        .values('module', 'status', 'period')
+        .annotate(opened=Sum('count'), closed=Sum('closed'), quantity=Sum('quantity'))
+        .order_by()
+    )
+    for row in rows:
+        i = index[row['period']]
+        module = series[row['module']]
+        module['opened'][i] += row['opened']
+        module['closed'][i] += row['closed']
+        module['quantity'][i] += row['quantity']
+        if row['status'] in module['by_status']:
+            module['by_status'][row['status']][i] += row['opened']
+    return period_list, series
+
+
+def totals_by_user(user, is_admin, start, end):
+    """Return per-officer totals for the range, busiest first"""
+    rows = (
+        scoped_counters(user, is_admin, start, end)
+        .values('user__username', 'module')
+        .annotate(opened=Sum('count'), closed=Sum('closed'), quantity=Sum('quantity'))
+        .order_by()
+    )
+    by_user = {}
+    for row in rows:
+        totals = by_user.setdefault(row['user__username'], {'username': row['user__username']})
+        totals[f'{row["module"]}_opened'] = row['opened']
+        totals[f'{row["module"]}_closed'] = row['closed']
+        if row['module'] == 'thermal':
+            totals['thermal_quantity'] = row['quantity']
+    return sorted(
+        by_user.values(),
+        key=lambda totals: -sum(value for key, value in totals.items() if key.endswith('_opened')),
+    )
@@ -0,0 +1,215 @@
+"""Resolution-time (SLA) metrics for support tickets and vendor requests.
+
+The time to resolve a record is ``CLOSED_AT_FIELD - timestamp``. Metrics
+are grouped by the officer who owns the record and/or the period the record
+was closed in:
+
+* PostgreSQL: mean and ``percentile_cont`` p50/p90/p99 are computed by the
+  database in one grouped query.
+* Other databases: the durations (computed by the database) are streamed in
+  chunks into a :class:`QuantileSketch` per group, so memory stays bounded
+  however many records are closed. Percentiles are then approximate, within
+  ``SKETCH_ACCURACY`` relative error; counts and means are exact.
+
+Open-record age buckets are conditional counts in one query on every
+database.
+"""
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.db import connections
+from django.db.models import Aggregate, Avg, Count, DurationField, ExpressionWrapper, F, FloatField, Func, Min, Q
+from django.utils import timezone
+
+from .rollups import GRANULARITIES
+
+PERCENTILES = (('p50', 0.5), ('p90', 0.9), ('p99', 0.99))
+SKETCH_ACCURACY = 0.01
+
+# (key, label, lower bound, upper bound) of open-record age in days
+AGE_BUCKETS = (
+    ('under_1d', 'Under 1 day', 0, 1),
+    ('1_3d', '1-3 days', 1, 3),
+    ('3_7d', '3-7 days', 3, 7),
+    ('7_30d', '1-4 weeks', 7, 30),
+    ('over_30d', 'Over 30 days', 30, None),
+)
+
+
+def sla_modules():
+    """Return ``(prefix, model, user_field)`` for the modules with SLAs"""
+    from support_records.models import SupportRecord
+    from vendor_assistance.models import VendorAssistance
+
+    return [
+        ('support', SupportRecord, 'recorded_by'),
+        ('vendor', VendorAssistance, 'resolved_by'),
+    ]
+
+
+def uses_percentile_aggregates(using='default'):
+    return connections[using].vendor == 'postgresql'
+
+
+class Percentile(Aggregate):
+    """PostgreSQL ``percentile_cont(fraction) WITHIN GROUP (ORDER BY expr)``"""
+
+    function = 'percentile_cont'
+    name = 'Percentile'
+    output_field = FloatField()
+    template = '%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+
+    def __init__(self, expression, fraction, **extra):
+        super().__init__(expression, fraction=float(fraction), **extra)
+
+
+class EpochSeconds(Func):
+    """Length of a PostgreSQL interval in seconds"""
+
+    template = 'EXTRACT(EPOCH FROM %(expressions)s)'
+    output_field = FloatField()
+
+
+class QuantileSketch:
+    """Streaming quantile estimate with bounded relative error
+
+    Values fall into logarithmic buckets whose width grows with the value
+    (the DDSketch layout), so any quantile is returned within
+    ``relative_accuracy`` of the true value whatever the input size.
+    """
+
+    def __init__(self, relative_accuracy=SKETCH_ACCURACY):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = defaultdict(int)
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        value = max(value, 0.0)
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if value < 1e-6:
+            self.zeros += 1
+        else:
+            self.buckets[math.ceil(math.log(value) / self.log_gamma)] += 1
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def _value_at(self, rank):
+        if rank < self.zeros:
+            return 0.0
+        seen = self.zeros
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                estimate = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def quantile(self, fraction):
+        """Estimate a quantile, interpolating between ranks like ``percentile_cont``"""
+        if not self.count:
+            return None
+        rank = fraction * (self.count - 1)
+        lower = math.floor(rank)
+        value = self._value_at(lower)
+        if rank > lower:
+            value += (rank - lower) * (self._value_at(lower + 1) - value)
+        return value
+
+
+def _period(value):
+    if isinstance(value, datetime):
+        return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+    return value
+
+
+def resolved_records(queryset, model, start, end):
+    """Records closed between the ``start`` and ``end`` dates (inclusive)"""
+    closed_at = model.CLOSED_AT_FIELD
+    return queryset.filter(**{
+        f'{closed_at}__isnull': False,
+        f'{closed_at}__gte': timezone.make_aware(datetime.combine(start, datetime.min.time())),
+        f'{closed_at}__lt': timezone.make_aware(datetime.combine(end + timedelta(days=1), datetime.min.time())),
+    })
+
+
+def resolution_stats(queryset, model, user_field, start, end, by_officer=False, granularity=None):
+    """Return resolution-time statistics per group, in seconds
+
+    Groups by officer (``by_officer``) and/or closing period
+    (``granularity``: day, week or month); with neither, returns one row for
+    the whole range. Each row has ``officer``/``period`` when grouped on
+    them, plus ``resolved``, ``mean`` and one key per :data:`PERCENTILES`.
+    """
+    closed_at = model.CLOSED_AT_FIELD
+    records = resolved_records(queryset, model, start, end).annotate(
+        duration=ExpressionWrapper(F(closed_at) - F('timestamp'), output_field=DurationField()),
+    )
+    group = []
+    if by_officer:
+        records = records.annotate(officer=F(f'{user_field}__username'))
+        group.append('officer')
+    if granularity:
+        records = records.annotate(period=GRANULARITIES[granularity](closed_at))
+        group.append('period')
+
+    if uses_percentile_aggregates(queryset.db):
+        seconds = EpochSeconds('duration')
+        aggregates = {'resolved': Count('pk'), 'mean': Avg(seconds)}
+        aggregates.update({name: Percentile(seconds, fraction) for name, fraction in PERCENTILES})
+        if group:
+            rows = list(records.values(*group).annotate(**aggregates).order_by(*group))
+        else:
+            rows = [records.aggregate(**aggregates)]
+    else:
+        sketches = defaultdict(QuantileSketch)
+        values = records.order_by().values_list(*group, 'duration').iterator(chunk_size=2000)
+        for row in values:
+            sketches[row[:-1]].add(row[-1].total_seconds())
+        if not group:
+            sketches.setdefault((), QuantileSketch())
+        rows = []
+        for key in sorted(sketches, key=lambda key: tuple(str(part) for part in key)):
+            sketch = sketches[key]
+            row = dict(zip(group, key))
+            row.update(resolved=sketch.count, mean=sketch.mean)
+            row.update({name: sketch.quantile(fraction) for name, fraction in PERCENTILES})
+            rows.append(row)
+
+    for row in rows:
+        if 'period' in row:
+            row['period'] = _period(row['period'])
+    return rows
+
+
+def open_age_distribution(queryset, model, user_field, now=None):
+    """Return open-record counts per officer and age bucket, oldest first
+
+    One grouped query with a conditional count per :data:`AGE_BUCKETS`
+    entry. Each row has ``officer``, ``open``, ``oldest`` and the bucket
+    counts.
+    """
+    now = now or timezone.now()
+    buckets = {}
+    for key, _, lower, upper in AGE_BUCKETS:
+        condition = Q(timestamp__lte=now - timedelta(days=lower))
+        if upper is not None:
+            condition &= Q(timestamp__gt=now - timedelta(days=upper))
+        buckets[key] = Count('pk', filter=condition)
+    rows = (
+        queryset.exclude(status=model.CLOSED_STATUS)
+        .values(officer=F(f'{user_field}__username'))
+        .annotate(open=Count('pk'), oldest=Min('timestamp'), **buckets)
+        .order_by('oldest')
+    )
+    return list(rows)
@@ -0,0 +1,240 @@
+"""
+Tests for the trend reports
+"""
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User, Group
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.utils import timezone
+
+from asset_management.models import AssetRecord
+from support_records.models import SupportRecord
+from thermal_rolls.models import ThermalRollRecord
+from vendor_assistance.models import VendorAssistance
+from .rollups import periods, report_range, trend_series
+from .sla import QuantileSketch, open_age_distribution, resolution_stats
+
+
+class PeriodTest(TestCase):
+    """Test period bucketing for the report axes"""
+
+    def test_weekly_periods_start_on_monday(self):
+        """Test that weekly periods are aligned to Mondays"""
+        result = periods(date(2024, 1, 3), date(2024, 1, 16), 'week')
+        self.assertEqual(result, [date(2024, 1, 1), date(2024, 1, 8), date(2024, 1, 15)])
+
+    def test_monthly_periods_cross_year_end(self):
+        """Test that monthly periods roll over into the next year"""
+        result = periods(date(2023, 11, 20), date(2024, 2, 1), 'month')
+        self.assertEqual(result, [date(2023, 11, 1), date(2023, 12, 1), date(2024, 1, 1), date(2024, 2, 1)])
+
+    def test_three_year_range(self):
+        """Test that the longest span covers three years of months"""
+        start, end = report_range('3y', today=date(2024, 6, 30))
+        self.assertEqual(len(periods(start, end, 'month')), 36)
+
+
+class TrendSeriesTest(TestCase):
+    """Test trend series read from the daily rollups"""
+
+    def setUp(self):
+        self.admin_group = Group.objects.create(name='Admin')
+        self.admin_user = User.objects.create_user(username='admin', password='admin123')
+        self.admin_user.groups.add(self.admin_group)
+        self.staff_user = User.objects.create_user(username='staff', password='staff123')
+        self.today = timezone.localdate()
+        last_week = timezone.now() - timedelta(days=7)
+
+        self.ticket = SupportRecord.objects.create(
+            staff_name="Staff", staff_id="EMP001", phone_number="0123456789",
+            issue_reported="Issue", status=SupportRecord.PENDING, timestamp=last_week,
+            recorded_by=self.staff_user
+        )
+        SupportRecord.objects.create(
+            staff_name="Admin", staff_id="EMP002", phone_number="0123456789",
+            issue_reported="Issue", status=SupportRecord.PENDING,
+            recorded_by=self.admin_user
+        )
+        ThermalRollRecord.objects.create(
+            vendor_name="Station 1", cashier_owner_name="Owner", quantity=5,
+            phone_number="0123456789", recorded_by=self.staff_user
+        )
+
+    def series(self, user, is_admin):
+        start, end = report_range('30d')
+        labels, series = trend_series(user, is_admin, start, end, 'day')
+        return labels, series
+
+    def test_opened_and_solved_by_day(self):
+        """Test that a ticket counts as opened on its day and solved on the close day"""
+        self.ticket.status = SupportRecord.SOLVED
+        self.ticket.save()
+        labels, series = self.series(self.admin_user, True)
+        opened_day = labels.index(self.today - timedelta(days=7))
+        self.assertEqual(series['support']['opened'][opened_day], 1)
+        self.assertEqual(series['support']['opened'][-1], 1)
+        self.assertEqual(series['support']['closed'][-1], 1)
+        self.assertEqual(sum(series['support']['closed']), 1)
+        self.assertEqual(series['support']['by_status'][SupportRecord.SOLVED][opened_day], 1)
+
+    def test_thermal_quantity(self):
+        """Test that thermal rolls are summed by quantity"""
+        _, series = self.series(self.admin_user, True)
+        self.assertEqual(series['thermal']['quantity'][-1], 5)
+        self.assertEqual(series['thermal']['opened'][-1], 1)
+
+    def test_staff_series_are_scoped(self):
+        """Test that staff only see their own records"""
+        _, series = self.series(self.staff_user, False)
+        self.assertEqual(sum(series['support']['opened']), 1)
+
+    def test_trends_view(self):
+        """Test that the trends page renders for every span and granularity"""
+        client = Client()
+        client.login(username='admin', password='admin123')
+        for span in ['30d', '12w', '12m', '3y']:
+            response = client.get(reverse('reports:trends'), {'span': span, 'granularity': 'week'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context['granularity'], 'week')
+        self.assertContains(response, 'chart.umd.min.js"></script>')
+        self.assertEqual(
+            {row['username'] for row in response.context['user_totals']}, {'admin', 'staff'}
+        )
+
+    def test_trends_view_falls_back_on_bad_parameters(self):
+        """Test that unknown spans and granularities use the defaults"""
+        client = Client()
+        client.login(username='staff', password='staff123')
+        response = client.get(reverse('reports:trends'), {'span': 'forever', 'granularity': 'hour'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['span'], '12m')
+        self.assertEqual(response.context['granularity'], 'month')
+        self.assertEqual(response.context['user_totals'], [])
+
+
+class QuantileSketchTest(TestCase):
+    """Test the streaming quantile estimate"""
+
+    def test_quantiles_within_relative_accuracy(self):
+        """Test that estimates stay within the configured relative error"""
+        rng = random.Random(42)
+        values = [rng.expovariate(1 / 3600) for _ in range(5000)]
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+        values.sort()
+        for fraction in (0.5, 0.9, 0.99):
+            exact = values[int(fraction * (len(values) - 1))]
+            self.assertAlmostEqual(sketch.quantile(fraction) / exact, 1, delta=0.02)
+        self.assertAlmostEqual(sketch.mean, sum(values) / len(values))
+
+    def test_empty_and_zero_values(self):
+        """Test that an empty sketch has no quantiles and zeros are kept exactly"""
+        sketch = QuantileSketch()
+        self.assertIsNone(sketch.quantile(0.5))
+        for value in (0, 0, 0, 60):
+            sketch.add(value)
+        self.assertEqual(sketch.quantile(0.5), 0.0)
+        self.assertAlmostEqual(sketch.quantile(1.0), 60, delta=0.6)
+
+
+class ResolutionStatsTest(TestCase):
+    """Test resolution-time and open-age metrics"""
+
+    def setUp(self):
+        self.admin_group = Group.objects.create(name='Admin')
+        self.admin_user = User.objects.create_user(username='admin', password='admin123')
+        self.admin_user.groups.add(self.admin_group)
+        self.staff_user = User.objects.create_user(username='staff', password='staff123')
+        self.now = timezone.now()
+        for hours, user in [(1, self.staff_user), (2, self.staff_user), (3, self.staff_user), (10, self.admin_user)]:
+            SupportRecord.objects.create(
+                staff_name="Staff", staff_id="EMP001", phone_number="0123456789",
+                issue_reported="Issue", status=SupportRecord.SOLVED, recorded_by=user,
+                timestamp=self.now - timedelta(days=1, hours=hours), resolved_at=self.now - timedelta(days=1),
+            )
+        for days in (0, 2, 45):
+            SupportRecord.objects.create(
+                staff_name="Staff", staff_id="EMP001", phone_number="0123456789",
+                issue_reported="Issue", status=SupportRecord.PENDING, recorded_by=self.staff_user,
+                timestamp=self.now - timedelta(days=days, minutes=1),
+            )
+
+    def stats(self, **kwargs):
+        start, end = report_range('30d')
+        return resolution_stats(SupportRecord.objects.all(), SupportRecord, 'recorded_by', start, end, **kwargs)
+
+    def test_overall_stats(self):
+        """Test resolved count, mean and median resolution time"""
+        overall, = self.stats()
+        self.assertEqual(overall['resolved'], 4)
+        self.assertAlmostEqual(overall['mean'], 4 * 3600, delta=1)
+        # Interpolated like percentile_cont: 2h-3h and 3h-10h
+        self.assertAlmostEqual(overall['p50'] / 3600, 2.5, delta=0.05)
+        self.assertAlmostEqual(overall['p99'] / 3600, 9.79, delta=0.1)
+
+    def test_stats_per_officer_and_period(self):
+        """Test grouping by officer and by closing period"""
+        by_officer = {row['officer']: row for row in self.stats(by_officer=True)}
+        self.assertEqual(by_officer['staff']['resolved'], 3)
+        self.assertAlmostEqual(by_officer['admin']['p50'], 10 * 3600, delta=0.01 * 10 * 3600)
+        by_period = self.stats(granularity='day')
+        self.assertEqual(len(by_period), 1)
+        self.assertEqual(by_period[0]['period'], timezone.localtime(self.now - timedelta(days=1)).date())
+
+    def test_nothing_resolved(self):
+        """Test that an empty range still returns one overall row"""
+        overall, = resolution_stats(
+            VendorAssistance.objects.all(), VendorAssistance, 'resolved_by', *report_range('30d')
+        )
+        self.assertEqual(overall['resolved'], 0)
+        self.assertIsNone(overall['p90'])
+
+    def test_open_age_distribution(self):
+        """Test that open tickets are bucketed by age"""
+        row, = open_age_distribution(SupportRecord.objects.all(), SupportRecord, 'recorded_by', now=self.now)
+        self.assertEqual(row['officer'], 'staff')
+        self.assertEqual(row['open'], 3)
+        self.assertEqual((row['under_1d'], row['1_3d'], row['3_7d'], row['7_30d'], row['over_30d']), (1, 1, 0, 0, 1))
+
+    def test_sla_view_is_scoped(self):
+        """Test that staff only see their own tickets on the SLA page"""
+        client = Client()
+        client.login(username='staff', password='staff123')
+        response = client.get(reverse('reports:sla'), {'span': '30d'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'chart.umd.min.js"></script>')
+        support = response.context['modules'][0]
+        self.assertEqual(support['overall']['resolved'], 3)
+        self.assertEqual([row['officer'] for row in support['by_officer']], ['staff'])
+
+
+class TurnaroundViewTest(TestCase):
+    """Test the time-in-status report"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='staff', password='staff123')
+        self.asset = AssetRecord.objects.create(
+            staff_name="Staff", staff_id="EMP001", problem_reported="Broken",
+            asset_type="Laptop", division="IT", phone_number="0123456789",
+            status=AssetRecord.IN_USE, recorded_by=self.user,
+            timestamp=timezone.now() - timedelta(days=2)
+        )
+        self.asset.status = AssetRecord.UNDER_REPAIR
+        self.asset.save()
+
+    def test_turnaround_view(self):
+        """Test that stays and records waiting longest are listed per module"""
+        client = Client()
+        client.login(username='staff', password='staff123')
+        response = client.get(reverse('reports:turnaround'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([module['prefix'] for module in response.context['modules']], ['support', 'asset', 'vendor'])
+        asset = response.context['modules'][1]
+        statuses = {status['value']: status for status in asset['statuses']}
+        self.assertEqual(statuses[AssetRecord.UNDER_REPAIR]['current'], 1)
+        self.assertEqual(statuses[AssetRecord.IN_USE]['completed'], 1)
+        self.assertEqual(list(asset['longest_open']), [self.asset])
+        self.assertContains(response, reverse('asset_management:detail', args=[self.asset.pk]))
@@ -0,0 +1,10 @@
+from django.urls import path
+from . import views
+
+app_name = 'reports'
+
+urlpatterns = [
+    path('', views.trends_view, name='trends'),
+    path('sla/', views.sla_view, name='sla'),
+    path('turnaround/', views.turnaround_view, name='turnaround'),
+]
@@ -0,0 +1,162 @@
+from datetime import datetime
+
+from django.contrib.auth.decorators import login_required
+from django.db.models import Count
+from django.shortcuts import render
+from django.utils import timezone
+
+from accounts import history
+from accounts.roles import user_is_admin
+from accounts.stats import dashboard_modules
+
+from .rollups import DEFAULT_SPAN, GRANULARITIES, SPANS, report_range, totals_by_user, trend_series
+from .sla import AGE_BUCKETS, PERCENTILES, open_age_distribution, resolution_stats, sla_modules
+
+
+def report_period(params):
+    """Return the ``(span, granularity)`` requested, falling back to defaults"""
+    span = params.get('span', DEFAULT_SPAN)
+    if span not in SPANS:
+        span = DEFAULT_SPAN
+    granularity = params.get('granularity') or SPANS[span][2]
+    if granularity not in GRANULARITIES:
+        granularity = SPANS[span][2]
+    return span, granularity
+
+
+@login_required
+def trends_view(request):
+    """Show opened/closed trends for every module from the daily rollups"""
+    is_admin = user_is_admin(request.user)
+    span, granularity = report_period(request.GET)
+    
+    start, end = report_range(span)
+    periods, series = trend_series(request.user, is_admin, start, end, granularity)
+    labels = [period.isoformat() for period in periods]
+    
+    # One table row per period, newest first
+    rows = [
+        {
+            'period': period,
+            'support_opened': series['support']['opened'][i],
+            'support_solved': series['support']['closed'][i],
+            'asset_opened': series['asset']['opened'][i],
+            'asset_returned': series['asset']['closed'][i],
+            'vendor_opened': series['vendor']['opened'][i],
+            'vendor_resolved': series['vendor']['closed'][i],
+            'thermal_quantity': series['thermal']['quantity'][i],
+        }
+        for i, period in enumerate(periods)
+    ]
+    rows.reverse()
+    
+    context = {
+        'spans': [(key, label) for key, (label, _, _) in SPANS.items()],
+        'span': span,
+        'granularities': list(GRANULARITIES),
+        'granularity': granularity,
+        'start': start,
+        'end': end,
+        'chart_data': {'labels': labels, 'series': series},
+        'rows': rows,
+        'user_totals': totals_by_user(request.user, is_admin, start, end) if is_admin else [],
+        'is_admin': is_admin,
+    }
+    return render(request, 'reports/trends.html', context)
+
+
+@login_required
+def sla_view(request):
+    """Show resolution times and open-ticket ages for support and vendor tickets"""
+    is_admin = user_is_admin(request.user)
+    span, granularity = report_period(request.GET)
+    start, end = report_range(span)
+    
+    modules = []
+    for prefix, model, user_field in sla_modules():
+        records = model.objects.all()
+        if not is_admin:
+            records = records.filter(**{user_field: request.user})
+        overall = resolution_stats(records, model, user_field, start, end)[0]
+        modules.append({
+            'prefix': prefix,
+            'title': model._meta.verbose_name_plural,
+            'overall': overall,
+            'by_period': resolution_stats(records, model, user_field, start, end, granularity=granularity),
+            'by_officer': resolution_stats(records, model, user_field, start, end, by_officer=True),
+            'open_ages': [
+                {**row, 'buckets': [row[key] for key, _, _, _ in AGE_BUCKETS]}
+                for row in open_age_distribution(records, model, user_field)
+            ],
+        })
+    
+    chart_data = {
+        module['prefix']: {
+            'labels': [row['period'].isoformat() for row in module['by_period']],
+            **{name: [row[name] for row in module['by_period']] for name, _ in PERCENTILES},
+        }
+        for module in modules
+    }
+    
+    context = {
+        'spans': [(key, label) for key, (label, _, _) in SPANS.items()],
+        'span': span,
+        'granularities': list(GRANULARITIES),
+        'granularity': granularity,
+        'start': start,
+        'end': end,
+        'modules': modules,
+        'age_buckets': [(key, label) for key, label, _, _ in AGE_BUCKETS],
+        'chart_data': chart_data,
+        'is_admin': is_admin,
+    }
+    return render(request, 'reports/sla.html', context)
+
+
+@login_required
+def turnaround_view(request):
+    """Show how long records stay in each status, from the status history"""
+    is_admin = user_is_admin(request.user)
+    span, _ = report_period(request.GET)
+    start, end = report_range(span)
+    since = timezone.make_aware(datetime.combine(start, datetime.min.time()))
+    
+    modules = []
+    for prefix, model, user_field in dashboard_modules():
+        if not history.is_stateful(model):
+            continue
+        records = model.objects.all()
+        if not is_admin:
+            records = records.filter(**{user_field: request.user})
+        
+        dwell = history.dwell_by_status(model, since=since, records=None if is_admin else records)
+        current = dict(records.values_list('status').annotate(total=Count('pk')).order_by())
+        statuses = [
+            {
+                'value': value,
+                'label': label,
+                'current': current.get(value, 0),
+                'completed': dwell.get(value, {}).get('count', 0),
+                'average': dwell.get(value, {}).get('average'),
+                'longest': dwell.get(value, {}).get('longest'),
+            }
+            for value, label in model.STATUS_CHOICES
+        ]
+        open_records = records.exclude(status=model.CLOSED_STATUS).select_related(user_field)
+        modules.append({
+            'prefix': prefix,
+            'title': model._meta.verbose_name_plural,
+            'statuses': statuses,
+            'longest_open': history.current_stays(open_records)[:10],
+            'detail_url': f'{model._meta.app_label}:detail',
+        })
+    
+    context = {
+        'spans': [(key, label) for key, (label, _, _) in SPANS.items()],
+        'span': span,
+        'start': start,
+        'end': end,
+        'modules': modules,
+        'is_admin': is_admin,
+    }
+    return render(request, 'reports/turnaround.html', context)
@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from accounts.search import CreateSearchIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support_records', '0001_initial'),
+    ]
+
+    operations = [
+        CreateSearchIndex('SupportRecord', fields=['staff_name', 'staff_id', 'issue_reported', 'phone_number']),
+    ]
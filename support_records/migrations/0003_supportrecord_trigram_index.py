@@ -0,0 +1,15 @@
+from django.db import migrations
+
+from accounts.fuzzy import CreateTrigramIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_name_trigram'),
+        ('support_records', '0002_supportrecord_search_index'),
+    ]
+
+    operations = [
+        CreateTrigramIndex('SupportRecord', fields=['staff_name']),
+    ]
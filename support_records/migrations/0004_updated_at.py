@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:26
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    """Date existing records by when they were recorded, not by the migration"""
+    apps.get_model('support_records', 'SupportRecord').objects.update(updated_at=F('timestamp'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support_records', '0003_supportrecord_trigram_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='supportrecord',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='When this was last changed (see api.sync)'),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='supportrecord',
+            index=models.Index(fields=['updated_at'], name='support_rec_updated_09e6c8_idx'),
+        ),
+    ]
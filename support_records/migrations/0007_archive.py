@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:47
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support_records', '0006_open_queue_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedSupportRecord',
+            fields=[
+                ('id', models.BigIntegerField(help_text='Id of the record in the live table', primary_key=True, serialize=False)),
+                ('staff_name', models.CharField(help_text='Name of the staff assisted', max_length=200)),
+                ('staff_id', models.CharField(help_text='Staff ID number', max_length=50)),
+                ('issue_reported', models.TextField(help_text='Description of the problem')),
+                ('phone_number', models.CharField(help_text='Staff contact number', max_length=20)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('IN_PROGRESS', 'In Progress'), ('SOLVED', 'Solved')], help_text='Status when archived', max_length=20)),
+                ('timestamp', models.DateTimeField(help_text='When this was recorded')),
+                ('updated_at', models.DateTimeField(help_text='When this was last changed before archiving')),
+                ('resolved_at', models.DateTimeField(blank=True, help_text='When the issue was resolved', null=True)),
+                ('notes', models.TextField(blank=True, help_text='Additional notes or resolution details')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now, help_text='When this was moved to the archive')),
+                ('recorded_by', models.ForeignKey(help_text='ICT staff who recorded this', on_delete=django.db.models.deletion.PROTECT, related_name='archived_support_records', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived Support Record',
+                'verbose_name_plural': 'Archived Support Records',
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['-timestamp', '-id'], name='support_rec_timesta_e4f246_idx'), models.Index(fields=['recorded_by', '-timestamp', '-id'], name='support_rec_recorde_679209_idx')],
+            },
+        ),
+    ]
@@ -1,7 +1,9 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+from accounts import hooks
+
 
 class SupportRecord(models.Model):
     """Model for ICT support records provided to staff"""
@@ -17,6 +19,14 @@ class SupportRecord(models.Model):
         (SOLVED, 'Solved'),
     ]
     
+    # Status that closes a record, and the timestamp set when it does
+    CLOSED_STATUS = SOLVED
+    CLOSED_AT_FIELD = 'resolved_at'
+    
+    # Pending and in-progress tickets: the open work queue. Served by the
+    # partial indexes below, which leave closed history out
+    OPEN_RECORDS = ~models.Q(status=SOLVED)
+    
     staff_name = models.CharField(max_length=200, help_text="Name of the staff assisted")
     staff_id = models.CharField(max_length=50, help_text="Staff ID number")
     issue_reported = models.TextField(help_text="Description of the problem")
@@ -34,15 +44,29 @@ class SupportRecord(models.Model):
         help_text="ICT staff who recorded this"
     )
     timestamp = models.DateTimeField(default=timezone.now, help_text="When this was recorded")
+    updated_at = models.DateTimeField(auto_now=True, help_text="When this was last changed (see api.sync)")
     resolved_at = models.DateTimeField(null=True, blank=True, help_text="When the issue was resolved")
     notes = models.TextField(blank=True, help_text="Additional notes or resolution details")
     
+    # Columns covered by the full-text search index (see accounts.search)
+    SEARCH_FIELDS = ('staff_name', 'staff_id', 'issue_reported', 'phone_number')
+    
+    # Name columns with trigram indexes for fuzzy matching (see accounts.fuzzy)
+    FUZZY_FIELDS = ('staff_name',)
+    
     class Meta:
         ordering = ['-timestamp']
         verbose_name = "Support Record"
         verbose_name_plural = "Support Records"
         indexes = [
             models.Index(fields=['-timestamp']),
+            models.Index(fields=['updated_at']),
+            # Open work queue, oldest first; only open records are indexed
+            models.Index(fields=['timestamp', 'id'], condition=~models.Q(status='SOLVED'), name='supportrec_open_idx'),
+            models.Index(fields=['recorded_by', 'timestamp', 'id'], condition=~models.Q(status='SOLVED'), name='supportrec_open_owner_idx'),
+            # Role-scoped lists: own records newest first, optionally by status
+            models.Index(fields=['recorded_by', '-timestamp', '-id']),
+            models.Index(fields=['recorded_by', 'status', '-timestamp', '-id']),
             models.Index(fields=['status']),
             models.Index(fields=['staff_id']),
         ]
@@ -54,5 +78,62 @@ class SupportRecord(models.Model):
         # Auto-set resolved_at when status changes to SOLVED
         if self.status == self.SOLVED and not self.resolved_at:
             self.resolved_at = timezone.now()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            state = hooks.before_save(self)
+            super().save(*args, **kwargs)
+            hooks.after_save(self, state)
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            hooks.before_delete(self)
+            return super().delete(*args, **kwargs)
+
+
+class ArchivedSupportRecord(models.Model):
+    """Support record closed long ago, moved out of the live table
 
+    Same columns and id as the :class:`SupportRecord` it was. Rows are
+    written by the ``archive_records`` command and never changed (see
+    :mod:`accounts.archive`).
+    """
+    
+    STATUS_CHOICES = SupportRecord.STATUS_CHOICES
+    CLOSED_STATUS = SupportRecord.CLOSED_STATUS
+    CLOSED_AT_FIELD = SupportRecord.CLOSED_AT_FIELD
+    
+    # Read-only: views show no edit, delete or bulk actions for these
+    is_archived = True
+    
+    # Searched with icontains: the archive has no full-text index
+    SEARCH_FIELDS = SupportRecord.SEARCH_FIELDS
+    SEARCH_INDEX = False
+    
+    id = models.BigIntegerField(primary_key=True, help_text="Id of the record in the live table")
+    staff_name = models.CharField(max_length=200, help_text="Name of the staff assisted")
+    staff_id = models.CharField(max_length=50, help_text="Staff ID number")
+    issue_reported = models.TextField(help_text="Description of the problem")
+    phone_number = models.CharField(max_length=20, help_text="Staff contact number")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, help_text="Status when archived")
+    recorded_by = models.ForeignKey(
+        User,
+        on_delete=models.PROTECT,
+        related_name='archived_support_records',
+        help_text="ICT staff who recorded this"
+    )
+    timestamp = models.DateTimeField(help_text="When this was recorded")
+    updated_at = models.DateTimeField(help_text="When this was last changed before archiving")
+    resolved_at = models.DateTimeField(null=True, blank=True, help_text="When the issue was resolved")
+    notes = models.TextField(blank=True, help_text="Additional notes or resolution details")
+    archived_at = models.DateTimeField(default=timezone.now, help_text="When this was moved to the archive")
+    
+    class Meta:
+        ordering = ['-timestamp']
+        verbose_name = "Archived Support Record"
+        verbose_name_plural = "Archived Support Records"
+        indexes = [
+            models.Index(fields=['-timestamp', '-id']),
+            models.Index(fields=['recorded_by', '-timestamp', '-id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.staff_name} - {self.issue_reported[:50]} ({self.status})"
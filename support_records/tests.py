@@ -1,12 +1,22 @@
 """
 Tests for Support Records module
 """
-from django.test import TestCase, Client
+import csv
+import io
+import json
+import warnings
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User, Group
 from django.urls import reverse
 from django.utils import timezone
 from .models import SupportRecord
 from .forms import SupportRecordForm
+from accounts import bulk, counters
+from accounts.testing import QueryCountTestMixin, QueryPlanTestMixin
 
 
 class SupportRecordModelTest(TestCase):
@@ -238,6 +248,365 @@ class SupportRecordViewTest(TestCase):
         self.assertNotEqual(response.status_code, 200)
 
 
+class SupportRecordPaginationTest(TestCase):
+    """Test that list pages only render the current page"""
+    
+    def setUp(self):
+        """Create more records than fit on one page"""
+        self.user = User.objects.create_user(username='staff', password='staff123')
+        for i in range(25):
+            SupportRecord.objects.create(
+                staff_name=f"Staff {i}",
+                staff_id=f"EMP{i:03d}",
+                phone_number="+1234567890",
+                issue_reported="Paged issue",
+                status=SupportRecord.SOLVED if i % 2 else SupportRecord.PENDING,
+                recorded_by=self.user
+            )
+        self.client = Client()
+        self.client.login(username='staff', password='staff123')
+        
+    def test_first_page(self):
+        """Test that only one page of records is rendered"""
+        response = self.client.get(reverse('support_records:list'))
+        self.assertEqual(len(response.context['records']), 10)
+        self.assertEqual(response.context['page_obj'].paginator.count, 25)
+        self.assertContains(response, 'of 25 records')
+        self.assertContains(response, 'Page 1 of 3')
+        
+    def test_last_page(self):
+        """Test that the last page holds the remaining records"""
+        response = self.client.get(reverse('support_records:list'), {'page': 3})
+        self.assertEqual(len(response.context['records']), 5)
+        
+    def test_page_links_keep_filters(self):
+        """Test that page navigation preserves the search and status filters"""
+        response = self.client.get(reverse('support_records:list'), {'status': SupportRecord.PENDING})
+        self.assertEqual(response.context['page_obj'].paginator.count, 13)
+        self.assertContains(response, '?status=PENDING&amp;page=2')
+
+        
+    def test_cursor_mode(self):
+        """Test keyset pagination through the list view"""
+        url = reverse('support_records:list')
+        response = self.client.get(url, {'paginate': 'cursor', 'count': '0'})
+        page_obj = response.context['page_obj']
+        self.assertEqual(len(response.context['records']), 10)
+        self.assertIsNone(page_obj.paginator.count)
+        
+        seen = [r.pk for r in response.context['records']]
+        while page_obj.has_next():
+            response = self.client.get(url, {'cursor': page_obj.next_cursor})
+            page_obj = response.context['page_obj']
+            seen.extend(r.pk for r in response.context['records'])
+        self.assertEqual(len(set(seen)), 25)
+        self.assertContains(response, 'of 25')
+
+class SupportRecordExportTest(TestCase):
+    """Test streaming exports of support records"""
+    
+    def setUp(self):
+        """Create records for two users"""
+        self.admin_group = Group.objects.create(name='Admin')
+        self.admin_user = User.objects.create_user(username='admin', password='admin123')
+        self.admin_user.groups.add(self.admin_group)
+        self.staff_user = User.objects.create_user(username='staff', password='staff123')
+        self.printer = SupportRecord.objects.create(
+            staff_name="John Smith", staff_id="EMP001", phone_number="+1234567890",
+            issue_reported="Printer jammed", status=SupportRecord.PENDING,
+            recorded_by=self.staff_user
+        )
+        self.email = SupportRecord.objects.create(
+            staff_name="Jane Doe", staff_id="EMP002", phone_number="+1234567890",
+            issue_reported="Email, \"quoted\" and\nmultiline", status=SupportRecord.SOLVED,
+            recorded_by=self.admin_user
+        )
+        self.client = Client()
+        
+    def export(self, **params):
+        response = self.client.get(reverse('support_records:export'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+        
+    def test_csv_export(self):
+        """Test that the CSV export has a header and every visible record"""
+        self.client.login(username='admin', password='admin123')
+        rows = list(csv.DictReader(io.StringIO(self.export())))
+        self.assertEqual([row['staff_id'] for row in rows], ['EMP002', 'EMP001'])
+        self.assertEqual(rows[0]['issue_reported'], 'Email, "quoted" and\nmultiline')
+        self.assertEqual(rows[0]['recorded_by'], 'admin')
+        
+    def test_jsonl_export_honours_filters(self):
+        """Test the JSONL format with the list view's status filter"""
+        self.client.login(username='admin', password='admin123')
+        lines = self.export(format='jsonl', status=SupportRecord.PENDING).splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], [self.printer.pk])
+        lines = self.export(format='jsonl', search='printer').splitlines()
+        self.assertEqual(len(lines), 1)
+        
+    def test_staff_export_is_scoped(self):
+        """Test that staff only export their own records"""
+        self.client.login(username='staff', password='staff123')
+        rows = list(csv.DictReader(io.StringIO(self.export())))
+        self.assertEqual([row['staff_id'] for row in rows], ['EMP001'])
+        
+    def test_export_honours_date_range(self):
+        """Test that the export applies the list view's date filters"""
+        SupportRecord.objects.filter(pk=self.email.pk).update(timestamp=timezone.now() - timezone.timedelta(days=40))
+        self.client.login(username='admin', password='admin123')
+        rows = list(csv.DictReader(io.StringIO(self.export(period='today'))))
+        self.assertEqual([row['staff_id'] for row in rows], ['EMP001'])
+        
+    def test_unknown_format(self):
+        """Test that unsupported formats are rejected"""
+        self.client.login(username='admin', password='admin123')
+        response = self.client.get(reverse('support_records:export'), {'format': 'xml'})
+        self.assertEqual(response.status_code, 400)
+        
+    async def test_asgi_export_streams_asynchronously(self):
+        """Test that under ASGI the export is an async stream, not a buffered sync one"""
+        await self.async_client.alogin(username='admin', password='admin123')
+        response = await self.async_client.get(reverse('support_records:export'), {'format': 'jsonl'})
+        self.assertTrue(response.is_async)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            # Consumed the way the ASGI handler sends it
+            body = b''.join([chunk async for chunk in response])
+        self.assertEqual([str(w.message) for w in caught], [])
+        self.assertEqual(
+            [json.loads(line)['id'] for line in body.decode().splitlines()],
+            [self.email.pk, self.printer.pk],
+        )
+        
+    def test_list_links_to_export(self):
+        """Test that the list page offers exports with the current filters"""
+        self.client.login(username='admin', password='admin123')
+        response = self.client.get(reverse('support_records:list'), {'status': 'SOLVED', 'page': 1})
+        self.assertContains(response, reverse('support_records:export') + '?status=SOLVED&amp;format=csv')
+
+
+class SupportRecordBulkActionTest(TestCase):
+    """Test bulk status changes and deletes from the list page"""
+    
+    def setUp(self):
+        """Create pending records for a staff user and an admin"""
+        self.admin_user = User.objects.create_user(username='admin', password='admin123')
+        self.admin_user.groups.add(Group.objects.create(name='Admin'))
+        self.staff_user = User.objects.create_user(username='staff', password='staff123')
+        self.records = [
+            SupportRecord.objects.create(
+                staff_name=f"Staff {i}", staff_id=f"EMP{i:03d}", phone_number="+1234567890",
+                issue_reported="Issue", recorded_by=self.staff_user if i < 3 else self.admin_user
+            )
+            for i in range(4)
+        ]
+        self.client = Client()
+        
+    def post(self, action, records, **extra):
+        return self.client.post(reverse('support_records:bulk'), {
+            'action': action, 'selected': [record.pk for record in records], **extra,
+        })
+        
+    def test_status_update_sets_resolved_at(self):
+        """Test that solving records in bulk stamps resolved_at once"""
+        earlier = timezone.now() - timezone.timedelta(days=1)
+        self.records[0].resolved_at = earlier
+        self.records[0].save()
+        self.client.login(username='staff', password='staff123')
+        response = self.post('status', self.records[:2], status=SupportRecord.SOLVED)
+        self.assertRedirects(response, reverse('support_records:list'))
+        
+        first, second = (SupportRecord.objects.get(pk=record.pk) for record in self.records[:2])
+        self.assertEqual(first.status, SupportRecord.SOLVED)
+        self.assertEqual(first.resolved_at, earlier)
+        self.assertIsNotNone(second.resolved_at)
+        self.assertEqual(SupportRecord.objects.filter(status=SupportRecord.PENDING).count(), 2)
+        self.assertEqual(counters.check(), [])
+        
+    def test_needs_csrf_token(self):
+        """Test that a bulk delete without the list form's CSRF token is rejected"""
+        client = Client(enforce_csrf_checks=True)
+        client.login(username='admin', password='admin123')
+        data = {'action': 'delete', 'selected': [record.pk for record in self.records]}
+        self.assertEqual(client.post(reverse('support_records:bulk'), data).status_code, 403)
+        self.assertEqual(SupportRecord.objects.count(), 4)
+        
+        # The list page sets the cookie its form token is checked against
+        client.get(reverse('support_records:list'))
+        data['csrfmiddlewaretoken'] = client.cookies['csrftoken'].value
+        self.assertRedirects(client.post(reverse('support_records:bulk'), data), reverse('support_records:list'))
+        self.assertFalse(SupportRecord.objects.exists())
+        
+    def test_ignores_non_integer_selections(self):
+        """Test that selections int() cannot parse are skipped, not a 500"""
+        self.client.login(username='admin', password='admin123')
+        data = {'action': 'status', 'status': SupportRecord.SOLVED, 'selected': ['²', 'x', self.records[0].pk]}
+        self.assertRedirects(self.client.post(reverse('support_records:bulk'), data), reverse('support_records:list'))
+        self.assertEqual(SupportRecord.objects.filter(status=SupportRecord.SOLVED).count(), 1)
+        
+        response = self.client.post(reverse('support_records:bulk'), {'action': 'delete', 'selected': '²'}, follow=True)
+        self.assertContains(response, 'No records were selected.')
+        self.assertEqual(SupportRecord.objects.count(), 4)
+        
+    def test_single_update_query(self):
+        """Test that the status change is one UPDATE for the whole selection"""
+        records = SupportRecord.objects.filter(pk__in=[record.pk for record in self.records])
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(bulk.set_status(records, SupportRecord.IN_PROGRESS), 4)
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "support_records_supportrecord"')]
+        self.assertEqual(len(updates), 1)
+        
+    def test_staff_only_change_own_records(self):
+        """Test that staff cannot touch other users' records or delete"""
+        self.client.login(username='staff', password='staff123')
+        self.post('status', self.records, status=SupportRecord.SOLVED)
+        self.assertEqual(SupportRecord.objects.filter(status=SupportRecord.SOLVED).count(), 3)
+        self.post('delete', self.records)
+        self.assertEqual(SupportRecord.objects.count(), 4)
+        
+    def test_admin_bulk_delete(self):
+        """Test that admins delete the selection and keep the filters on return"""
+        self.client.login(username='admin', password='admin123')
+        next_url = reverse('support_records:list') + '?status=PENDING'
+        response = self.post('delete', self.records[1:], next=next_url)
+        self.assertRedirects(response, next_url)
+        self.assertEqual(list(SupportRecord.objects.values_list('pk', flat=True)), [self.records[0].pk])
+        self.assertEqual(counters.check(), [])
+        
+    def test_invalid_status(self):
+        """Test that unknown statuses are rejected"""
+        self.client.login(username='admin', password='admin123')
+        self.post('status', self.records, status='BOGUS')
+        self.assertFalse(SupportRecord.objects.exclude(status=SupportRecord.PENDING).exists())
+        
+    def test_list_page_checkboxes(self):
+        """Test that the list page renders the selection form"""
+        self.client.login(username='staff', password='staff123')
+        response = self.client.get(reverse('support_records:list'))
+        self.assertContains(response, 'name="selected"', count=3)
+        self.assertContains(response, 'value="status"')
+        self.assertNotContains(response, 'value="delete"')
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=300)
+class SupportRecordListCacheTest(TestCase):
+    """Test that list page rows are cached per role until a record changes"""
+    
+    def setUp(self):
+        """Create two admins and a staff user with one record each"""
+        cache.clear()
+        admin_group = Group.objects.create(name='Admin')
+        for username in ('admin', 'admin2'):
+            User.objects.create_user(username=username, password='admin123').groups.add(admin_group)
+        self.staff_user = User.objects.create_user(username='staff', password='staff123')
+        self.record = self.create_record("Cached Staff")
+        self.client = Client()
+        
+    def create_record(self, staff_name):
+        return SupportRecord.objects.create(
+            staff_name=staff_name, staff_id="EMP001", phone_number="+1234567890",
+            issue_reported="Issue", recorded_by=self.staff_user
+        )
+        
+    def test_repeat_visit_skips_record_queries(self):
+        """Test that a cached list page issues no record queries"""
+        self.client.login(username='staff', password='staff123')
+        url = reverse('support_records:list')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertContains(response, 'Cached Staff')
+        self.assertFalse([q for q in queries if 'support_records_supportrecord' in q['sql']])
+        
+    def test_new_record_invalidates_page(self):
+        """Test that a saved record shows up on the next visit"""
+        self.client.login(username='staff', password='staff123')
+        url = reverse('support_records:list')
+        self.client.get(url)
+        self.create_record("Fresh Staff")
+        self.assertContains(self.client.get(url), 'Fresh Staff')
+        
+    def test_pages_are_cached_per_role(self):
+        """Test that staff never see the admin copy of a page"""
+        SupportRecord.objects.create(
+            staff_name="Admin Only", staff_id="EMP002", phone_number="+1234567890",
+            issue_reported="Issue", recorded_by=User.objects.get(username='admin')
+        )
+        url = reverse('support_records:list')
+        self.client.login(username='admin', password='admin123')
+        self.assertContains(self.client.get(url), 'Admin Only')
+        self.client.login(username='staff', password='staff123')
+        self.assertNotContains(self.client.get(url), 'Admin Only')
+        
+    def test_bulk_form_token_is_not_cached(self):
+        """Test that a page cached for one admin still posts for another"""
+        url = reverse('support_records:list')
+        self.client.login(username='admin', password='admin123')
+        self.client.get(url)
+        
+        client = Client(enforce_csrf_checks=True)
+        client.login(username='admin2', password='admin123')
+        response = client.get(url)
+        token = response.context['csrf_token']
+        self.assertContains(response, f'value="{token}"')
+        response = client.post(reverse('support_records:bulk'), {
+            'action': 'status', 'selected': [self.record.pk], 'status': SupportRecord.SOLVED,
+            'csrfmiddlewaretoken': str(token),
+        })
+        self.assertEqual(response.status_code, 302)
+        self.record.refresh_from_db()
+        self.assertEqual(self.record.status, SupportRecord.SOLVED)
+
+
+class SupportRecordQueueTest(TestCase):
+    """Test the open work queue"""
+    
+    def setUp(self):
+        """Create open and solved records for two users"""
+        self.admin_user = User.objects.create_user(username='admin', password='admin123')
+        self.admin_user.groups.add(Group.objects.create(name='Admin'))
+        self.staff_user = User.objects.create_user(username='staff', password='staff123')
+        self.records = {
+            status: SupportRecord.objects.create(
+                staff_name=f"Staff {status}", staff_id="EMP001", phone_number="+1234567890",
+                issue_reported=f"Issue {status}", status=status, recorded_by=self.staff_user
+            )
+            for status in (SupportRecord.PENDING, SupportRecord.IN_PROGRESS, SupportRecord.SOLVED)
+        }
+        self.other = SupportRecord.objects.create(
+            staff_name="Other", staff_id="EMP002", phone_number="+1234567890",
+            issue_reported="Other issue", recorded_by=self.admin_user
+        )
+        self.client = Client()
+        
+    def queued(self):
+        response = self.client.get(reverse('support_records:queue'))
+        self.assertEqual(response.status_code, 200)
+        return [activity['url'] for activity in response.context['results']]
+        
+    def detail_urls(self, *records):
+        return [reverse('support_records:detail', args=[record.pk]) for record in records]
+        
+    def test_only_open_records_oldest_first(self):
+        """Test that the queue lists pending and in-progress records, oldest first"""
+        self.client.login(username='staff', password='staff123')
+        self.assertEqual(
+            self.queued(),
+            self.detail_urls(self.records[SupportRecord.PENDING], self.records[SupportRecord.IN_PROGRESS]),
+        )
+        
+    def test_queue_is_scoped_by_role(self):
+        """Test that admins see every open record"""
+        self.client.login(username='admin', password='admin123')
+        self.assertEqual(len(self.queued()), 3)
+        
+    def test_requires_login(self):
+        """Test that the queue requires login"""
+        response = self.client.get(reverse('support_records:queue'))
+        self.assertEqual(response.status_code, 302)
+
+
 class SupportRecordPermissionTest(TestCase):
     """Test permission-based access control"""
     
@@ -275,3 +644,94 @@ class SupportRecordPermissionTest(TestCase):
         # Should redirect or show error since user2 didn't create this record
         self.assertIn(response.status_code, [302, 403, 404])
 
+
+class SupportRecordQueryCountTest(QueryCountTestMixin, TestCase):
+    """Test that list pages do not issue a query per row"""
+    
+    def setUp(self):
+        """Create an admin, a superuser and a pool of record owners"""
+        self.admin_group = Group.objects.create(name='Admin')
+        self.admin_user = User.objects.create_user(username='admin', password='admin123')
+        self.admin_user.groups.add(self.admin_group)
+        User.objects.create_superuser(username='root', password='root123')
+        self.owners = [
+            User.objects.create_user(username=f'owner{i}', first_name=f'Owner {i}')
+            for i in range(3)
+        ]
+        self.created = 0
+        self.client = Client()
+        
+    def create_records(self, count):
+        """Create records owned by different users"""
+        for _ in range(count):
+            i = self.created
+            owner = self.owners[i % len(self.owners)]
+            SupportRecord.objects.create(
+                staff_name=f"Staff {i}",
+                staff_id=f"EMP{i:03d}",
+                phone_number="+1234567890",
+                issue_reported="Issue",
+                status=SupportRecord.PENDING,
+                recorded_by=owner
+            )
+            self.created += 1
+            
+    def test_list_view_query_count(self):
+        """Test that the list view query count is independent of page size"""
+        self.client.login(username='admin', password='admin123')
+        self.assertConstantQueries(reverse('support_records:list'), self.create_records)
+        
+    def test_admin_changelist_query_count(self):
+        """Test that the admin changelist query count is independent of page size"""
+        self.client.login(username='root', password='root123')
+        self.assertConstantQueries(reverse('admin:support_records_supportrecord_changelist'), self.create_records)
+
+
+class SupportRecordQueryPlanTest(QueryPlanTestMixin, TestCase):
+    """Test that role-scoped list queries are answered from the composite indexes"""
+    
+    def setUp(self):
+        """Create records for two users"""
+        self.users = [User.objects.create_user(username=f'user{i}') for i in range(2)]
+        for i in range(20):
+            SupportRecord.objects.create(
+                staff_name=f"Staff {i}", staff_id=f"EMP{i:03d}", phone_number="+1234567890",
+                issue_reported="Issue", recorded_by=self.users[i % 2]
+            )
+            
+    def own_records(self):
+        """The list view queryset of a non-admin user, in cursor order"""
+        return (
+            SupportRecord.objects.select_related('recorded_by').defer('notes')
+            .filter(recorded_by=self.users[0]).order_by('-timestamp', '-pk')
+        )
+        
+    def test_own_list_uses_owner_index(self):
+        """Test that own records newest first read the (owner, timestamp) index"""
+        index = self.index_name(SupportRecord, ['recorded_by', '-timestamp', '-id'])
+        self.assertUsesIndex(self.own_records()[:10], index)
+        # Dashboard recent activity
+        self.assertUsesIndex(SupportRecord.objects.filter(recorded_by=self.users[0]).order_by('-timestamp')[:10], index)
+        
+    def test_status_filtered_list_uses_owner_status_index(self):
+        """Test that a status filter on own records reads the (owner, status, timestamp) index"""
+        records = self.own_records().filter(status=SupportRecord.PENDING)
+        self.assertUsesIndex(records, self.index_name(SupportRecord, ['recorded_by', 'status', '-timestamp', '-id']))
+        
+    def test_date_range_uses_owner_index(self):
+        """Test that a date range on own records is a range scan of the (owner, timestamp) index"""
+        since = timezone.now() - timezone.timedelta(days=7)
+        records = self.own_records().filter(timestamp__gte=since)
+        self.assertUsesIndex(records[:10], self.index_name(SupportRecord, ['recorded_by', '-timestamp', '-id']))
+        
+    def test_open_queue_uses_partial_indexes(self):
+        """Test that the open work queue reads only the partial open-record indexes"""
+        records = SupportRecord.objects.filter(SupportRecord.OPEN_RECORDS).order_by('timestamp', 'pk')
+        self.assertUsesIndex(records[:25], 'supportrec_open_idx')
+        self.assertUsesIndex(records.filter(recorded_by=self.users[0])[:25], 'supportrec_open_owner_idx')
+        
+    def test_open_records_match_index_condition(self):
+        """Test that the queue filter is the condition of its partial indexes"""
+        for name in ('supportrec_open_idx', 'supportrec_open_owner_idx'):
+            index = next(index for index in SupportRecord._meta.indexes if index.name == name)
+            self.assertEqual(index.condition, SupportRecord.OPEN_RECORDS)
@@ -5,6 +5,10 @@ app_name = 'support_records'
 
 urlpatterns = [
     path('', views.support_record_list, name='list'),
+    path('export/', views.support_record_export, name='export'),
+    path('import/', views.support_record_import, name='import'),
+    path('queue/', views.support_record_queue, name='queue'),
+    path('bulk/', views.support_record_bulk, name='bulk'),
     path('<int:pk>/', views.support_record_detail, name='detail'),
     path('create/', views.support_record_create, name='create'),
     path('<int:pk>/update/', views.support_record_update, name='update'),
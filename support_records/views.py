@@ -1,72 +1,115 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
-from django.db.models import Q
+from django.views.decorators.csrf import csrf_protect, ensure_csrf_cookie
+from django.views.decorators.http import require_POST
+from accounts import archive, history, page_cache
+from accounts.export import export_response
+from accounts.filters import filter_records
+from accounts.roles import arequest_user, auser_is_admin, user_is_admin
+from accounts.views import record_bulk_action, record_import_view, record_queue_view
 from .models import SupportRecord
 from .forms import SupportRecordForm
 
 
-def user_is_admin(user):
-    """Check if user is in Admin group"""
-    return user.groups.filter(name='Admin').exists()
-
-
 @login_required
-def support_record_list(request):
+@ensure_csrf_cookie  # for the bulk action form
+async def support_record_list(request):
     """List all support records with filtering and search"""
-    is_admin = user_is_admin(request.user)
-    
-    # Base queryset - admin sees all, staff sees only theirs
-    if is_admin:
-        records = SupportRecord.objects.all()
-    else:
-        records = SupportRecord.objects.filter(recorded_by=request.user)
-    
-    # Search functionality
-    search_query = request.GET.get('search', '')
-    if search_query:
-        records = records.filter(
-            Q(staff_name__icontains=search_query) |
-            Q(staff_id__icontains=search_query) |
-            Q(issue_reported__icontains=search_query)
-        )
+    user = await arequest_user(request)
+    is_admin = await auser_is_admin(user)
     
-    # Filter by status
-    status_filter = request.GET.get('status', '')
-    if status_filter:
-        records = records.filter(status=status_filter)
+    # The live table, plus the archive when the date range reaches into it
+    # (or the archive alone with ?archive=1; archived rows are read-only)
+    archived = archive.requested(request.GET)
+    querysets = []
+    for source in await archive.alist_sources(SupportRecord, request.GET):
+        # Base queryset - admin sees all, staff sees only theirs
+        # Load the owning user in the same query and skip text not shown in the list
+        records = source.objects.select_related('recorded_by').defer('notes')
+        if not is_admin:
+            records = records.filter(recorded_by=user)
+        
+        # Search, status and date filters (shared with the export); fuzzy
+        # matching reads the name index, which has no async query path
+        records, filters = await sync_to_async(filter_records)(records, request.GET)
+        querysets.append(records)
+    records = archive.combined(querysets)
     
-    # Pagination
-    paginator = Paginator(records, 10)  # 10 records per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Pagination (offset by default, keyset when a cursor is requested); only
+    # runs when the rows are not already in the fragment cache
+    page_obj, page_records = page_cache.lazy_page(request, records, 10)
     
     context = {
-        'records': records,  # For compatibility with templates
+        'records': page_records,  # Only the current page is rendered
         'page_obj': page_obj,
-        'search_query': search_query,
-        'status_filter': status_filter,
+        'list_cache_key': page_cache.list_cache_key(request, SupportRecord, is_admin),
+        **filters,
         'is_admin': is_admin,
+        'archived': archived,
         'status_choices': SupportRecord.STATUS_CHOICES,
     }
-    return render(request, 'support_records/list.html', context)
+    # The page is paginated while rendering, by the sync-only paginators:
+    # render in a worker thread
+    return await sync_to_async(render)(request, 'support_records/list.html', context)
 
 
 @login_required
-def support_record_detail(request, pk):
-    """View details of a specific support record"""
+def support_record_export(request):
+    """Stream the filtered support records as CSV or JSONL"""
     is_admin = user_is_admin(request.user)
+    querysets = []
+    for source in archive.list_sources(SupportRecord, request.GET):
+        records = source.objects.all()
+        if not is_admin:
+            records = records.filter(recorded_by=request.user)
+        records, _ = filter_records(records, request.GET)
+        querysets.append(records)
+    return export_response(request, querysets, 'support_records')
+
+
+@login_required
+@csrf_protect
+def support_record_import(request):
+    """Import support records from an uploaded CSV file"""
+    return record_import_view(request, 'support', 'Support Records', 'support_records:list')
+
+
+@login_required
+def support_record_queue(request):
+    """Work queue of open support tickets, oldest first"""
+    return record_queue_view(request, SupportRecord, 'recorded_by', 'Support Records', 'support_records:list')
+
+
+@login_required
+@require_POST
+@csrf_protect
+def support_record_bulk(request):
+    """Change the status of, or delete, the support records selected on the list page"""
+    is_admin = user_is_admin(request.user)
+    records = SupportRecord.objects.all()
+    if not is_admin:
+        records = records.filter(recorded_by=request.user)
+    return record_bulk_action(request, records, is_admin, 'support_records:list')
+
+
+@login_required
+async def support_record_detail(request, pk):
+    """View details of a specific support record"""
+    user = await arequest_user(request)
+    is_admin = await auser_is_admin(user)
     
     # Get the record
     if is_admin:
-        record = get_object_or_404(SupportRecord, pk=pk)
+        record = await archive.aget_record_or_404(SupportRecord, pk=pk)
     else:
         # Non-admin can only view their own records
-        record = get_object_or_404(SupportRecord, pk=pk, recorded_by=request.user)
+        record = await archive.aget_record_or_404(SupportRecord, pk=pk, recorded_by=user)
     
     context = {
         'record': record,
+        'status_history': [transition async for transition in history.record_history(record)],
         'is_admin': is_admin,
     }
     return render(request, 'support_records/detail.html', context)
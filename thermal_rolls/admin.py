@@ -1,15 +1,22 @@
 from django.contrib import admin
+from django.db import transaction
+
+from accounts import hooks
+from accounts.admin_mixins import DeferredChangeListMixin, FullTextSearchMixin
+from accounts.roles import user_is_admin
 from .models import ThermalRollRecord
 
 
 @admin.register(ThermalRollRecord)
-class ThermalRollRecordAdmin(admin.ModelAdmin):
+class ThermalRollRecordAdmin(FullTextSearchMixin, DeferredChangeListMixin, admin.ModelAdmin):
     list_display = ('vendor_name', 'cashier_owner_name', 'quantity', 'phone_number', 'recorded_by', 'timestamp')
     list_filter = ('timestamp', 'recorded_by', 'vendor_name')
-    search_fields = ('vendor_name', 'cashier_owner_name', 'phone_number')
+    search_fields = ThermalRollRecord.SEARCH_FIELDS
     readonly_fields = ('timestamp',)
     date_hierarchy = 'timestamp'
     list_per_page = 25
+    list_select_related = ('recorded_by',)
+    changelist_defer = ('notes', 'signature')
     
     fieldsets = (
         ('Vendor Information', {
@@ -30,10 +37,16 @@ class ThermalRollRecordAdmin(admin.ModelAdmin):
             obj.recorded_by = request.user
         super().save_model(request, obj, form, change)
     
+    def delete_queryset(self, request, queryset):
+        """Keep record counters and indexes in step with bulk deletes"""
+        with transaction.atomic():
+            hooks.before_queryset_delete(queryset)
+            super().delete_queryset(request, queryset)
+    
     def get_queryset(self, request):
         """Filter queryset based on user group"""
         qs = super().get_queryset(request)
-        if request.user.is_superuser or request.user.groups.filter(name='Admin').exists():
+        if request.user.is_superuser or user_is_admin(request.user):
             return qs
         return qs.filter(recorded_by=request.user)
 
@@ -0,0 +1,160 @@
+"""Thermal roll consumption per vendor.
+
+Monthly totals are computed by the database with one ``GROUP BY
+vendor_name, month`` over the requested range (served by the
+``vendor_name`` and ``timestamp`` indexes). Each finished month is cached
+on its own for ``THERMAL_ANALYTICS_CACHE_TIMEOUT`` seconds, so widening
+the range only queries the months not seen yet; the current month is always
+read live because it is still being recorded. The keys include the thermal
+roll version of :mod:`accounts.page_cache`, so any write (an edit, a delete
+or a CSV import of old logbooks) retires every cached month. Moving averages, top-N
+vendors and the next-month forecast are derived from the monthly totals.
+"""
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from accounts import page_cache
+
+DEFAULT_MONTHS = 12
+MAX_MONTHS = 36
+DEFAULT_TOP = 10
+DEFAULT_WINDOW = 3
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1, day=1)
+
+
+def month_range(months, today=None):
+    """Return the first day of the last ``months`` months, oldest first"""
+    current = month_start(today or timezone.localdate())
+    return [add_months(current, offset) for offset in range(1 - months, 1)]
+
+
+def _aware(day):
+    return timezone.make_aware(datetime(day.year, day.month, day.day))
+
+
+def cache_key(scope, month, version):
+    return f'thermal_rolls:vendor_totals:{scope}:{version}:{month:%Y-%m}'
+
+
+def monthly_vendor_totals(queryset, first, last):
+    """Return ``{month: {vendor_name: rolls}}`` from ``first`` to ``last`` month
+
+    Runs a single grouped query; months without collections are missing
+    from the result.
+    """
+    rows = (
+        queryset.filter(
+            timestamp__gte=_aware(first),
+            timestamp__lt=_aware(add_months(last, 1)),
+        )
+        .annotate(month=TruncMonth('timestamp'))
+        .values('vendor_name', 'month')
+        .annotate(rolls=Sum('quantity'))
+        .order_by()
+    )
+    totals = {}
+    for row in rows:
+        month = row['month']
+        if isinstance(month, datetime):
+            month = timezone.localtime(month).date() if timezone.is_aware(month) else month.date()
+        totals.setdefault(month, {})[row['vendor_name']] = row['rolls']
+    return totals
+
+
+def cached_vendor_totals(queryset, scope, months, today=None):
+    """Return :func:`monthly_vendor_totals`, reusing cached finished months
+
+    ``scope`` identifies the records ``queryset`` covers (e.g. ``'all'`` or
+    the user id) and is part of the cache keys.
+    """
+    current = month_start(today or timezone.localdate())
+    version = page_cache.versions([queryset.model])
+    keys = {month: cache_key(scope, month, version) for month in months if month < current}
+    cached = cache.get_many(keys.values())
+    totals = {month: cached[key] for month, key in keys.items() if key in cached}
+
+    missing = [month for month in months if month not in totals]
+    if missing:
+        fetched = monthly_vendor_totals(queryset, missing[0], missing[-1])
+        for month in missing:
+            totals[month] = fetched.get(month, {})
+        cache.set_many(
+            {keys[month]: totals[month] for month in missing if month in keys},
+            getattr(settings, 'THERMAL_ANALYTICS_CACHE_TIMEOUT', 3600),
+        )
+    return totals
+
+
+def moving_average(values, window=DEFAULT_WINDOW):
+    """Trailing moving average; ``None`` until ``window`` values are seen"""
+    result = []
+    for i in range(len(values)):
+        if i + 1 < window:
+            result.append(None)
+        else:
+            result.append(round(sum(values[i + 1 - window:i + 1]) / window, 2))
+    return result
+
+
+def forecast(values, window=DEFAULT_WINDOW):
+    """Expected rolls next month: the average of the last ``window`` full months"""
+    finished = values[:-1]
+    if not finished:
+        return 0
+    recent = finished[-window:]
+    return round(sum(recent) / len(recent), 2)
+
+
+def vendor_consumption(queryset, scope, months=DEFAULT_MONTHS, top=DEFAULT_TOP,
+                       window=DEFAULT_WINDOW, today=None):
+    """Return per-vendor consumption for the last ``months`` months
+
+    The result is a JSON-ready dict with the month labels, the overall
+    monthly totals and, for the ``top`` vendors by rolls collected in the
+    range, their monthly totals, moving average and forecast.
+    """
+    month_list = month_range(months, today)
+    totals = cached_vendor_totals(queryset, scope, month_list, today)
+
+    by_vendor = {}
+    for i, month in enumerate(month_list):
+        for vendor, rolls in totals[month].items():
+            by_vendor.setdefault(vendor, [0] * len(month_list))[i] = rolls
+    ranked = sorted(by_vendor.items(), key=lambda item: (-sum(item[1]), item[0]))
+
+    overall = [sum(totals[month].values()) for month in month_list]
+    return {
+        'months': [f'{month:%Y-%m}' for month in month_list],
+        'top': top,
+        'window': window,
+        'total': {
+            'rolls': sum(overall),
+            'monthly': overall,
+            'moving_average': moving_average(overall, window),
+            'forecast': forecast(overall, window),
+        },
+        'vendor_count': len(by_vendor),
+        'vendors': [
+            {
+                'vendor_name': vendor,
+                'rolls': sum(monthly),
+                'monthly': monthly,
+                'moving_average': moving_average(monthly, window),
+                'forecast': forecast(monthly, window),
+            }
+            for vendor, monthly in ranked[:top]
+        ],
+    }
@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from accounts.search import CreateSearchIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('thermal_rolls', '0001_initial'),
+    ]
+
+    operations = [
+        CreateSearchIndex('ThermalRollRecord', fields=['vendor_name', 'cashier_owner_name', 'phone_number']),
+    ]
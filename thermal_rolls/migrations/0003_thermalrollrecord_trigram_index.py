@@ -0,0 +1,15 @@
+from django.db import migrations
+
+from accounts.fuzzy import CreateTrigramIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_name_trigram'),
+        ('thermal_rolls', '0002_thermalrollrecord_search_index'),
+    ]
+
+    operations = [
+        CreateTrigramIndex('ThermalRollRecord', fields=['vendor_name', 'cashier_owner_name']),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:26
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    """Date existing records by when they were recorded, not by the migration"""
+    apps.get_model('thermal_rolls', 'ThermalRollRecord').objects.update(updated_at=F('timestamp'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('thermal_rolls', '0003_thermalrollrecord_trigram_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='thermalrollrecord',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='When this was last changed (see api.sync)'),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='thermalrollrecord',
+            index=models.Index(fields=['updated_at'], name='thermal_rol_updated_c1ea4d_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('thermal_rolls', '0004_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='thermalrollrecord',
+            index=models.Index(fields=['recorded_by', '-timestamp', '-id'], name='thermal_rol_recorde_d061a4_idx'),
+        ),
+    ]
@@ -1,7 +1,9 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+from accounts import hooks
+
 
 class ThermalRollRecord(models.Model):
     """Model for managing thermal roll collection by vendors"""
@@ -22,14 +24,24 @@ class ThermalRollRecord(models.Model):
         help_text="ICT staff who recorded this"
     )
     timestamp = models.DateTimeField(default=timezone.now, help_text="When this was recorded")
+    updated_at = models.DateTimeField(auto_now=True, help_text="When this was last changed (see api.sync)")
     notes = models.TextField(blank=True, help_text="Additional notes")
     
+    # Columns covered by the full-text search index (see accounts.search)
+    SEARCH_FIELDS = ('vendor_name', 'cashier_owner_name', 'phone_number')
+    
+    # Name columns with trigram indexes for fuzzy matching (see accounts.fuzzy)
+    FUZZY_FIELDS = ('vendor_name', 'cashier_owner_name')
+    
     class Meta:
         ordering = ['-timestamp']
         verbose_name = "Thermal Roll Record"
         verbose_name_plural = "Thermal Roll Records"
         indexes = [
             models.Index(fields=['-timestamp']),
+            models.Index(fields=['updated_at']),
+            # Role-scoped lists: own records newest first (no status here)
+            models.Index(fields=['recorded_by', '-timestamp', '-id']),
             models.Index(fields=['vendor_name']),
         ]
     
@@ -40,4 +52,15 @@ class ThermalRollRecord(models.Model):
     def collection_date(self):
         """Return just the date part of timestamp"""
         return self.timestamp.date()
+    
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            state = hooks.before_save(self)
+            super().save(*args, **kwargs)
+            hooks.after_save(self, state)
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            hooks.before_delete(self)
+            return super().delete(*args, **kwargs)
 
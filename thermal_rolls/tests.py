@@ -1,9 +1,16 @@
-from django.test import TestCase, Client
+from datetime import date, datetime
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, Client, override_settings
 from django.contrib.auth.models import User, Group
 from django.urls import reverse
 from django.utils import timezone
+from . import analytics
 from .models import ThermalRollRecord
 from .forms import ThermalRollRecordForm
+from accounts import hooks
+from accounts.testing import QueryCountTestMixin, QueryPlanTestMixin
 
 
 class ThermalRollRecordModelTest(TestCase):
@@ -229,6 +236,189 @@ class ThermalRollRecordViewTest(TestCase):
         self.assertIn(response.status_code, [302, 403, 404])
 
 
+class ThermalRollRecordImportTest(TestCase):
+    """Test uploading thermal roll records from CSV"""
+    
+    def setUp(self):
+        """Set up a staff user and an admin"""
+        self.staff_user = User.objects.create_user(username='staff', password='staff123')
+        self.admin_user = User.objects.create_user(username='admin', password='admin123')
+        self.admin_user.groups.add(Group.objects.create(name='Admin'))
+        self.client = Client()
+        
+    def upload(self, content, **extra):
+        if isinstance(content, str):
+            content = content.encode()
+        csv_file = SimpleUploadedFile('rolls.csv', content, content_type='text/csv')
+        return self.client.post(reverse('thermal_rolls:import'), {'file': csv_file, **extra})
+        
+    def test_valid_and_invalid_rows(self):
+        """Test that valid rows are imported and form errors are reported per line"""
+        self.client.login(username='staff', password='staff123')
+        response = self.upload(
+            "vendor_name,cashier_owner_name,quantity,phone_number\n"
+            "Shell Main,Ann,5,0123456789\n"
+            "Total Hill,Ben,-1,0123456789\n"
+            "BP Road,Cal,2,not-a-phone\n"
+        )
+        self.assertEqual(response.status_code, 200)
+        result = response.context['result']
+        self.assertEqual(result.imported, 1)
+        self.assertEqual([error.line for error in result.errors], [3, 4])
+        self.assertIn('quantity', result.errors[0].messages)
+        self.assertIn('phone_number', result.errors[1].messages)
+        record = ThermalRollRecord.objects.get()
+        self.assertEqual(record.vendor_name, 'Shell Main')
+        self.assertEqual(record.recorded_by, self.staff_user)
+        
+    def test_dry_run(self):
+        """Test that a dry run validates without saving"""
+        self.client.login(username='staff', password='staff123')
+        response = self.upload("vendor_name,cashier_owner_name,quantity,phone_number\nA,B,1,012\n", dry_run='on')
+        self.assertEqual(response.context['result'].imported, 1)
+        self.assertFalse(ThermalRollRecord.objects.exists())
+        
+    def test_owner_column(self):
+        """Test that only admins may import records for other users"""
+        content = "vendor_name,cashier_owner_name,quantity,phone_number,recorded_by\nA,B,1,012,admin\n"
+        self.client.login(username='staff', password='staff123')
+        self.assertEqual(self.upload(content).context['result'].rejected, 1)
+        
+        self.client.login(username='admin', password='admin123')
+        self.assertEqual(self.upload(content.replace(',admin', ',staff')).context['result'].imported, 1)
+        self.assertEqual(ThermalRollRecord.objects.get().recorded_by, self.staff_user)
+        
+    def test_excel_cp1252_file(self):
+        """Test that a non-UTF-8 file is a form error and imports nothing"""
+        self.client.login(username='staff', password='staff123')
+        content = "vendor_name,cashier_owner_name,quantity,phone_number\nShell,Ann,1,012\nCafé,José,1,012\n"
+        response = self.upload(content.encode('cp1252'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context['result'])
+        self.assertIn('UTF-8', response.context['form'].errors['file'][0])
+        self.assertFalse(ThermalRollRecord.objects.exists())
+        
+    def test_binary_file(self):
+        """Test that an uploaded binary is a form error, not a 500"""
+        self.client.login(username='staff', password='staff123')
+        response = self.upload(b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\xff\xd8')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].errors['file'])
+        self.assertFalse(ThermalRollRecord.objects.exists())
+        
+    def test_upload_needs_csrf_token(self):
+        """Test that an upload without the form's CSRF token is rejected"""
+        client = Client(enforce_csrf_checks=True)
+        client.login(username='staff', password='staff123')
+        content = "vendor_name,cashier_owner_name,quantity,phone_number\nA,B,1,012\n"
+        url = reverse('thermal_rolls:import')
+        response = client.post(url, {'file': SimpleUploadedFile('rolls.csv', content.encode())})
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(ThermalRollRecord.objects.exists())
+        
+        client.get(url)
+        token = client.cookies['csrftoken'].value
+        client.post(url, {'file': SimpleUploadedFile('rolls.csv', content.encode()), 'csrfmiddlewaretoken': token})
+        self.assertEqual(ThermalRollRecord.objects.count(), 1)
+
+
+@override_settings(THERMAL_ANALYTICS_CACHE_TIMEOUT=3600)
+class ThermalRollAnalyticsTest(TestCase):
+    """Test per-vendor consumption analytics"""
+    
+    def setUp(self):
+        """Set up collections over three months for two users"""
+        cache.clear()
+        self.admin_user = User.objects.create_user(username='admin', password='admin123')
+        self.admin_user.groups.add(Group.objects.create(name='Admin'))
+        self.staff_user = User.objects.create_user(username='staff', password='staff123')
+        self.today = date(2024, 3, 15)
+        for vendor, quantity, day, user in [
+            ('Shell Main', 10, date(2024, 1, 5), self.staff_user),
+            ('Shell Main', 20, date(2024, 2, 5), self.staff_user),
+            ('Shell Main', 5, date(2024, 2, 20), self.staff_user),
+            ('Total Hill', 4, date(2024, 2, 10), self.admin_user),
+            ('Total Hill', 6, date(2024, 3, 1), self.admin_user),
+            ('BP Road', 1, date(2023, 12, 31), self.admin_user),
+        ]:
+            ThermalRollRecord.objects.create(
+                vendor_name=vendor, cashier_owner_name="Owner", quantity=quantity,
+                phone_number="0123456789", recorded_by=user,
+                timestamp=timezone.make_aware(datetime(day.year, day.month, day.day, 12)),
+            )
+        
+    def consumption(self, **kwargs):
+        return analytics.vendor_consumption(
+            ThermalRollRecord.objects.all(), 'all', months=3, today=self.today, **kwargs
+        )
+        
+    def test_monthly_totals_per_vendor(self):
+        """Test that rolls are summed per vendor and month, largest vendor first"""
+        result = self.consumption()
+        self.assertEqual(result['months'], ['2024-01', '2024-02', '2024-03'])
+        self.assertEqual(result['total']['monthly'], [10, 29, 6])
+        self.assertEqual(result['vendor_count'], 2)
+        shell, total = result['vendors']
+        self.assertEqual((shell['vendor_name'], shell['rolls'], shell['monthly']), ('Shell Main', 35, [10, 25, 0]))
+        self.assertEqual((total['vendor_name'], total['monthly']), ('Total Hill', [0, 4, 6]))
+        
+    def test_top_moving_average_and_forecast(self):
+        """Test top-N, the trailing average and the next-month forecast"""
+        result = self.consumption(top=1, window=2)
+        self.assertEqual([vendor['vendor_name'] for vendor in result['vendors']], ['Shell Main'])
+        self.assertEqual(result['total']['moving_average'], [None, 19.5, 17.5])
+        # Forecast averages the finished months only
+        self.assertEqual(result['vendors'][0]['forecast'], 17.5)
+        
+    def test_finished_months_are_cached(self):
+        """Test that only the current month is queried again"""
+        first = self.consumption()
+        with self.assertNumQueries(1):
+            second = self.consumption()
+        self.assertEqual(first, second)
+        
+    def test_writes_retire_cached_months(self):
+        """Test that edits, deletes and imports into finished months show up"""
+        self.consumption()
+        record = ThermalRollRecord.objects.get(vendor_name='BP Road')
+        record.timestamp = timezone.make_aware(datetime(2024, 1, 20, 12))
+        record.save()
+        self.assertEqual(self.consumption()['total']['monthly'], [11, 29, 6])
+        
+        ThermalRollRecord.objects.filter(vendor_name='Total Hill').delete()
+        self.assertEqual(self.consumption()['total']['monthly'], [11, 25, 0])
+        
+        # Bulk inserts, as the CSV import writes them
+        hooks.after_bulk_create(ThermalRollRecord.objects.bulk_create([ThermalRollRecord(
+            vendor_name='Engen', cashier_owner_name="Owner", quantity=3, phone_number="0123456789",
+            recorded_by=self.staff_user, timestamp=timezone.make_aware(datetime(2024, 2, 1, 12)),
+        )]))
+        self.assertEqual(self.consumption()['total']['monthly'], [11, 28, 0])
+        
+    def test_api_is_scoped(self):
+        """Test that staff only see their own collections through the API"""
+        for vendor, user in [('Caltex', self.staff_user), ('Engen', self.admin_user)]:
+            ThermalRollRecord.objects.create(
+                vendor_name=vendor, cashier_owner_name="Owner", quantity=2,
+                phone_number="0123456789", recorded_by=user
+            )
+        self.client.login(username='staff', password='staff123')
+        response = self.client.get(reverse('thermal_rolls:analytics_api'), {'months': 1})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data['months']), 1)
+        self.assertEqual([vendor['vendor_name'] for vendor in data['vendors']], ['Caltex'])
+        
+    def test_analytics_page(self):
+        """Test that the analytics page renders and clamps bad parameters"""
+        self.client.login(username='admin', password='admin123')
+        response = self.client.get(reverse('thermal_rolls:analytics'), {'months': '999', 'top': 'x'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['months'], analytics.MAX_MONTHS)
+        self.assertEqual(response.context['consumption']['top'], analytics.DEFAULT_TOP)
+        self.assertContains(response, 'chart.umd.min.js"></script>')
+
+
 class ThermalRollRecordPermissionTest(TestCase):
     """Test suite for permissions"""
     
@@ -258,3 +448,71 @@ class ThermalRollRecordPermissionTest(TestCase):
         response = self.client.get(reverse('thermal_rolls:detail', args=[self.record1.pk]))
         # Should return 404 (record not in filtered queryset) or 403 (permission denied)
         self.assertIn(response.status_code, [302, 403, 404])
+
+
+class ThermalRollRecordQueryCountTest(QueryCountTestMixin, TestCase):
+    """Test that list pages do not issue a query per row"""
+    
+    def setUp(self):
+        """Create an admin, a superuser and a pool of record owners"""
+        self.admin_group = Group.objects.create(name='Admin')
+        self.admin_user = User.objects.create_user(username='admin', password='admin123')
+        self.admin_user.groups.add(self.admin_group)
+        User.objects.create_superuser(username='root', password='root123')
+        self.owners = [
+            User.objects.create_user(username=f'owner{i}', first_name=f'Owner {i}')
+            for i in range(3)
+        ]
+        self.created = 0
+        self.client = Client()
+        
+    def create_records(self, count):
+        """Create records owned by different users"""
+        for _ in range(count):
+            i = self.created
+            owner = self.owners[i % len(self.owners)]
+            ThermalRollRecord.objects.create(
+                vendor_name=f"Vendor {i}",
+                cashier_owner_name="Owner",
+                quantity=1,
+                phone_number="0123456789",
+                recorded_by=owner
+            )
+            self.created += 1
+            
+    def test_list_view_query_count(self):
+        """Test that the list view query count is independent of page size"""
+        self.client.login(username='admin', password='admin123')
+        self.assertConstantQueries(reverse('thermal_rolls:list'), self.create_records)
+        
+    def test_admin_changelist_query_count(self):
+        """Test that the admin changelist query count is independent of page size"""
+        self.client.login(username='root', password='root123')
+        self.assertConstantQueries(reverse('admin:thermal_rolls_thermalrollrecord_changelist'), self.create_records)
+
+
+class ThermalRollRecordQueryPlanTest(QueryPlanTestMixin, TestCase):
+    """Test that role-scoped list queries are answered from the composite indexes"""
+    
+    def setUp(self):
+        """Create records for two users"""
+        self.users = [User.objects.create_user(username=f'user{i}') for i in range(2)]
+        for i in range(20):
+            ThermalRollRecord.objects.create(
+                vendor_name=f"Station {i}", cashier_owner_name="Owner", quantity=1,
+                phone_number="+1234567890", recorded_by=self.users[i % 2]
+            )
+            
+    def own_records(self):
+        """The list view queryset of a non-admin user, in cursor order"""
+        return (
+            ThermalRollRecord.objects.select_related('recorded_by').defer('notes')
+            .filter(recorded_by=self.users[0]).order_by('-timestamp', '-pk')
+        )
+        
+    def test_own_list_uses_owner_index(self):
+        """Test that own records newest first read the (owner, timestamp) index"""
+        index = self.index_name(ThermalRollRecord, ['recorded_by', '-timestamp', '-id'])
+        self.assertUsesIndex(self.own_records()[:10], index)
+        # Dashboard recent activity
+        self.assertUsesIndex(ThermalRollRecord.objects.filter(recorded_by=self.users[0]).order_by('-timestamp')[:10], index)
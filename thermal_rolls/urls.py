@@ -5,6 +5,11 @@ app_name = 'thermal_rolls'
 
 urlpatterns = [
     path('', views.thermal_roll_list, name='list'),
+    path('export/', views.thermal_roll_export, name='export'),
+    path('import/', views.thermal_roll_import, name='import'),
+    path('bulk/', views.thermal_roll_bulk, name='bulk'),
+    path('analytics/', views.thermal_roll_analytics, name='analytics'),
+    path('analytics/api/', views.thermal_roll_analytics_api, name='analytics_api'),
     path('<int:pk>/', views.thermal_roll_detail, name='detail'),
     path('create/', views.thermal_roll_create, name='create'),
     path('<int:pk>/update/', views.thermal_roll_update, name='update'),
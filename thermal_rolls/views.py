@@ -1,58 +1,135 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
-from django.db.models import Q
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_protect, ensure_csrf_cookie
+from django.views.decorators.http import require_POST
+from accounts import page_cache
+from accounts.export import export_response
+from accounts.filters import filter_records
+from accounts.roles import arequest_user, auser_is_admin, user_is_admin
+from accounts.views import record_bulk_action, record_import_view
+from . import analytics
 from .models import ThermalRollRecord
 from .forms import ThermalRollRecordForm
 
 
-def user_is_admin(user):
-    """Check if user is in Admin group"""
-    return user.groups.filter(name='Admin').exists()
-
-
 @login_required
-def thermal_roll_list(request):
+@ensure_csrf_cookie  # for the bulk action form
+async def thermal_roll_list(request):
     """List all thermal roll records with filtering and search"""
-    is_admin = user_is_admin(request.user)
+    user = await arequest_user(request)
+    is_admin = await auser_is_admin(user)
     
-    if is_admin:
-        records = ThermalRollRecord.objects.all()
-    else:
-        records = ThermalRollRecord.objects.filter(recorded_by=request.user)
+    # Load the owning user in the same query and skip text not shown in the list
+    records = ThermalRollRecord.objects.select_related('recorded_by').defer('notes')
+    if not is_admin:
+        records = records.filter(recorded_by=user)
     
-    # Search
-    search_query = request.GET.get('search', '')
-    if search_query:
-        records = records.filter(
-            Q(vendor_name__icontains=search_query) |
-            Q(cashier_owner_name__icontains=search_query)
-        )
+    # Search and date filters (shared with the export); fuzzy matching
+    # reads the name index, which has no async query path
+    records, filters = await sync_to_async(filter_records)(records, request.GET)
     
-    # Pagination
-    paginator = Paginator(records, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Pagination (offset by default, keyset when a cursor is requested); only
+    # runs when the rows are not already in the fragment cache
+    page_obj, page_records = page_cache.lazy_page(request, records, 10)
     
     context = {
-        'records': records,  # For compatibility with templates
+        'records': page_records,  # Only the current page is rendered
         'page_obj': page_obj,
-        'search_query': search_query,
+        'list_cache_key': page_cache.list_cache_key(request, ThermalRollRecord, is_admin),
+        **filters,
         'is_admin': is_admin,
     }
-    return render(request, 'thermal_rolls/list.html', context)
+    # The page is paginated while rendering, by the sync-only paginators:
+    # render in a worker thread
+    return await sync_to_async(render)(request, 'thermal_rolls/list.html', context)
 
 
 @login_required
-def thermal_roll_detail(request, pk):
-    """View details of a specific thermal roll record"""
+def thermal_roll_export(request):
+    """Stream the filtered thermal roll records as CSV or JSONL"""
+    records = ThermalRollRecord.objects.all()
+    if not user_is_admin(request.user):
+        records = records.filter(recorded_by=request.user)
+    records, _ = filter_records(records, request.GET)
+    return export_response(request, records, 'thermal_rolls')
+
+
+@login_required
+@csrf_protect
+def thermal_roll_import(request):
+    """Import thermal roll records from an uploaded CSV file"""
+    return record_import_view(request, 'thermal', 'Thermal Rolls', 'thermal_rolls:list')
+
+
+@login_required
+@require_POST
+@csrf_protect
+def thermal_roll_bulk(request):
+    """Delete the thermal roll records selected on the list page"""
     is_admin = user_is_admin(request.user)
+    records = ThermalRollRecord.objects.all()
+    if not is_admin:
+        records = records.filter(recorded_by=request.user)
+    return record_bulk_action(request, records, is_admin, 'thermal_rolls:list')
+
+
+def _int_param(params, name, default, low, high):
+    try:
+        value = int(params.get(name, default))
+    except (TypeError, ValueError):
+        return default
+    return min(max(value, low), high)
+
+
+def vendor_consumption(request):
+    """Per-vendor consumption for the request's user and parameters"""
+    is_admin = user_is_admin(request.user)
+    records = ThermalRollRecord.objects.all()
+    if not is_admin:
+        records = records.filter(recorded_by=request.user)
+    return analytics.vendor_consumption(
+        records,
+        scope='all' if is_admin else request.user.pk,
+        months=_int_param(request.GET, 'months', analytics.DEFAULT_MONTHS, 1, analytics.MAX_MONTHS),
+        top=_int_param(request.GET, 'top', analytics.DEFAULT_TOP, 1, 100),
+        window=_int_param(request.GET, 'window', analytics.DEFAULT_WINDOW, 1, 12),
+    )
+
+
+@login_required
+def thermal_roll_analytics(request):
+    """Show monthly thermal roll consumption per vendor"""
+    consumption = vendor_consumption(request)
     
+    context = {
+        'consumption': consumption,
+        'months': len(consumption['months']),
+        'is_admin': user_is_admin(request.user),
+    }
+    return render(request, 'thermal_rolls/analytics.html', context)
+
+
+@login_required
+def thermal_roll_analytics_api(request):
+    """Return monthly thermal roll consumption per vendor as JSON"""
+    return JsonResponse(vendor_consumption(request))
+
+
+@login_required
+async def thermal_roll_detail(request, pk):
+    """View details of a specific thermal roll record"""
+    user = await arequest_user(request)
+    is_admin = await auser_is_admin(user)
+    
+    # The owning user is shown, so load it with the record
+    records = ThermalRollRecord.objects.select_related('recorded_by')
     if is_admin:
-        record = get_object_or_404(ThermalRollRecord, pk=pk)
+        record = await aget_object_or_404(records, pk=pk)
     else:
-        record = get_object_or_404(ThermalRollRecord, pk=pk, recorded_by=request.user)
+        record = await aget_object_or_404(records, pk=pk, recorded_by=user)
     
     context = {
         'record': record,
@@ -32,6 +32,8 @@ INSTALLED_APPS = [
     'support_records.apps.SupportRecordsConfig',
     'thermal_rolls.apps.ThermalRollsConfig',
     'vendor_assistance.apps.VendorAssistanceConfig',
+    'reports.apps.ReportsConfig',
+    'api.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
@@ -45,19 +47,31 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
 ]
 
-# Template settings: include the project-level `templates/` directory and enable
+# Template settings: include the project-level `templates/` directory and the
 # app directories so templates like `templates/accounts/login.html` are found.
+# Outside DEBUG the compiled templates are kept in memory by the cached loader
+# instead of being read and parsed again on every request.
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if not DEBUG:
+    TEMPLATE_LOADERS = [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'accounts.context_processors.roles',
+                'accounts.context_processors.page_cache_timeout',
+                'accounts.context_processors.fragment_cache',
             ],
         },
     },
@@ -66,6 +80,7 @@ TEMPLATES = [
 ROOT_URLCONF = 'thirdyear.urls'
 
 WSGI_APPLICATION = 'thirdyear.wsgi.application'
+ASGI_APPLICATION = 'thirdyear.asgi.application'
 
 # Minimal DB config using sqlite for default. On Render, DATABASE_URL env var can be used.
 DATABASES = {
@@ -98,6 +113,71 @@ STATICFILES_DIRS = [
 # efficiently in production and names are hashed for long-term caching.
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Cache backend: 'locmem' (per process, the default), 'file' (shared by the
+# workers of one host) or 'redis' (shared everywhere; needs the redis
+# package). CACHE_LOCATION is the directory or redis:// URL.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+# Cached pages, roles and analytics are retired on write by deleting or
+# versioning keys, which only reaches the other workers through a shared
+# backend: on locmem each worker would keep serving its own stale copy. The
+# *_CACHE_TIMEOUT settings below therefore default to 0 (off) unless the
+# backend is shared.
+CACHE_IS_SHARED = CACHE_BACKEND != 'locmem'
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'ict-work-records'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / '.cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+}
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': os.environ.get('CACHE_LOCATION', CACHE_BACKENDS[CACHE_BACKEND][1]),
+    }
+}
+
+# How long (seconds) cached dashboard statistics and list page rows are kept;
+# 0 disables page caching (the default on locmem, see CACHE_IS_SHARED).
+PAGE_CACHE_TIMEOUT = int(os.environ.get('PAGE_CACHE_TIMEOUT', '300' if CACHE_IS_SHARED else '0'))
+
+# How long (seconds) static template fragments (navigation, status options,
+# dashboard quick actions) stay cached per role; 0 disables them. Fragments are
+# also keyed on FRAGMENT_CACHE_VERSION (the deployed commit on Render) so a
+# release never serves markup cached by the previous one from a shared cache.
+FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('FRAGMENT_CACHE_TIMEOUT', '3600'))
+FRAGMENT_CACHE_VERSION = os.environ.get('FRAGMENT_CACHE_VERSION', os.environ.get('RENDER_GIT_COMMIT', ''))
+
+# Serve dashboard statistics from the materialized RecordCounter table. Set to
+# False to aggregate straight from the record tables instead.
+DASHBOARD_USE_COUNTERS = os.environ.get('DASHBOARD_USE_COUNTERS', 'True') in ('True', 'true', '1')
+
+# Record search backend: 'auto' uses PostgreSQL full-text search or SQLite
+# FTS5 depending on the database; 'basic' falls back to icontains lookups.
+RECORD_SEARCH_BACKEND = os.environ.get('RECORD_SEARCH_BACKEND', 'auto')
+
+# How long (seconds) a user's group names stay cached between requests; 0
+# loads them once per request (the default on locmem, see CACHE_IS_SHARED).
+ROLE_CACHE_TIMEOUT = int(os.environ.get('ROLE_CACHE_TIMEOUT', '300' if CACHE_IS_SHARED else '0'))
+
+# Fuzzy name matching: minimum trigram similarity (0-1) for a hit, and the
+# most candidates read from the trigram index on databases without pg_trgm.
+FUZZY_MATCH_THRESHOLD = float(os.environ.get('FUZZY_MATCH_THRESHOLD', '0.3'))
+FUZZY_MATCH_LIMIT = int(os.environ.get('FUZZY_MATCH_LIMIT', '200'))
+
+# How long (seconds) finished months of thermal roll vendor totals stay
+# cached; the current month is always computed live. 0 disables the cache
+# (the default on locmem, see CACHE_IS_SHARED).
+THERMAL_ANALYTICS_CACHE_TIMEOUT = int(os.environ.get('THERMAL_ANALYTICS_CACHE_TIMEOUT', '3600' if CACHE_IS_SHARED else '0'))
+
+# Sync feed (/api/<module>/changes/): changes younger than SYNC_SETTLE_SECONDS
+# wait for the next pull so slow commits are not skipped, and tombstones of
+# deleted records are kept SYNC_TOMBSTONE_DAYS days (prune_tombstones).
+SYNC_SETTLE_SECONDS = int(os.environ.get('SYNC_SETTLE_SECONDS', '5'))
+SYNC_TOMBSTONE_DAYS = int(os.environ.get('SYNC_TOMBSTONE_DAYS', '90'))
+
+# archive_records moves support, asset and vendor records closed more than
+# ARCHIVE_AFTER_MONTHS months ago out of the live tables (see accounts.archive).
+ARCHIVE_AFTER_MONTHS = int(os.environ.get('ARCHIVE_AFTER_MONTHS', '24'))
+
 # Recommended default for modern Django projects
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -22,6 +22,15 @@ urlpatterns = [
     path('support/', lambda request: redirect('support_records:list')),
     path('support/<int:pk>/', lambda request, pk: redirect('support_records:detail', pk=pk)),
 
+    # Search across all record modules
+    path('search/', accounts_views.global_search_view, name='search'),
+
+    # Trend reports built from the daily counter rollups
+    path('reports/', include('reports.urls', namespace='reports')),
+    
+    # JSON API for the record modules
+    path('api/', include('api.urls', namespace='api')),
+
     # Make the dashboard available at the site root
     path('', accounts_views.dashboard_view, name='dashboard'),
     # Convenience root-level login path (so /login works)
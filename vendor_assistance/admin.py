@@ -1,15 +1,22 @@
 from django.contrib import admin
+from django.db import transaction
+
+from accounts import hooks
+from accounts.admin_mixins import BulkStatusActionsMixin, DeferredChangeListMixin, FullTextSearchMixin
+from accounts.roles import user_is_admin
 from .models import VendorAssistance
 
 
 @admin.register(VendorAssistance)
-class VendorAssistanceAdmin(admin.ModelAdmin):
+class VendorAssistanceAdmin(BulkStatusActionsMixin, FullTextSearchMixin, DeferredChangeListMixin, admin.ModelAdmin):
     list_display = ('company_name', 'cashier_owner_name', 'problem_summary', 'status', 'resolved_by', 'timestamp')
     list_filter = ('status', 'timestamp', 'resolved_by')
-    search_fields = ('company_name', 'cashier_owner_name', 'phone_number', 'problem_reported')
+    search_fields = VendorAssistance.SEARCH_FIELDS
     readonly_fields = ('timestamp', 'resolved_at')
     date_hierarchy = 'timestamp'
     list_per_page = 25
+    list_select_related = ('resolved_by',)
+    changelist_defer = ('resolution_notes',)
     
     fieldsets = (
         ('Vendor Information', {
@@ -35,10 +42,16 @@ class VendorAssistanceAdmin(admin.ModelAdmin):
             obj.resolved_by = request.user
         super().save_model(request, obj, form, change)
     
+    def delete_queryset(self, request, queryset):
+        """Keep record counters and indexes in step with bulk deletes"""
+        with transaction.atomic():
+            hooks.before_queryset_delete(queryset)
+            super().delete_queryset(request, queryset)
+    
     def get_queryset(self, request):
         """Filter queryset based on user group"""
         qs = super().get_queryset(request)
-        if request.user.is_superuser or request.user.groups.filter(name='Admin').exists():
+        if request.user.is_superuser or user_is_admin(request.user):
             return qs
         return qs.filter(resolved_by=request.user)
 
@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from accounts.search import CreateSearchIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendor_assistance', '0001_initial'),
+    ]
+
+    operations = [
+        CreateSearchIndex('VendorAssistance', fields=['company_name', 'cashier_owner_name', 'phone_number', 'problem_reported']),
+    ]
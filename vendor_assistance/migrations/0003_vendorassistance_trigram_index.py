@@ -0,0 +1,15 @@
+from django.db import migrations
+
+from accounts.fuzzy import CreateTrigramIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_name_trigram'),
+        ('vendor_assistance', '0002_vendorassistance_search_index'),
+    ]
+
+    operations = [
+        CreateTrigramIndex('VendorAssistance', fields=['company_name', 'cashier_owner_name']),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendor_assistance', '0004_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vendorassistance',
+            index=models.Index(fields=['resolved_by', '-timestamp', '-id'], name='vendor_assi_resolve_c50035_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vendorassistance',
+            index=models.Index(fields=['resolved_by', 'status', '-timestamp', '-id'], name='vendor_assi_resolve_3a1998_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:47
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendor_assistance', '0006_open_queue_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedVendorAssistance',
+            fields=[
+                ('id', models.BigIntegerField(help_text='Id of the record in the live table', primary_key=True, serialize=False)),
+                ('company_name', models.CharField(help_text='Company or vendor name', max_length=200)),
+                ('cashier_owner_name', models.CharField(help_text='Contact person (cashier/owner)', max_length=200)),
+                ('problem_reported', models.TextField(help_text='Issue description')),
+                ('phone_number', models.CharField(help_text='Contact number', max_length=20)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('ONGOING', 'Ongoing'), ('RESOLVED', 'Resolved')], help_text='Status when archived', max_length=20)),
+                ('timestamp', models.DateTimeField(help_text='When this was recorded')),
+                ('updated_at', models.DateTimeField(help_text='When this was last changed before archiving')),
+                ('resolved_at', models.DateTimeField(blank=True, help_text='When the issue was resolved', null=True)),
+                ('resolution_notes', models.TextField(blank=True, help_text='Resolution details')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now, help_text='When this was moved to the archive')),
+                ('resolved_by', models.ForeignKey(help_text='ICT officer who handled this', on_delete=django.db.models.deletion.PROTECT, related_name='archived_vendor_assistance_records', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived Vendor Assistance Record',
+                'verbose_name_plural': 'Archived Vendor Assistance Records',
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['-timestamp', '-id'], name='vendor_assi_timesta_5b3a37_idx'), models.Index(fields=['resolved_by', '-timestamp', '-id'], name='vendor_assi_resolve_8ed1bf_idx')],
+            },
+        ),
+    ]
@@ -1,7 +1,9 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+from accounts import hooks
+
 
 class VendorAssistance(models.Model):
     """Model for recording technical support provided to external vendors"""
@@ -17,6 +19,14 @@ class VendorAssistance(models.Model):
         (RESOLVED, 'Resolved'),
     ]
     
+    # Status that closes a record, and the timestamp set when it does
+    CLOSED_STATUS = RESOLVED
+    CLOSED_AT_FIELD = 'resolved_at'
+    
+    # Pending and ongoing requests: the open work queue. Served by the
+    # partial indexes below, which leave closed history out
+    OPEN_RECORDS = ~models.Q(status=RESOLVED)
+    
     company_name = models.CharField(max_length=200, help_text="Company or vendor name")
     cashier_owner_name = models.CharField(max_length=200, help_text="Contact person (cashier/owner)")
     problem_reported = models.TextField(help_text="Issue description")
@@ -34,15 +44,29 @@ class VendorAssistance(models.Model):
         help_text="ICT officer who handled this"
     )
     timestamp = models.DateTimeField(default=timezone.now, help_text="When this was recorded")
+    updated_at = models.DateTimeField(auto_now=True, help_text="When this was last changed (see api.sync)")
     resolved_at = models.DateTimeField(null=True, blank=True, help_text="When the issue was resolved")
     resolution_notes = models.TextField(blank=True, help_text="Resolution details")
     
+    # Columns covered by the full-text search index (see accounts.search)
+    SEARCH_FIELDS = ('company_name', 'cashier_owner_name', 'phone_number', 'problem_reported')
+    
+    # Name columns with trigram indexes for fuzzy matching (see accounts.fuzzy)
+    FUZZY_FIELDS = ('company_name', 'cashier_owner_name')
+    
     class Meta:
         ordering = ['-timestamp']
         verbose_name = "Vendor Assistance Record"
         verbose_name_plural = "Vendor Assistance Records"
         indexes = [
             models.Index(fields=['-timestamp']),
+            models.Index(fields=['updated_at']),
+            # Open work queue, oldest first; only open records are indexed
+            models.Index(fields=['timestamp', 'id'], condition=~models.Q(status='RESOLVED'), name='vendorassist_open_idx'),
+            models.Index(fields=['resolved_by', 'timestamp', 'id'], condition=~models.Q(status='RESOLVED'), name='vendorassist_open_owner_idx'),
+            # Role-scoped lists: own records newest first, optionally by status
+            models.Index(fields=['resolved_by', '-timestamp', '-id']),
+            models.Index(fields=['resolved_by', 'status', '-timestamp', '-id']),
             models.Index(fields=['status']),
             models.Index(fields=['company_name']),
         ]
@@ -54,5 +78,62 @@ class VendorAssistance(models.Model):
         # Auto-set resolved_at when status changes to RESOLVED
         if self.status == self.RESOLVED and not self.resolved_at:
             self.resolved_at = timezone.now()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            state = hooks.before_save(self)
+            super().save(*args, **kwargs)
+            hooks.after_save(self, state)
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            hooks.before_delete(self)
+            return super().delete(*args, **kwargs)
+
+
+class ArchivedVendorAssistance(models.Model):
+    """Vendor assistance record resolved long ago, moved out of the live table
 
+    Same columns and id as the :class:`VendorAssistance` it was. Rows are
+    written by the ``archive_records`` command and never changed (see
+    :mod:`accounts.archive`).
+    """
+    
+    STATUS_CHOICES = VendorAssistance.STATUS_CHOICES
+    CLOSED_STATUS = VendorAssistance.CLOSED_STATUS
+    CLOSED_AT_FIELD = VendorAssistance.CLOSED_AT_FIELD
+    
+    # Read-only: views show no edit, delete or bulk actions for these
+    is_archived = True
+    
+    # Searched with icontains: the archive has no full-text index
+    SEARCH_FIELDS = VendorAssistance.SEARCH_FIELDS
+    SEARCH_INDEX = False
+    
+    id = models.BigIntegerField(primary_key=True, help_text="Id of the record in the live table")
+    company_name = models.CharField(max_length=200, help_text="Company or vendor name")
+    cashier_owner_name = models.CharField(max_length=200, help_text="Contact person (cashier/owner)")
+    problem_reported = models.TextField(help_text="Issue description")
+    phone_number = models.CharField(max_length=20, help_text="Contact number")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, help_text="Status when archived")
+    resolved_by = models.ForeignKey(
+        User,
+        on_delete=models.PROTECT,
+        related_name='archived_vendor_assistance_records',
+        help_text="ICT officer who handled this"
+    )
+    timestamp = models.DateTimeField(help_text="When this was recorded")
+    updated_at = models.DateTimeField(help_text="When this was last changed before archiving")
+    resolved_at = models.DateTimeField(null=True, blank=True, help_text="When the issue was resolved")
+    resolution_notes = models.TextField(blank=True, help_text="Resolution details")
+    archived_at = models.DateTimeField(default=timezone.now, help_text="When this was moved to the archive")
+    
+    class Meta:
+        ordering = ['-timestamp']
+        verbose_name = "Archived Vendor Assistance Record"
+        verbose_name_plural = "Archived Vendor Assistance Records"
+        indexes = [
+            models.Index(fields=['-timestamp', '-id']),
+            models.Index(fields=['resolved_by', '-timestamp', '-id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.company_name} - {self.problem_reported[:50]} ({self.status})"
@@ -4,6 +4,7 @@ from django.urls import reverse
 from django.utils import timezone
 from .models import VendorAssistance
 from .forms import VendorAssistanceForm
+from accounts.testing import QueryCountTestMixin, QueryPlanTestMixin
 
 
 class VendorAssistanceModelTest(TestCase):
@@ -273,3 +274,88 @@ class VendorAssistancePermissionTest(TestCase):
         response = self.client.get(reverse('vendor_assistance:detail', args=[self.record1.pk]))
         # Should return 404 (record not in filtered queryset) or 403 (permission denied)
         self.assertIn(response.status_code, [302, 403, 404])
+
+
+class VendorAssistanceQueryCountTest(QueryCountTestMixin, TestCase):
+    """Test that list pages do not issue a query per row"""
+    
+    def setUp(self):
+        """Create an admin, a superuser and a pool of record owners"""
+        self.admin_group = Group.objects.create(name='Admin')
+        self.admin_user = User.objects.create_user(username='admin', password='admin123')
+        self.admin_user.groups.add(self.admin_group)
+        User.objects.create_superuser(username='root', password='root123')
+        self.owners = [
+            User.objects.create_user(username=f'owner{i}', first_name=f'Owner {i}')
+            for i in range(3)
+        ]
+        self.created = 0
+        self.client = Client()
+        
+    def create_records(self, count):
+        """Create records owned by different users"""
+        for _ in range(count):
+            i = self.created
+            owner = self.owners[i % len(self.owners)]
+            VendorAssistance.objects.create(
+                company_name=f"Company {i}",
+                cashier_owner_name="Owner",
+                problem_reported="Issue",
+                phone_number="0123456789",
+                resolved_by=owner
+            )
+            self.created += 1
+            
+    def test_list_view_query_count(self):
+        """Test that the list view query count is independent of page size"""
+        self.client.login(username='admin', password='admin123')
+        self.assertConstantQueries(reverse('vendor_assistance:list'), self.create_records)
+        
+    def test_admin_changelist_query_count(self):
+        """Test that the admin changelist query count is independent of page size"""
+        self.client.login(username='root', password='root123')
+        self.assertConstantQueries(reverse('admin:vendor_assistance_vendorassistance_changelist'), self.create_records)
+
+
+class VendorAssistanceQueryPlanTest(QueryPlanTestMixin, TestCase):
+    """Test that role-scoped list queries are answered from the composite indexes"""
+    
+    def setUp(self):
+        """Create records for two users"""
+        self.users = [User.objects.create_user(username=f'user{i}') for i in range(2)]
+        for i in range(20):
+            VendorAssistance.objects.create(
+                company_name=f"Company {i}", cashier_owner_name="Owner", problem_reported="POS down",
+                phone_number="+1234567890", resolved_by=self.users[i % 2]
+            )
+            
+    def own_records(self):
+        """The list view queryset of a non-admin user, in cursor order"""
+        return (
+            VendorAssistance.objects.select_related('resolved_by').defer('resolution_notes')
+            .filter(resolved_by=self.users[0]).order_by('-timestamp', '-pk')
+        )
+        
+    def test_own_list_uses_owner_index(self):
+        """Test that own records newest first read the (owner, timestamp) index"""
+        index = self.index_name(VendorAssistance, ['resolved_by', '-timestamp', '-id'])
+        self.assertUsesIndex(self.own_records()[:10], index)
+        # Dashboard recent activity
+        self.assertUsesIndex(VendorAssistance.objects.filter(resolved_by=self.users[0]).order_by('-timestamp')[:10], index)
+        
+    def test_status_filtered_list_uses_owner_status_index(self):
+        """Test that a status filter on own records reads the (owner, status, timestamp) index"""
+        records = self.own_records().filter(status=VendorAssistance.PENDING)
+        self.assertUsesIndex(records, self.index_name(VendorAssistance, ['resolved_by', 'status', '-timestamp', '-id']))
+        
+    def test_open_queue_uses_partial_indexes(self):
+        """Test that the open work queue reads only the partial open-record indexes"""
+        records = VendorAssistance.objects.filter(VendorAssistance.OPEN_RECORDS).order_by('timestamp', 'pk')
+        self.assertUsesIndex(records[:25], 'vendorassist_open_idx')
+        self.assertUsesIndex(records.filter(resolved_by=self.users[0])[:25], 'vendorassist_open_owner_idx')
+        
+    def test_open_records_match_index_condition(self):
+        """Test that the queue filter is the condition of its partial indexes"""
+        for name in ('vendorassist_open_idx', 'vendorassist_open_owner_idx'):
+            index = next(index for index in VendorAssistance._meta.indexes if index.name == name)
+            self.assertEqual(index.condition, VendorAssistance.OPEN_RECORDS)
@@ -5,6 +5,10 @@ app_name = 'vendor_assistance'
 
 urlpatterns = [
     path('', views.vendor_assistance_list, name='list'),
+    path('export/', views.vendor_assistance_export, name='export'),
+    path('import/', views.vendor_assistance_import, name='import'),
+    path('queue/', views.vendor_assistance_queue, name='queue'),
+    path('bulk/', views.vendor_assistance_bulk, name='bulk'),
     path('<int:pk>/', views.vendor_assistance_detail, name='detail'),
     path('create/', views.vendor_assistance_create, name='create'),
     path('<int:pk>/update/', views.vendor_assistance_update, name='update'),
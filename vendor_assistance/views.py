@@ -1,69 +1,112 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
-from django.db.models import Q
+from django.views.decorators.csrf import csrf_protect, ensure_csrf_cookie
+from django.views.decorators.http import require_POST
+from accounts import archive, history, page_cache
+from accounts.export import export_response
+from accounts.filters import filter_records
+from accounts.roles import arequest_user, auser_is_admin, user_is_admin
+from accounts.views import record_bulk_action, record_import_view, record_queue_view
 from .models import VendorAssistance
 from .forms import VendorAssistanceForm
 
 
-def user_is_admin(user):
-    """Check if user is in Admin group"""
-    return user.groups.filter(name='Admin').exists()
-
-
 @login_required
-def vendor_assistance_list(request):
+@ensure_csrf_cookie  # for the bulk action form
+async def vendor_assistance_list(request):
     """List all vendor assistance records with filtering and search"""
-    is_admin = user_is_admin(request.user)
-    
-    if is_admin:
-        records = VendorAssistance.objects.all()
-    else:
-        records = VendorAssistance.objects.filter(resolved_by=request.user)
-    
-    # Search
-    search_query = request.GET.get('search', '')
-    if search_query:
-        records = records.filter(
-            Q(company_name__icontains=search_query) |
-            Q(cashier_owner_name__icontains=search_query) |
-            Q(problem_reported__icontains=search_query)
-        )
+    user = await arequest_user(request)
+    is_admin = await auser_is_admin(user)
     
-    # Filter by status
-    status_filter = request.GET.get('status', '')
-    if status_filter:
-        records = records.filter(status=status_filter)
+    # The live table, plus the archive when the date range reaches into it
+    # (or the archive alone with ?archive=1; archived rows are read-only)
+    archived = archive.requested(request.GET)
+    querysets = []
+    for source in await archive.alist_sources(VendorAssistance, request.GET):
+        # Load the owning user in the same query and skip text not shown in the list
+        records = source.objects.select_related('resolved_by').defer('resolution_notes')
+        if not is_admin:
+            records = records.filter(resolved_by=user)
+        
+        # Search, status and date filters (shared with the export); fuzzy
+        # matching reads the name index, which has no async query path
+        records, filters = await sync_to_async(filter_records)(records, request.GET)
+        querysets.append(records)
+    records = archive.combined(querysets)
     
-    # Pagination
-    paginator = Paginator(records, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Pagination (offset by default, keyset when a cursor is requested); only
+    # runs when the rows are not already in the fragment cache
+    page_obj, page_records = page_cache.lazy_page(request, records, 10)
     
     context = {
-        'records': records,  # For compatibility with templates
+        'records': page_records,  # Only the current page is rendered
         'page_obj': page_obj,
-        'search_query': search_query,
-        'status_filter': status_filter,
+        'list_cache_key': page_cache.list_cache_key(request, VendorAssistance, is_admin),
+        **filters,
         'is_admin': is_admin,
+        'archived': archived,
         'status_choices': VendorAssistance.STATUS_CHOICES,
     }
-    return render(request, 'vendor_assistance/list.html', context)
+    # The page is paginated while rendering, by the sync-only paginators:
+    # render in a worker thread
+    return await sync_to_async(render)(request, 'vendor_assistance/list.html', context)
 
 
 @login_required
-def vendor_assistance_detail(request, pk):
-    """View details of a specific vendor assistance record"""
+def vendor_assistance_export(request):
+    """Stream the filtered vendor assistance records as CSV or JSONL"""
     is_admin = user_is_admin(request.user)
+    querysets = []
+    for source in archive.list_sources(VendorAssistance, request.GET):
+        records = source.objects.all()
+        if not is_admin:
+            records = records.filter(resolved_by=request.user)
+        records, _ = filter_records(records, request.GET)
+        querysets.append(records)
+    return export_response(request, querysets, 'vendor_assistance')
+
+
+@login_required
+@csrf_protect
+def vendor_assistance_import(request):
+    """Import vendor assistance records from an uploaded CSV file"""
+    return record_import_view(request, 'vendor', 'Vendor Assistance', 'vendor_assistance:list')
+
+
+@login_required
+def vendor_assistance_queue(request):
+    """Work queue of open vendor assistance requests, oldest first"""
+    return record_queue_view(request, VendorAssistance, 'resolved_by', 'Vendor Assistance', 'vendor_assistance:list')
+
+
+@login_required
+@require_POST
+@csrf_protect
+def vendor_assistance_bulk(request):
+    """Change the status of, or delete, the vendor assistance records selected on the list page"""
+    is_admin = user_is_admin(request.user)
+    records = VendorAssistance.objects.all()
+    if not is_admin:
+        records = records.filter(resolved_by=request.user)
+    return record_bulk_action(request, records, is_admin, 'vendor_assistance:list')
+
+
+@login_required
+async def vendor_assistance_detail(request, pk):
+    """View details of a specific vendor assistance record"""
+    user = await arequest_user(request)
+    is_admin = await auser_is_admin(user)
     
     if is_admin:
-        record = get_object_or_404(VendorAssistance, pk=pk)
+        record = await archive.aget_record_or_404(VendorAssistance, pk=pk)
     else:
-        record = get_object_or_404(VendorAssistance, pk=pk, resolved_by=request.user)
+        record = await archive.aget_record_or_404(VendorAssistance, pk=pk, resolved_by=user)
     
     context = {
         'record': record,
+        'status_history': [transition async for transition in history.record_history(record)],
         'is_admin': is_admin,
     }
     return render(request, 'vendor_assistance/detail.html', context)